@@ -0,0 +1,30 @@
+"""
+add (list_id, expiry) index on list_item for the expiring-soon endpoint
+
+Revision ID: add_iexp_261019
+Revises: add_pstat_261019
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_iexp_261019'
+down_revision = 'add_pstat_261019'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # CONCURRENTLY on Postgres keeps list_item writable while it builds
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_list_item_list_expiry', 'list_item', ['list_id', 'expiry'], unique=False,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_list_item_list_expiry', table_name='list_item', postgresql_concurrently=True)
@@ -0,0 +1,36 @@
+"""
+add list_item.position fractional sort keys and their per-list index
+
+Revision ID: add_ipos_261019
+Revises: add_iver_261019
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_ipos_261019'
+down_revision = 'add_iver_261019'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Constant default: no table rewrite on Postgres 11+. "C" collation so
+    # keys compare bytewise, as app/ordering.py assumes.
+    op.add_column(
+        'list_item',
+        sa.Column('position', sa.String().with_variant(sa.String(collation='C'), 'postgresql'),
+                  server_default='', nullable=False),
+    )
+    with op.get_context().autocommit_block():
+        op.create_index('ix_list_item_list_position', 'list_item', ['list_id', 'position'], unique=False,
+                        postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_list_item_list_position', table_name='list_item', postgresql_concurrently=True)
+    op.drop_column('list_item', 'position')
@@ -0,0 +1,80 @@
+"""
+add pg_trgm and full-text GIN indexes for item search (FTS5 table on SQLite)
+
+Revision ID: add_isearch_261019
+Revises: add_gldel_261019
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_isearch_261019'
+down_revision = 'add_gldel_261019'
+branch_labels = None
+depends_on = None
+
+# Must match app.models.SEARCH_DOCUMENT_SQL so the planner uses the index
+DOCUMENT = "to_tsvector('simple', coalesce(name, '') || ' ' || coalesce(description, ''))"
+
+# Must match the SQLite DDL in app.models; the triggers keep the
+# external-content table in step with list_item
+SQLITE_FTS5 = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS list_item_fts USING fts5("
+    "name, description, content='list_item', content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER IF NOT EXISTS list_item_fts_ai AFTER INSERT ON list_item BEGIN "
+    "INSERT INTO list_item_fts(rowid, name, description) VALUES (new.id, new.name, new.description); END",
+    "CREATE TRIGGER IF NOT EXISTS list_item_fts_ad AFTER DELETE ON list_item BEGIN "
+    "INSERT INTO list_item_fts(list_item_fts, rowid, name, description) "
+    "VALUES ('delete', old.id, old.name, old.description); END",
+    "CREATE TRIGGER IF NOT EXISTS list_item_fts_au AFTER UPDATE OF name, description ON list_item BEGIN "
+    "INSERT INTO list_item_fts(list_item_fts, rowid, name, description) "
+    "VALUES ('delete', old.id, old.name, old.description); "
+    "INSERT INTO list_item_fts(rowid, name, description) VALUES (new.id, new.name, new.description); END",
+    # Index the rows that already exist
+    "INSERT INTO list_item_fts(list_item_fts) VALUES ('rebuild')",
+)
+
+
+def _sqlite_has_fts5(bind) -> bool:
+    # Without FTS5 compiled in, app/search.py falls back to LIKE
+    return any("ENABLE_FTS5" in row[0] for row in bind.exec_driver_sql("PRAGMA compile_options"))
+
+
+def _upgrade_sqlite(bind) -> None:
+    if _sqlite_has_fts5(bind):
+        for stmt in SQLITE_FTS5:
+            op.execute(stmt)
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name == 'sqlite':
+        _upgrade_sqlite(bind)
+    if bind.dialect.name != 'postgresql':
+        return
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    # CONCURRENTLY keeps list_item writable while the indexes build
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_list_item_name_trgm "
+            "ON list_item USING gin (name gin_trgm_ops)"
+        )
+        op.execute(
+            f"CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_list_item_search_tsv "
+            f"ON list_item USING gin (({DOCUMENT}))"
+        )
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name == 'sqlite':
+        for trigger in ("list_item_fts_au", "list_item_fts_ad", "list_item_fts_ai"):
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        op.execute("DROP TABLE IF EXISTS list_item_fts")
+    if bind.dialect.name != 'postgresql':
+        return
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_list_item_search_tsv")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_list_item_name_trgm")
@@ -0,0 +1,26 @@
+"""
+add list_item.version for optimistic concurrency (ETag / If-Match)
+
+Revision ID: add_iver_261019
+Revises: add_sync_261019
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_iver_261019'
+down_revision = 'add_sync_261019'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Constant default: no table rewrite on Postgres 11+
+    op.add_column('list_item', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column('list_item', 'version')
@@ -0,0 +1,30 @@
+"""
+add grocery_list.deleted_at tombstone for background list purging
+
+Revision ID: add_gldel_261019
+Revises: add_rrun_261019
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_gldel_261019'
+down_revision = 'add_rrun_261019'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('grocery_list', sa.Column('deleted_at', sa.DateTime(timezone=True), nullable=True))
+    op.create_index(
+        'ix_grocery_list_deleted_at', 'grocery_list', ['deleted_at'], unique=False,
+        postgresql_where=sa.text('deleted_at IS NOT NULL'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_grocery_list_deleted_at', table_name='grocery_list')
+    op.drop_column('grocery_list', 'deleted_at')
@@ -0,0 +1,39 @@
+"""
+add purchase_stat rollup table for buy-again and frequency stats
+
+Revision ID: add_pstat_261019
+Revises: add_isearch_261019
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_pstat_261019'
+down_revision = 'add_isearch_261019'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Filled by the app as items are purchased; history via POST /tasks/backfill-purchase-stats
+    op.create_table(
+        'purchase_stat',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('name_key', sa.String(), nullable=False),
+        sa.Column('display_name', sa.String(), nullable=False),
+        sa.Column('count', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('last_purchased_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['user.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('user_id', 'name_key'),
+    )
+    op.create_index('ix_purchase_stat_user_count', 'purchase_stat', ['user_id', 'count'], unique=False)
+    op.create_index('ix_purchase_stat_user_last', 'purchase_stat', ['user_id', 'last_purchased_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_purchase_stat_user_last', table_name='purchase_stat')
+    op.drop_index('ix_purchase_stat_user_count', table_name='purchase_stat')
+    op.drop_table('purchase_stat')
@@ -0,0 +1,26 @@
+"""
+add reminder_queue.claimed_until so concurrent reminder runs claim entries atomically
+
+Revision ID: add_rclaim_261019
+Revises: add_uemail_261019
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_rclaim_261019'
+down_revision = 'add_uemail_261019'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Nullable, no default: metadata-only on Postgres
+    op.add_column('reminder_queue', sa.Column('claimed_until', sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('reminder_queue', 'claimed_until')
@@ -0,0 +1,41 @@
+"""
+add reminder_queue table for incremental reminder scans
+
+Revision ID: add_rq_261019
+Revises: add_urt_250831
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_rq_261019'
+down_revision = 'add_urt_250831'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'reminder_queue',
+        sa.Column('item_id', sa.Integer(), nullable=False),
+        sa.Column('remind_on', sa.Date(), nullable=False),
+        sa.ForeignKeyConstraint(['item_id'], ['list_item.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('item_id'),
+    )
+    op.create_index('ix_reminder_queue_remind_on', 'reminder_queue', ['remind_on'], unique=False)
+    # Backfill reminders that are still pending
+    op.execute(
+        """
+        INSERT INTO reminder_queue (item_id, remind_on)
+        SELECT id, remind_on FROM list_item
+        WHERE remind_on IS NOT NULL AND reminded_at IS NULL AND purchased = false
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_reminder_queue_remind_on', table_name='reminder_queue')
+    op.drop_table('reminder_queue')
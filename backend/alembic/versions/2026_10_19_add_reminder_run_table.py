@@ -0,0 +1,46 @@
+"""
+add reminder_run table for reminder pipeline timings
+
+Revision ID: add_rrun_261019
+Revises: add_rq_261019
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_rrun_261019'
+down_revision = 'add_rq_261019'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'reminder_run',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('started_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('trigger', sa.String(), server_default='cron', nullable=False),
+        sa.Column('rows_scanned', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('owners', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('items', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('sent', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('failed', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('digest_bytes', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('query_ms', sa.Float(), nullable=True),
+        sa.Column('render_ms', sa.Float(), nullable=True),
+        sa.Column('send_ms', sa.Float(), nullable=True),
+        sa.Column('mark_ms', sa.Float(), nullable=True),
+        sa.Column('send_p50_ms', sa.Float(), nullable=True),
+        sa.Column('send_p99_ms', sa.Float(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_reminder_run_started_at', 'reminder_run', ['started_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_reminder_run_started_at', table_name='reminder_run')
+    op.drop_table('reminder_run')
@@ -0,0 +1,60 @@
+"""
+add change stamps, sync tombstones and the sync clock for delta sync
+
+Revision ID: add_sync_261019
+Revises: add_iexp_261019
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_sync_261019'
+down_revision = 'add_iexp_261019'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Constant defaults: no table rewrite on Postgres 11+
+    op.add_column('grocery_list', sa.Column('change_seq', sa.BigInteger(), server_default='0', nullable=False))
+    op.add_column('list_item', sa.Column('seq', sa.BigInteger(), server_default='0', nullable=False))
+    op.add_column('list_share', sa.Column('seq', sa.BigInteger(), server_default='0', nullable=False))
+    op.create_table(
+        'sync_tombstone',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('list_id', sa.Integer(), nullable=False),
+        sa.Column('seq', sa.BigInteger(), nullable=False),
+        sa.Column('kind', sa.String(), nullable=False),
+        sa.Column('object_id', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['list_id'], ['grocery_list.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_sync_tombstone_list_seq', 'sync_tombstone', ['list_id', 'seq'], unique=False)
+    # Stamps on SQLite; Postgres stamps with transaction ids and leaves it unused
+    sync_clock = op.create_table(
+        'sync_clock',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('value', sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.bulk_insert(sync_clock, [{'id': 1, 'value': 1}])
+    with op.get_context().autocommit_block():
+        op.create_index('ix_list_item_list_seq', 'list_item', ['list_id', 'seq'], unique=False,
+                        postgresql_concurrently=True)
+        op.create_index('ix_list_share_list_seq', 'list_share', ['list_id', 'seq'], unique=False,
+                        postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_list_share_list_seq', table_name='list_share', postgresql_concurrently=True)
+        op.drop_index('ix_list_item_list_seq', table_name='list_item', postgresql_concurrently=True)
+    op.drop_table('sync_clock')
+    op.drop_index('ix_sync_tombstone_list_seq', table_name='sync_tombstone')
+    op.drop_table('sync_tombstone')
+    op.drop_column('list_share', 'seq')
+    op.drop_column('list_item', 'seq')
+    op.drop_column('grocery_list', 'change_seq')
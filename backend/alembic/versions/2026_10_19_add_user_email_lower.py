@@ -0,0 +1,28 @@
+"""
+add expression index on lower(user.email) for bulk sharing
+
+Revision ID: add_uemail_261019
+Revises: add_ipos_261019
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_uemail_261019'
+down_revision = 'add_ipos_261019'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index('ix_user_email_lower', 'user', [sa.text('lower(email)')], unique=False,
+                        postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_user_email_lower', table_name='user', postgresql_concurrently=True)
@@ -0,0 +1,195 @@
+# app/admission.py
+"""Admission control tied to DB pool capacity.
+
+A request takes a slot when it checks out a DB session (``get_db`` /
+``get_read_db`` in app/database.py) and gives it back when the session
+closes, so only requests that actually use the database compete for the
+pool; health ("/"), /metrics and DB-free routes never wait.
+
+Each engine gets ``capacity`` slots: pool_size + max_overflow, or
+ADMISSION_CONCURRENCY. With NullPool (the default for Supabase URLs) there
+is no pool size to follow and the external pooler does the limiting, so
+admission is off for that engine, with a warning at startup, unless
+ADMISSION_CONCURRENCY is set. Requests past capacity queue for at most ADMISSION_MAX_WAIT_MS; once the queue
+holds ADMISSION_MAX_QUEUE waiters, or the wait runs out, the request gets
+an immediate 503 with Retry-After. It never sits out the 30s pool timeout
+and fails with everyone else.
+
+Auth routes use a priority lane. ADMISSION_AUTH_RESERVED slots (default 1,
+never the whole pool) are theirs alone, freed slots go to waiting auth
+requests first, and they may wait ADMISSION_PRIORITY_MAX_WAIT_MS, so a
+flood of list traffic cannot lock users out of signing in.
+
+Session dependencies run in the threadpool, so slots are guarded by a
+condition variable.
+"""
+import logging
+import os
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+
+from fastapi import HTTPException
+
+from app.metrics import ADMISSION_SHED, ADMISSION_WAIT, register_collector
+
+PRIORITY = "priority"
+NORMAL = "normal"
+
+PRIORITY_PREFIXES = ("/auth/",)
+
+log = logging.getLogger("app.admission")
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+def pool_capacity(engine) -> int | None:
+    """Concurrent sessions ``engine``'s pool can serve without queueing; None if it has no size."""
+    override = os.getenv("ADMISSION_CONCURRENCY")
+    if override:
+        return max(int(override), 1)
+    pool = getattr(engine, "pool", None)
+    if pool is None or not hasattr(pool, "size"):
+        return None
+    return max(pool.size() + max(getattr(pool, "_max_overflow", 0), 0), 1)
+
+
+class AdmissionController:
+    def __init__(self, capacity: int, max_queue: int, max_wait: float, priority_max_wait: float,
+                 reserved: int = 0):
+        self.capacity = capacity
+        # Slots only the priority lane may use; at least one stays open to everyone
+        self.reserved = max(min(reserved, capacity - 1), 0)
+        self.max_queue = max_queue
+        self.max_wait = {NORMAL: max_wait, PRIORITY: priority_max_wait}
+        self.in_use = 0
+        self.waiting = {PRIORITY: 0, NORMAL: 0}
+        self._cond = threading.Condition()
+
+    @classmethod
+    def from_env(cls, engine) -> "AdmissionController | None":
+        capacity = pool_capacity(engine)
+        if capacity is None:
+            log.warning(
+                "Admission control is off for %s: its pool (%s) has no size; "
+                "set ADMISSION_CONCURRENCY to what the database or pooler can take to enable it",
+                engine.url.render_as_string(hide_password=True), type(engine.pool).__name__,
+            )
+            return None
+        return cls(
+            capacity=capacity,
+            max_queue=int(_env_float("ADMISSION_MAX_QUEUE", capacity * 4)),
+            max_wait=_env_float("ADMISSION_MAX_WAIT_MS", 2000) / 1000.0,
+            priority_max_wait=_env_float("ADMISSION_PRIORITY_MAX_WAIT_MS", 5000) / 1000.0,
+            reserved=int(_env_float("ADMISSION_AUTH_RESERVED", 1)),
+        )
+
+    def queued(self) -> int:
+        return self.waiting[PRIORITY] + self.waiting[NORMAL]
+
+    def _free(self, lane: str) -> bool:
+        if lane == PRIORITY:
+            return self.in_use < self.capacity
+        return self.in_use < self.capacity - self.reserved and not self.waiting[PRIORITY]
+
+    def acquire(self, lane: str) -> str | None:
+        """Take a slot; returns None when admitted or the shed reason ("queue_full"/"timeout")."""
+        with self._cond:
+            if not self.waiting[lane] and self._free(lane):
+                self.in_use += 1
+                return None
+            if self.queued() >= self.max_queue:
+                return "queue_full"
+            start = time.perf_counter()
+            deadline = start + self.max_wait[lane]
+            self.waiting[lane] += 1
+            try:
+                while not self._free(lane):
+                    remaining = deadline - time.perf_counter()
+                    if remaining <= 0:
+                        return "timeout"
+                    self._cond.wait(remaining)
+                self.in_use += 1
+            finally:
+                self.waiting[lane] -= 1
+                # A normal waiter may be free to go now that this one left the queue
+                self._cond.notify_all()
+        ADMISSION_WAIT.observe(time.perf_counter() - start, lane)
+        return None
+
+    def release(self) -> None:
+        with self._cond:
+            self.in_use -= 1
+            self._cond.notify_all()
+
+
+def lane_for(path: str) -> str:
+    return PRIORITY if path.startswith(PRIORITY_PREFIXES) else NORMAL
+
+
+# One controller per engine (primary, read replica), built on first use
+_controllers: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+_controllers_lock = threading.Lock()
+
+
+def _disabled() -> bool:
+    return os.getenv("ADMISSION_DISABLE", "").lower() in ("1", "true", "yes")
+
+
+def controller_for(engine) -> AdmissionController | None:
+    """The engine's controller, or None when admission is off for it."""
+    with _controllers_lock:
+        if engine not in _controllers:
+            _controllers[engine] = AdmissionController.from_env(engine)
+        return _controllers[engine]
+
+
+def check(*engines) -> None:
+    """Build the controllers up front, so sizing problems are logged at startup, not per request."""
+    if not _disabled():
+        for engine in engines:
+            if engine is not None:
+                controller_for(engine)
+
+
+@contextmanager
+def slot(engine, path: str):
+    """Hold an admission slot for ``engine`` around a session checkout; 503 when shed."""
+    c = None if _disabled() else controller_for(engine)
+    if c is None:
+        yield
+        return
+    lane = lane_for(path)
+    shed = c.acquire(lane)
+    if shed is not None:
+        ADMISSION_SHED.inc(lane, shed)
+        retry_after = str(max(int(_env_float("ADMISSION_RETRY_AFTER", 1)), 1))
+        raise HTTPException(
+            status_code=503, detail="Server busy, retry shortly", headers={"Retry-After": retry_after}
+        )
+    try:
+        yield
+    finally:
+        c.release()
+
+
+def _collect():
+    with _controllers_lock:
+        controllers = [c for c in _controllers.values() if c is not None]
+    if not controllers:
+        return
+    yield "# HELP admission_slots_in_use DB slots held by admitted requests."
+    yield "# TYPE admission_slots_in_use gauge"
+    yield f"admission_slots_in_use {sum(c.in_use for c in controllers)}"
+    yield "# HELP admission_queue_length Requests waiting for a DB slot."
+    yield "# TYPE admission_queue_length gauge"
+    yield f"admission_queue_length {sum(c.queued() for c in controllers)}"
+
+
+register_collector(_collect)
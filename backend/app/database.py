@@ -1,20 +1,35 @@
+import hashlib
 import os
+import threading
+import time
+from contextlib import contextmanager
 from urllib.parse import quote_plus
-from sqlalchemy import create_engine
-from sqlalchemy.pool import NullPool
-from sqlalchemy.orm import sessionmaker
+from fastapi import Request
+from fastapi.responses import JSONResponse
+from sqlalchemy import create_engine, event, text
+from sqlalchemy import exc as sa_exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import NullPool, QueuePool
+from sqlalchemy.orm import Session, sessionmaker
+
+from app import admission
+from app.metrics import DB_TIMEOUTS, POOL_TIMEOUTS, POOL_WAIT
+from app.security_cookies import COOKIE_NAME
+
+def _normalize_url(url: str) -> str:
+    # normalize if someone sets postgres://
+    if url.startswith("postgres://"):
+        url = "postgresql://" + url[len("postgres://"):]
+    # Supabase needs SSL; if missing, append it
+    if "supabase" in url and "sslmode=" not in url:
+        url += ("&" if "?" in url else "?") + "sslmode=require"
+    return url
 
 def build_db_url() -> str:
     # 1) Prefer single DATABASE_URL if present
     url = (os.getenv("DATABASE_URL") or "").strip().strip('"').strip("'")
     if url:
-        # normalize if someone sets postgres://
-        if url.startswith("postgres://"):
-            url = "postgresql://" + url[len("postgres://"):]
-        # Supabase needs SSL; if missing, append it
-        if "supabase" in url and "sslmode=" not in url:
-            url += ("&" if "?" in url else "?") + "sslmode=require"
-        return url
+        return _normalize_url(url)
 
     # 2) Fallback to discrete PG* variables (for local/dev)
     user = os.getenv("PGUSER") or os.getenv("POSTGRES_USER") or os.getenv("user")
@@ -26,38 +41,322 @@ def build_db_url() -> str:
         raise RuntimeError("DB config missing: set DATABASE_URL or PG* env vars.")
     return f"postgresql+psycopg2://{user}:{quote_plus(pwd)}@{host}:{port}/{db}?sslmode=require"
 
-DATABASE_URL = build_db_url()
+def build_read_db_url() -> str | None:
+    """Optional read replica (DATABASE_READ_URL); None means reads use the primary."""
+    url = (os.getenv("DATABASE_READ_URL") or "").strip().strip('"').strip("'")
+    return _normalize_url(url) if url else None
 
-# Prefer letting PgBouncer/Supabase pooler handle pooling in production.
-# Defaults:
-# - If DATABASE_URL contains "supabase", default to NullPool (open/close per request)
-# - Otherwise, allow a very small QueuePool unless explicitly overridden
+# The engine is built on first use (or from the app lifespan) rather than at
+# import time, so importing the app stays cheap and needs no DB config.
+_engine = None
+_database_url = None
+_read_engine = None
 
-_env_disable_pool = os.getenv("DB_DISABLE_POOL")
-_default_disable_pool = ("supabase" in DATABASE_URL.lower())
-_disable_pool = (
-    _default_disable_pool if _env_disable_pool is None
-    else (_env_disable_pool.lower() in ("1", "true", "yes"))
-)
 
-if _disable_pool:
-    engine = create_engine(
-        DATABASE_URL,
-        pool_pre_ping=True,
-        poolclass=NullPool,
-    )
-else:
+def _pool_disabled(url: str) -> bool:
+    # Prefer letting PgBouncer/Supabase pooler handle pooling in production.
+    # Defaults:
+    # - If DATABASE_URL contains "supabase", default to NullPool (open/close per request)
+    # - Otherwise, allow a very small QueuePool unless explicitly overridden
+    env = os.getenv("DB_DISABLE_POOL")
+    if env is None:
+        return "supabase" in url.lower()
+    return env.lower() in ("1", "true", "yes")
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited for a connection."""
+
+    metrics_label = "primary"
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except sa_exc.TimeoutError:
+            POOL_TIMEOUTS.inc(self.metrics_label)
+            raise
+        finally:
+            POOL_WAIT.observe(time.perf_counter() - start, self.metrics_label)
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.metrics_label = self.metrics_label
+        return pool
+
+
+def _make_engine(url: str, env_prefix: str):
+    if _pool_disabled(url):
+        return create_engine(
+            url,
+            pool_pre_ping=True,
+            poolclass=NullPool,
+        )
     engine = create_engine(
-        DATABASE_URL,
+        url,
         pool_pre_ping=True,
-        pool_size=int(os.getenv("DB_POOL_SIZE", "1")),
-        max_overflow=int(os.getenv("DB_MAX_OVERFLOW", "0")),
+        poolclass=TimedQueuePool,
+        pool_size=int(os.getenv(f"{env_prefix}_POOL_SIZE", os.getenv("DB_POOL_SIZE", "1"))),
+        max_overflow=int(os.getenv(f"{env_prefix}_MAX_OVERFLOW", os.getenv("DB_MAX_OVERFLOW", "0"))),
     )
-SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
+    engine.pool.metrics_label = "read" if env_prefix == "DB_READ" else "primary"
+    return engine
+
+
+def init_engine():
+    """Create the engine(s) and bind the session factories; idempotent."""
+    global _engine, _database_url, _read_engine
+    if _engine is not None:
+        return _engine
+    url = build_db_url()
+    engine = _make_engine(url, "DB")
+    SessionLocal.configure(bind=engine)
+    read_url = build_read_db_url()
+    if read_url:
+        _read_engine = _make_engine(read_url, "DB_READ")
+        ReadSessionLocal.configure(bind=_read_engine)
+    # Sizes the admission controllers; warns if a pool has no size (NullPool)
+    admission.check(engine, _read_engine)
+    _database_url, _engine = url, engine
+    return engine
+
+
+def get_engine():
+    return _engine if _engine is not None else init_engine()
+
+
+def get_read_engine():
+    """The replica engine, or None when DATABASE_READ_URL is not set."""
+    get_engine()
+    return _read_engine
+
+
+def dispose_engine() -> None:
+    global _engine, _read_engine
+    if _read_engine is not None:
+        _read_engine.dispose()
+        _read_engine = None
+        ReadSessionLocal.configure(bind=None)
+    if _engine is not None:
+        _engine.dispose()
+        _engine = None
+        SessionLocal.configure(bind=None)
+
+
+def __getattr__(name):
+    # Backwards compatible module attributes: app.database.engine / DATABASE_URL
+    if name == "engine":
+        return get_engine()
+    if name == "DATABASE_URL":
+        get_engine()
+        return _database_url
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+class _LazySessionmaker(sessionmaker):
+    def __call__(self, **local_kw):
+        if _engine is None and "bind" not in local_kw:
+            init_engine()
+        return super().__call__(**local_kw)
+
+
+SessionLocal = _LazySessionmaker(autoflush=False, autocommit=False)
+ReadSessionLocal = _LazySessionmaker(autoflush=False, autocommit=False)
+
+# ---------- read-your-writes pinning ----------
+# After a caller writes, their reads go to the primary for DB_READ_PIN_SECONDS
+# so replica lag never hides their own change. Callers are keyed by a hash of
+# their auth token. Process-local, like app/rate_limit.py.
+
+_pins: dict[str, float] = {}
+_pins_lock = threading.Lock()
+
+
+def _pin_seconds() -> float:
+    return float(os.getenv("DB_READ_PIN_SECONDS", "5"))
+
+
+def pin_key(request: Request) -> str | None:
+    auth = request.headers.get("authorization") or ""
+    token = auth[7:] if auth.lower().startswith("bearer ") else request.cookies.get(COOKIE_NAME)
+    if not token:
+        return None
+    return hashlib.sha1(token.encode("utf-8")).hexdigest()
+
+
+def pin_to_primary(key: str | None) -> None:
+    if not key:
+        return
+    until = time.monotonic() + _pin_seconds()
+    with _pins_lock:
+        _pins[key] = until
+        if len(_pins) > 10_000:
+            now = time.monotonic()
+            for k in [k for k, v in _pins.items() if v < now]:
+                del _pins[k]
+
+
+def is_pinned(key: str | None) -> bool:
+    if not key:
+        return False
+    until = _pins.get(key)
+    return until is not None and until > time.monotonic()
 
-def get_db():
-    db = SessionLocal()
+
+@event.listens_for(SessionLocal, "after_flush")
+def _mark_flush_write(session, flush_context):
+    session.info["wrote"] = True
+
+
+@event.listens_for(SessionLocal, "do_orm_execute")
+def _mark_dml_write(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info["wrote"] = True
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _pin_after_write(session):
+    if session.info.pop("wrote", False):
+        pin_to_primary(session.info.get("pin_key"))
+
+
+# ---------- per-route-class timeouts ----------
+# Each transaction on Postgres starts with SET LOCAL statement_timeout and
+# lock_timeout for the session's route class, so one pathological query
+# cannot hold a pooled connection indefinitely. SET LOCAL ends with the
+# transaction, which also keeps it safe behind PgBouncer transaction pooling.
+# Override with DB_STATEMENT_TIMEOUT_<CLASS>_MS / DB_LOCK_TIMEOUT_<CLASS>_MS;
+# 0 leaves the server default.
+
+ROUTE_READ = "read"
+ROUTE_WRITE = "write"
+ROUTE_BACKGROUND = "background"
+
+# (statement_timeout, lock_timeout) in milliseconds
+_TIMEOUT_DEFAULTS = {
+    ROUTE_READ: (5_000, 1_000),
+    ROUTE_WRITE: (10_000, 3_000),
+    ROUTE_BACKGROUND: (120_000, 10_000),
+}
+
+_SET_TIMEOUTS = text(
+    "SELECT set_config('statement_timeout', :statement, true), set_config('lock_timeout', :lock, true)"
+)
+
+
+def _env_ms(name: str, default: int) -> int:
     try:
-        yield db
-    finally:
-        db.close()
+        return max(int(os.getenv(name, str(default))), 0)
+    except ValueError:
+        return default
+
+
+def timeouts_for(route_class: str) -> tuple[int, int]:
+    """(statement_timeout_ms, lock_timeout_ms) for a route class."""
+    statement, lock = _TIMEOUT_DEFAULTS.get(route_class, _TIMEOUT_DEFAULTS[ROUTE_WRITE])
+    suffix = route_class.upper()
+    return (
+        _env_ms(f"DB_STATEMENT_TIMEOUT_{suffix}_MS", statement),
+        _env_ms(f"DB_LOCK_TIMEOUT_{suffix}_MS", lock),
+    )
+
+
+@event.listens_for(SessionLocal, "after_begin")
+@event.listens_for(ReadSessionLocal, "after_begin")
+def _apply_timeouts(session, transaction, connection):
+    route_class = session.info.get("route_class", ROUTE_WRITE)
+    connection.info["route_class"] = route_class
+    if connection.dialect.name != "postgresql":
+        return
+    statement, lock = timeouts_for(route_class)
+    if statement or lock:
+        connection.execute(_SET_TIMEOUTS, {"statement": f"{statement}ms", "lock": f"{lock}ms"})
+
+
+def timeout_kind(exc: BaseException) -> str | None:
+    """"statement" or "lock" when a DB error is a Postgres timeout, else None."""
+    orig = getattr(exc, "orig", exc)
+    code = getattr(orig, "pgcode", None) or getattr(orig, "sqlstate", None)
+    if code == "57014":  # query_canceled (statement_timeout)
+        return "statement"
+    if code == "55P03":  # lock_not_available (lock_timeout)
+        return "lock"
+    return None
+
+
+@event.listens_for(Engine, "handle_error")
+def _count_timeouts(context):
+    kind = timeout_kind(context.original_exception)
+    if kind is not None:
+        conn = context.connection
+        route_class = conn.info.get("route_class", "-") if conn is not None else "-"
+        DB_TIMEOUTS.inc(route_class, kind)
+
+
+def db_error_handler(request: Request, exc: sa_exc.DBAPIError):
+    """Statement timeouts become 504, lock timeouts 503; other DB errors stay 500s."""
+    kind = timeout_kind(exc)
+    if kind == "statement":
+        return JSONResponse(status_code=504, content={"detail": "Database query timed out"})
+    if kind == "lock":
+        return JSONResponse(
+            status_code=503, content={"detail": "Database busy, retry shortly"}, headers={"Retry-After": "1"}
+        )
+    raise exc
+
+
+def pool_timeout_handler(request: Request, exc: sa_exc.TimeoutError):
+    # Checkout timeouts are already counted by TimedQueuePool
+    return JSONResponse(
+        status_code=503, content={"detail": "Database busy, retry shortly"}, headers={"Retry-After": "1"}
+    )
+
+
+def background_session() -> Session:
+    """Session for cron and scheduler work, with the background timeouts."""
+    return SessionLocal(info={"route_class": ROUTE_BACKGROUND})
+
+
+def detached_session(db: Session) -> Session:
+    """A new session on ``db``'s engine and route class, for work that outlives ``db``.
+
+    StreamingResponse bodies run after the request's session is closed; this
+    keeps their reads on the same primary/replica choice and under the same
+    route-class timeouts. The caller closes it.
+    """
+    bind = db.get_bind()
+    factory = ReadSessionLocal if bind is _read_engine else SessionLocal
+    return factory(bind=bind, info={"route_class": db.info.get("route_class", ROUTE_READ)})
+
+
+def get_db(request: Request):
+    # The admission slot is held for as long as the session (app/admission.py)
+    with admission.slot(get_engine(), request.url.path):
+        db = SessionLocal()
+        db.info["pin_key"] = pin_key(request)
+        db.info["route_class"] = ROUTE_WRITE
+        try:
+            yield db
+        finally:
+            db.close()
+
+def get_read_db(request: Request):
+    """Session for read-only routes: the replica unless the caller just wrote."""
+    key = pin_key(request)
+    replica = get_read_engine() is not None and not is_pinned(key)
+    with admission.slot(get_read_engine() if replica else get_engine(), request.url.path):
+        db = ReadSessionLocal() if replica else SessionLocal()
+        db.info["pin_key"] = key
+        db.info["route_class"] = ROUTE_READ
+        try:
+            yield db
+        finally:
+            db.close()
+
+def get_lazy_read_db(request: Request):
+    """Opener for a get_read_db session, for routes that usually answer from memory.
+
+    Nothing is opened and no admission slot is taken until the route calls
+    it: ``with open_session() as db: ...``.
+    """
+    return lambda: contextmanager(get_read_db)(request)
@@ -3,7 +3,7 @@ from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer, HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.models import User
 from app.security import decode_token
 from app.security_cookies import COOKIE_NAME
@@ -45,6 +45,18 @@ def get_current_user_cookie(request: Request, db: Session = Depends(get_db)) ->
     token = request.cookies.get(COOKIE_NAME)
     return _user_from_token(token, db)
 
+def _user_from_request(request: Request, creds: HTTPAuthorizationCredentials | None, db: Session) -> User:
+    # Try Authorization header first
+    if creds and (creds.scheme or "").lower() == "bearer":
+        try:
+            return _user_from_token(creds.credentials, db)
+        except HTTPException:
+            # Fall through to cookie
+            pass
+    # Cookie fallback
+    token = request.cookies.get(COOKIE_NAME)
+    return _user_from_token(token, db)
+
 def get_current_user_any(
     request: Request,
     creds: HTTPAuthorizationCredentials = Depends(bearer_scheme),
@@ -56,16 +68,40 @@ def get_current_user_any(
       cross-site cookies may be blocked).
     - Otherwise, fall back to the cookie.
     """
-    # Try Authorization header first
+    return _user_from_request(request, creds, db)
+
+def get_current_user_any_read(
+    request: Request,
+    creds: HTTPAuthorizationCredentials = Depends(bearer_scheme),
+    db: Session = Depends(get_read_db),
+) -> User:
+    """Same as get_current_user_any, but loads the user through get_read_db."""
+    return _user_from_request(request, creds, db)
+
+def _user_id_from_token(token: str | None) -> int | None:
+    try:
+        sub = decode_token(token).get("sub") if token else None
+        return int(sub) if sub else None
+    except Exception:
+        return None
+
+def get_current_user_id(
+    request: Request,
+    creds: HTTPAuthorizationCredentials = Depends(bearer_scheme),
+) -> int:
+    """Caller's user id from a valid token (Bearer first, then cookie) without a DB lookup.
+
+    For hot in-memory endpoints only; anything that reads or writes rows
+    should use get_current_user_any and its existence check.
+    """
+    user_id = None
     if creds and (creds.scheme or "").lower() == "bearer":
-        try:
-            return _user_from_token(creds.credentials, db)
-        except HTTPException:
-            # Fall through to cookie
-            pass
-    # Cookie fallback
-    token = request.cookies.get(COOKIE_NAME)
-    return _user_from_token(token, db)
+        user_id = _user_id_from_token(creds.credentials)
+    if user_id is None:
+        user_id = _user_id_from_token(request.cookies.get(COOKIE_NAME))
+    if user_id is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
+    return user_id
 
 
 # # app/deps.py
@@ -0,0 +1,175 @@
+# app/email_breaker.py
+"""Circuit breakers and failover across email providers.
+
+Each provider ("vercel", "resend", "smtp") has a breaker. After
+EMAIL_BREAKER_FAILURES consecutive failures it opens and sends skip the
+provider immediately instead of waiting out its timeout. After
+EMAIL_BREAKER_RESET_SECONDS one probe is let through (half-open); success
+closes the breaker, failure re-opens it.
+
+``deliver`` walks the configured providers in order and returns the first
+success, so an open or failing provider fails over to the next one.
+"""
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Iterable
+
+from app.email_throttle import EmailThrottled
+from app.metrics import EMAILS, register_collector
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+log = logging.getLogger("app.email")
+
+
+class CircuitOpen(RuntimeError):
+    """Raised when every configured provider is unavailable."""
+
+
+class CircuitBreaker:
+    def __init__(self, name: str, failure_threshold: int = 3, reset_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = max(failure_threshold, 1)
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self.trips = 0
+        self.opened_at = 0.0
+        self.probing = False
+        self.successes_total = 0
+        self.failures_total = 0
+        self.rejected_total = 0
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = HALF_OPEN
+                self.probing = False
+            if self.state == HALF_OPEN and not self.probing:
+                self.probing = True
+                return True
+            self.rejected_total += 1
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.successes_total += 1
+            self.state = CLOSED
+            self.failures = 0
+            self.probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures_total += 1
+            self.failures += 1
+            self.probing = False
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != OPEN:
+                    self.trips += 1
+                    log.warning("Email provider %s circuit opened after %s failure(s)", self.name, self.failures)
+                self.state = OPEN
+                self.opened_at = time.monotonic()
+
+    def release(self) -> None:
+        """Give back a half-open probe slot without judging the provider."""
+        with self._lock:
+            self.probing = False
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "state": self.state,
+                "consecutive_failures": self.failures,
+                "trips": self.trips,
+                "successes": self.successes_total,
+                "failures": self.failures_total,
+                "rejected": self.rejected_total,
+            }
+
+
+_breakers: dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def breaker(provider: str) -> CircuitBreaker:
+    b = _breakers.get(provider)
+    if b is None:
+        with _breakers_lock:
+            b = _breakers.get(provider)
+            if b is None:
+                b = _breakers[provider] = CircuitBreaker(
+                    provider,
+                    failure_threshold=int(os.getenv("EMAIL_BREAKER_FAILURES", "3")),
+                    reset_timeout=float(os.getenv("EMAIL_BREAKER_RESET_SECONDS", "30")),
+                )
+    return b
+
+
+def deliver(attempts: Iterable[tuple[str, Callable[[], Any]]], kind: str = "email") -> Any:
+    """Run the first provider that succeeds, in order, skipping open circuits.
+
+    ``kind`` labels the emails_total metric (reset_code, reminder, contact).
+    Returns None when no provider is configured (empty ``attempts``).
+    Re-raises the last provider error when all of them fail.
+    """
+    last_exc: Exception | None = None
+    for provider, send in attempts:
+        b = breaker(provider)
+        if not b.allow():
+            EMAILS.inc(kind, provider, "skipped")
+            last_exc = CircuitOpen(f"email provider {provider} circuit is open")
+            continue
+        try:
+            result = send()
+        except EmailThrottled as e:
+            # Local pacing, not a provider fault: fail over without tripping
+            b.release()
+            EMAILS.inc(kind, provider, "throttled")
+            last_exc = e
+            continue
+        except Exception as e:
+            status = getattr(getattr(e, "response", None), "status_code", None)
+            if status is not None and 400 <= status < 500 and status != 429:
+                # The provider is up but rejected this request; try the next without tripping
+                b.release()
+            else:
+                b.record_failure()
+            log.error("Email provider %s failed: %s", provider, e)
+            EMAILS.inc(kind, provider, "failed")
+            last_exc = e
+            continue
+        b.record_success()
+        EMAILS.inc(kind, provider, "sent")
+        return result
+    if last_exc is not None:
+        raise last_exc
+    return None
+
+
+def snapshot() -> dict:
+    with _breakers_lock:
+        items = list(_breakers.items())
+    return {name: b.snapshot() for name, b in items}
+
+
+def _collect_metrics():
+    snap = snapshot()
+    yield "# HELP email_circuit_open Whether the provider's circuit is open (1) or half-open (0.5)."
+    yield "# TYPE email_circuit_open gauge"
+    for name, s in sorted(snap.items()):
+        value = {OPEN: 1, HALF_OPEN: 0.5}.get(s["state"], 0)
+        yield f'email_circuit_open{{provider="{name}"}} {value}'
+    yield "# HELP email_circuit_trips_total Times the provider's circuit opened."
+    yield "# TYPE email_circuit_trips_total counter"
+    for name, s in sorted(snap.items()):
+        yield f'email_circuit_trips_total{{provider="{name}"}} {s["trips"]}'
+
+
+register_collector(_collect_metrics)
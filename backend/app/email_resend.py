@@ -1,6 +1,8 @@
 import os
 import logging
 
+from app import email_breaker, email_throttle
+
 
 def _headers() -> dict:
     rk = os.getenv("RESEND_API_KEY")
@@ -22,63 +24,67 @@ def ensure_contact(email: str, name: str | None = None) -> bool:
         logging.getLogger("app.email").debug("No RESEND_AUDIENCE_ID set; skipping contact upsert for %s", email)
         return False
 
-    # Prefer Vercel function relay if configured
+    attempts = []
+
+    # Prefer Vercel function relay if configured; Resend directly is the failover
     vercel_upsert = os.getenv("VERCEL_RESEND_UPSERT_URL")
     if vercel_upsert:
-        import httpx
-        headers = {"x-api-key": (os.getenv("EMAIL_TEST_SECRET") or os.getenv("CRON_SECRET") or "")}
-        payload = {"email": email, "name": name}
-        r = httpx.post(vercel_upsert, json=payload, headers=headers, timeout=10.0)
-        if r.status_code in (200, 201):
-            logging.getLogger("app.email").info("Vercel ensured contact: %s", email)
-            return True
-        if r.status_code == 409:
-            logging.getLogger("app.email").info("Vercel contact already exists: %s", email)
-            return True
-        body = None
-        try:
-            body = r.json()
-        except Exception:
-            body = r.text
-        logging.getLogger("app.email").error("Vercel upsert failed %s body=%s", r.status_code, body)
-        r.raise_for_status()
-        return False
+        def via_vercel() -> bool:
+            headers = {"x-api-key": (os.getenv("EMAIL_TEST_SECRET") or os.getenv("CRON_SECRET") or "")}
+            payload = {"email": email, "name": name}
+            r = email_throttle.post("vercel", vercel_upsert, json=payload, headers=headers, timeout=10.0)
+            if r.status_code in (200, 201):
+                logging.getLogger("app.email").info("Vercel ensured contact: %s", email)
+                return True
+            if r.status_code == 409:
+                logging.getLogger("app.email").info("Vercel contact already exists: %s", email)
+                return True
+            body = None
+            try:
+                body = r.json()
+            except Exception:
+                body = r.text
+            logging.getLogger("app.email").error("Vercel upsert failed %s body=%s", r.status_code, body)
+            r.raise_for_status()
+            return False
+        attempts.append(("vercel", via_vercel))
 
-    payload = {
-        "email": email,
-        "audience_id": audience_id,
-        # Optional metadata
-    }
-    if name:
-        payload["first_name"] = name
+    if os.getenv("RESEND_API_KEY") or not vercel_upsert:
+        def via_resend() -> bool:
+            payload = {
+                "email": email,
+                "audience_id": audience_id,
+                # Optional metadata
+            }
+            if name:
+                payload["first_name"] = name
 
-    import httpx
+            r = email_throttle.post(
+                "resend",
+                "https://api.resend.com/contacts",
+                headers=_headers(),
+                json=payload,
+                timeout=10.0,
+            )
+            if r.status_code in (200, 201):
+                logging.getLogger("app.email").info("Resend contact ensured: %s", email)
+                return True
+            # Some Resend APIs return 409 on existing; treat as success
+            if r.status_code == 409:
+                logging.getLogger("app.email").info("Resend contact already exists: %s", email)
+                return True
+            # Log body for visibility
+            body = None
+            try:
+                body = r.json()
+            except Exception:
+                body = r.text
+            logging.getLogger("app.email").error("Resend contact upsert failed %s body=%s", r.status_code, body)
+            r.raise_for_status()
+            return False
+        attempts.append(("resend", via_resend))
 
-    try:
-        r = httpx.post(
-            "https://api.resend.com/contacts",
-            headers=_headers(),
-            json=payload,
-            timeout=10.0,
-        )
-        if r.status_code in (200, 201):
-            logging.getLogger("app.email").info("Resend contact ensured: %s", email)
-            return True
-        # Some Resend APIs return 409 on existing; treat as success
-        if r.status_code == 409:
-            logging.getLogger("app.email").info("Resend contact already exists: %s", email)
-            return True
-        # Log body for visibility
-        body = None
-        try:
-            body = r.json()
-        except Exception:
-            body = r.text
-        logging.getLogger("app.email").error("Resend contact upsert failed %s body=%s", r.status_code, body)
-        r.raise_for_status()
-    except Exception:
-        raise
-    return False
+    return bool(email_breaker.deliver(attempts, kind="contact"))
 
 
 def sync_all_users(users: list[tuple[int, str, str | None]]) -> dict:
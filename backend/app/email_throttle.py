@@ -0,0 +1,152 @@
+# app/email_throttle.py
+"""Process-wide outbound email throttle.
+
+One token bucket per provider ("resend", "vercel", "smtp"), shared by every
+sender (reminder digests, reset codes, audience contact upserts), so a burst
+never exceeds the provider's per-second limit. Rates come from
+EMAIL_RATE_<PROVIDER> (requests/second) and EMAIL_BURST_<PROVIDER>.
+
+Transactional sends (reset codes) jump ahead of bulk sends (digests, contact
+upserts) waiting on the same bucket. A 429 blocks the bucket for the
+provider's Retry-After before the request is retried.
+
+Process-local like app/rate_limit.py; with several workers, divide the
+provider limit between them.
+"""
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+from app.metrics import OUTBOUND_LATENCY
+
+TRANSACTIONAL = "transactional"
+BULK = "bulk"
+
+# Resend's default account limit is 2 requests/second; the Vercel relay forwards to Resend.
+_DEFAULT_RATES = {"resend": 2.0, "vercel": 2.0, "smtp": 1.0}
+
+log = logging.getLogger("app.email")
+
+
+class EmailThrottled(RuntimeError):
+    """Raised when a send could not get a slot within the allowed wait."""
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: float):
+        self.rate = max(rate, 0.001)
+        self.capacity = max(burst, 1.0)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.priority_waiters = 0
+        self.cond = threading.Condition()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self, priority: str = BULK, max_wait: float = 30.0) -> None:
+        deadline = time.monotonic() + max_wait
+        urgent = priority == TRANSACTIONAL
+        with self.cond:
+            if urgent:
+                self.priority_waiters += 1
+            try:
+                while True:
+                    now = time.monotonic()
+                    self._refill(now)
+                    if now < self.blocked_until:
+                        wait = self.blocked_until - now
+                    elif not urgent and self.priority_waiters:
+                        wait = 1.0 / self.rate  # let transactional sends go first
+                    elif self.tokens >= 1.0:
+                        self.tokens -= 1.0
+                        return
+                    else:
+                        wait = (1.0 - self.tokens) / self.rate
+                    remaining = deadline - now
+                    if remaining <= 0:
+                        raise EmailThrottled("email provider rate limit: no slot available")
+                    self.cond.wait(min(wait, remaining))
+            finally:
+                if urgent:
+                    self.priority_waiters -= 1
+                    self.cond.notify_all()
+
+    def block_for(self, seconds: float) -> None:
+        with self.cond:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+            self.tokens = 0.0
+
+
+_buckets: dict[str, TokenBucket] = {}
+_buckets_lock = threading.Lock()
+
+
+def bucket(provider: str) -> TokenBucket:
+    b = _buckets.get(provider)
+    if b is None:
+        with _buckets_lock:
+            b = _buckets.get(provider)
+            if b is None:
+                key = provider.upper()
+                rate = float(os.getenv(f"EMAIL_RATE_{key}", _DEFAULT_RATES.get(provider, 1.0)))
+                burst = float(os.getenv(f"EMAIL_BURST_{key}", max(rate, 1.0)))
+                b = _buckets[provider] = TokenBucket(rate, burst)
+    return b
+
+
+def _max_wait() -> float:
+    return float(os.getenv("EMAIL_THROTTLE_MAX_WAIT", "30"))
+
+
+def retry_after_seconds(value: str | None, default: float = 1.0) -> float:
+    """Parse a Retry-After header (delta-seconds or HTTP-date)."""
+    if not value:
+        return default
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+        return max((when - datetime.now(timezone.utc)).total_seconds(), 0.0)
+    except Exception:
+        return default
+
+
+@contextmanager
+def slot(provider: str, priority: str = BULK):
+    """Wait for a send slot on ``provider`` (used around SMTP sends)."""
+    bucket(provider).acquire(priority, _max_wait())
+    yield
+
+
+def post(provider: str, url: str, *, priority: str = BULK, max_retries: int = 2, **kwargs):
+    """Throttled ``httpx.post``; retries 429s after the provider's Retry-After.
+
+    Returns the final response; callers keep their own status handling.
+    """
+    import httpx
+
+    b = bucket(provider)
+    for attempt in range(max_retries + 1):
+        b.acquire(priority, _max_wait())
+        start = time.perf_counter()
+        try:
+            r = httpx.post(url, **kwargs)
+        except Exception:
+            OUTBOUND_LATENCY.observe(time.perf_counter() - start, provider, "error")
+            raise
+        OUTBOUND_LATENCY.observe(time.perf_counter() - start, provider, str(r.status_code))
+        if r.status_code != 429 or attempt == max_retries:
+            return r
+        delay = retry_after_seconds(r.headers.get("retry-after"))
+        log.warning("%s rate limited (429); retrying in %.1fs", provider, delay)
+        b.block_for(delay)
+    return r
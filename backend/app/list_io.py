@@ -0,0 +1,224 @@
+# app/list_io.py
+"""Streaming list export and bulk import.
+
+Export reads list_item through a server-side cursor (``stream_results``)
+and yields CSV or NDJSON one batch at a time, so memory stays flat no
+matter how long the list is. It runs in a session of its own that keeps the
+request's route class (timeouts) and primary/replica choice.
+
+Import reads the request body incrementally, validates each record with
+``ItemCreate`` and writes IMPORT_CHUNK_ROWS rows at a time: one batched
+``INSERT`` per chunk, or ``COPY ... FROM STDIN`` on Postgres (psycopg2).
+Only one chunk is held in memory at a time. Items imported as purchased
+count in purchase_stat, one upsert per chunk.
+"""
+import codecs
+import csv
+import io
+import json
+import os
+from datetime import date
+from typing import Callable, Iterable, Iterator
+
+import anyio.from_thread
+from fastapi import HTTPException, Request
+from pydantic import ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from app import ordering, purchase_stats
+from app.fast_json import dumps
+from app.models import ListItem
+from app.schemas import ItemCreate
+
+FORMATS = {"csv": "text/csv; charset=utf-8", "ndjson": "application/x-ndjson"}
+FIELDS = ("name", "quantity", "expiry", "description", "remind_on", "purchased")
+
+# A single line longer than this is rejected instead of buffered
+MAX_LINE_BYTES = 1 << 20
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+# ---------- export ----------
+
+def _csv_value(v):
+    if v is None:
+        return ""
+    if isinstance(v, bool):
+        return "true" if v else "false"
+    if isinstance(v, date):
+        return v.isoformat()
+    return v
+
+
+def iter_export(open_session: Callable[[], Session], list_id: int, fmt: str, batch: int = 1000) -> Iterator[bytes]:
+    """Yield the list's items as CSV (with header) or NDJSON, ``batch`` rows per chunk.
+
+    Reads through a session from ``open_session`` (``database.detached_session``):
+    the request's session is closed before the response body is streamed.
+    """
+    stmt = (
+        select(*(getattr(ListItem, f) for f in FIELDS))
+        .where(ListItem.list_id == list_id)
+        .order_by(ListItem.position, ListItem.id)
+        .execution_options(stream_results=True, yield_per=batch)
+    )
+    buf = io.StringIO()
+    writer = csv.writer(buf, lineterminator="\n")
+    if fmt == "csv":
+        writer.writerow(FIELDS)
+    with open_session() as db:
+        result = db.execute(stmt)
+        for rows in result.partitions():
+            if fmt == "csv":
+                writer.writerows([_csv_value(v) for v in row] for row in rows)
+                chunk = buf.getvalue().encode("utf-8")
+                buf.seek(0)
+                buf.truncate()
+            else:
+                chunk = b"".join(dumps(dict(zip(FIELDS, row))) + b"\n" for row in rows)
+            yield chunk
+    if fmt == "csv" and buf.tell():
+        yield buf.getvalue().encode("utf-8")
+
+
+# ---------- import ----------
+
+def body_lines(request: Request) -> Iterator[str]:
+    """Iterate the request body as text lines (newline kept) from a sync route.
+
+    Pulls chunks off the ASGI stream through the event loop, so the upload
+    is never read into memory as a whole.
+    """
+    stream = request.stream()
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    while True:
+        try:
+            chunk = anyio.from_thread.run(stream.__anext__)
+        except StopAsyncIteration:
+            break
+        try:
+            pending += decoder.decode(chunk)
+        except UnicodeDecodeError:
+            raise HTTPException(status_code=400, detail="Upload must be UTF-8")
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line + "\n"
+        if len(pending) > MAX_LINE_BYTES:
+            raise HTTPException(status_code=413, detail="Line too long")
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending
+
+
+def _records(lines: Iterable[str], fmt: str) -> Iterator[tuple[int, dict]]:
+    if fmt == "ndjson":
+        for lineno, line in enumerate(lines, start=1):
+            if not line.strip():
+                continue
+            try:
+                rec = json.loads(line)
+            except ValueError:
+                raise HTTPException(status_code=422, detail=f"Line {lineno}: invalid JSON")
+            if not isinstance(rec, dict):
+                raise HTTPException(status_code=422, detail=f"Line {lineno}: expected an object")
+            yield lineno, rec
+        return
+    reader = csv.DictReader(lines)
+    if not reader.fieldnames or "name" not in reader.fieldnames:
+        raise HTTPException(status_code=422, detail="CSV header must include a 'name' column")
+    for rec in reader:
+        # Empty cells mean "not set"; unknown columns are ignored
+        yield reader.line_num, {k: v for k, v in rec.items() if k in FIELDS and v not in ("", None)}
+
+
+def _row(list_id: int, lineno: int, rec: dict) -> dict:
+    try:
+        item = ItemCreate.model_validate(rec)
+    except ValidationError as e:
+        err = e.errors()[0]
+        where = ".".join(str(p) for p in err["loc"])
+        raise HTTPException(status_code=422, detail=f"Line {lineno}: {where}: {err['msg']}")
+    name = item.name.strip()
+    if not name:
+        raise HTTPException(status_code=422, detail=f"Line {lineno}: name: must not be empty")
+    return {
+        "name": name,
+        "quantity": item.quantity,
+        "expiry": item.expiry,
+        "description": item.description or None,
+        "remind_on": item.remind_on,
+        "purchased": bool(item.purchased),
+        "list_id": list_id,
+    }
+
+
+_COLUMNS = FIELDS + ("list_id", "seq", "position")
+_INSERT = insert(ListItem.__table__)
+
+
+def _copy_rows(db: Session, rows: list[dict]) -> None:
+    buf = io.StringIO()
+    writer = csv.writer(buf, lineterminator="\n")
+    writer.writerows([_csv_value(r[c]) for c in _COLUMNS] for r in rows)
+    buf.seek(0)
+    raw = db.connection().connection
+    with raw.cursor() as cur:
+        cur.copy_expert(f"COPY list_item ({', '.join(_COLUMNS)}) FROM STDIN WITH (FORMAT csv)", buf)
+
+
+def _insert_rows(db: Session, rows: list[dict]) -> None:
+    conn = db.connection()
+    if conn.dialect.name == "postgresql" and conn.dialect.driver == "psycopg2":
+        _copy_rows(db, rows)
+    else:
+        # Core executemany on the cached INSERT: the driver batches it
+        # (multi-row VALUES on psycopg, a prepared loop on SQLite) without
+        # compiling a statement per chunk.
+        conn.execute(_INSERT, rows)
+    db.info["wrote"] = True  # both paths bypass the ORM events that mark the session
+
+
+def _insert_chunk(db: Session, rows: list[dict], last: str, owner_id: int | None) -> str:
+    # Appended in file order after ``last``, with keys of a fixed short length
+    for row, key in zip(rows, ordering.spread(len(rows), ordering.key_between(last, None))):
+        row["position"] = key
+    _insert_rows(db, rows)
+    if owner_id is not None:
+        purchase_stats.record_purchases(db, owner_id, [r["name"] for r in rows if r["purchased"]])
+    return rows[-1]["position"]
+
+
+def import_items(
+    db: Session, list_id: int, lines: Iterable[str], fmt: str,
+    seq: int = 0, after: str = "", owner_id: int | None = None,
+) -> int:
+    """Validate and insert every record, stamped with sync ``seq`` and positioned after key ``after``.
+
+    Purchased records count in ``owner_id``'s purchase_stat when given.
+    The caller commits (or rolls back on error).
+    """
+    chunk_rows = max(_env_int("IMPORT_CHUNK_ROWS", 1000), 1)
+    max_rows = _env_int("IMPORT_MAX_ROWS", 200_000)
+    chunk: list[dict] = []
+    total = 0
+    for lineno, rec in _records(lines, fmt):
+        total += 1
+        if total > max_rows:
+            raise HTTPException(status_code=413, detail=f"Import is limited to {max_rows} items")
+        row = _row(list_id, lineno, rec)
+        row["seq"] = seq
+        chunk.append(row)
+        if len(chunk) >= chunk_rows:
+            after = _insert_chunk(db, chunk, after, owner_id)
+            chunk = []
+    if chunk:
+        _insert_chunk(db, chunk, after, owner_id)
+    return total
@@ -0,0 +1,143 @@
+# app/list_purge.py
+"""Background purge of deleted lists.
+
+DELETE /lists/{id} only sets ``grocery_list.deleted_at``; the list is hidden
+from then on and the request does the same work for ten items or a million.
+The rows are removed here, LIST_PURGE_BATCH items per transaction, so no
+single statement holds locks or a connection for long. The list row goes
+last; ON DELETE CASCADE takes its shares (and, on Postgres, the reminder
+queue entries of every deleted item).
+
+Runs from POST /tasks/purge-lists (cron) and, with LIST_PURGER=1, from an
+in-process thread that DELETE /lists/{id} wakes up.
+"""
+import logging
+import os
+import threading
+import time
+
+from sqlalchemy import delete, select
+
+from app.models import GroceryList, ListItem, ReminderQueue
+
+log = logging.getLogger("app.list_purge")
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+def purge_batch(db, list_id: int, batch: int) -> int:
+    """Delete up to ``batch`` items of one list and commit; returns how many went."""
+    ids = db.execute(
+        select(ListItem.id).where(ListItem.list_id == list_id).limit(batch)
+    ).scalars().all()
+    if ids:
+        if db.get_bind().dialect.name != "postgresql":
+            # SQLite only enforces ON DELETE CASCADE with PRAGMA foreign_keys=ON
+            db.execute(delete(ReminderQueue).where(ReminderQueue.item_id.in_(ids)))
+        db.execute(delete(ListItem).where(ListItem.id.in_(ids)))
+    db.commit()
+    return len(ids)
+
+
+def purge_deleted_lists(db, batch: int | None = None, max_seconds: float | None = None) -> dict:
+    """Purge tombstoned lists, oldest first, until done or ``max_seconds`` runs out."""
+    batch = batch or max(_env_int("LIST_PURGE_BATCH", 1000), 1)
+    max_seconds = max_seconds if max_seconds is not None else _env_int("LIST_PURGE_MAX_SECONDS", 20)
+    deadline = time.monotonic() + max_seconds
+    lists = items = 0
+    while time.monotonic() < deadline:
+        list_ids = db.execute(
+            select(GroceryList.id)
+            .where(GroceryList.deleted_at.is_not(None))
+            .order_by(GroceryList.deleted_at)
+            .limit(50)
+        ).scalars().all()
+        db.commit()
+        if not list_ids:
+            return {"lists": lists, "items": items, "remaining": False}
+        for list_id in list_ids:
+            while True:
+                n = purge_batch(db, list_id, batch)
+                items += n
+                if n < batch or time.monotonic() >= deadline:
+                    break
+            if n < batch:
+                db.execute(delete(GroceryList).where(GroceryList.id == list_id))
+                db.commit()
+                lists += 1
+            if time.monotonic() >= deadline:
+                break
+    return {"lists": lists, "items": items, "remaining": True}
+
+
+class ListPurger:
+    """Daemon thread that purges whenever notified, and every LIST_PURGE_INTERVAL_SECONDS."""
+
+    def __init__(self, session_factory):
+        self.session_factory = session_factory
+        self.interval = _env_int("LIST_PURGE_INTERVAL_SECONDS", 3600)
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="list-purger", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def notify(self) -> None:
+        self._wake.set()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._wake.clear()
+            db = self.session_factory()
+            try:
+                report = purge_deleted_lists(db)
+                if report["lists"] or report["items"]:
+                    log.info("Purged %s list(s), %s item(s)", report["lists"], report["items"])
+            except Exception:
+                log.exception("List purge failed")
+                report = {"remaining": False}
+            finally:
+                db.close()
+            if not report["remaining"]:
+                self._wake.wait(self.interval)
+
+
+_purger: ListPurger | None = None
+
+
+def start_purger() -> ListPurger | None:
+    """Start the purge thread if LIST_PURGER is enabled; returns it or None."""
+    global _purger
+    if os.getenv("LIST_PURGER", "").lower() not in ("1", "true", "yes"):
+        return None
+    from app.database import background_session
+
+    _purger = ListPurger(background_session)
+    _purger.start()
+    return _purger
+
+
+def stop_purger() -> None:
+    global _purger
+    if _purger is not None:
+        _purger.stop()
+        _purger = None
+
+
+def notify() -> None:
+    """Wake the purge thread after a list was tombstoned (no-op when it is off)."""
+    if _purger is not None:
+        _purger.notify()
@@ -1,11 +1,21 @@
 # app/main.py
 import os
-import sqlalchemy
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from starlette.middleware.sessions import SessionMiddleware
 
-from app.database import engine
+from sqlalchemy import exc as sa_exc
+
+from app.database import init_engine, dispose_engine, db_error_handler, pool_timeout_handler
+from app.request_timing import ServerTimingMiddleware
+from app.metrics import MetricsMiddleware
+from app.profiling import ProfilingMiddleware, start_background_sampler, stop_background_sampler
+# Routers load eagerly: every route must be registered before the first
+# request, so deferring them would only move the cost there. What they pull
+# in that is heavy and rarely used (authlib, argon2, httpx) is imported on
+# first use instead; benchmarks/startup.py (LAZY_MODULES) enforces that.
 from app.routers.lists import router as lists_router
 from app.routers.auth import router as auth_router
 google_router = None
@@ -17,6 +27,14 @@ except Exception:
     google_router = None
 from app.routers.me import router as me_router
 from app.routers.tasks import router as tasks_router
+from app.routers.metrics import router as metrics_router
+from app.routers.items import router as items_router
+from app.routers.search import router as search_router
+from app.routers.suggest import router as suggest_router
+from app.routers.stats import router as stats_router
+from app.routers.sync import router as sync_router
+from app.reminder_scheduler import start_scheduler, stop_scheduler
+from app.list_purge import start_purger, stop_purger
 try:
     from app.routers.email_test import router as email_test_router
 except Exception:
@@ -33,7 +51,29 @@ COOKIE_SECURE = (os.getenv("COOKIE_SECURE", "false") or "false").lower() in ("1"
 if COOKIE_SAMESITE == "none" and not COOKIE_SECURE:
     COOKIE_SECURE = True
 
-app = FastAPI(title="SmartGrocery Lite API", version="0.1.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Engine is created here, not at import time (keeps cold starts cheap)
+    init_engine()
+    # Optional in-process reminder scheduler (REMINDER_SCHEDULER=1)
+    start_scheduler()
+    # Optional in-process purge of deleted lists (LIST_PURGER=1)
+    start_purger()
+    # Optional low-rate hot-stack sampler (PROFILE_SAMPLE_HZ)
+    start_background_sampler()
+    try:
+        yield
+    finally:
+        stop_background_sampler()
+        stop_purger()
+        stop_scheduler()
+        dispose_engine()
+
+app = FastAPI(title="SmartGrocery Lite API", version="0.1.0", lifespan=lifespan)
+
+# statement_timeout -> 504, lock_timeout / pool checkout timeout -> 503
+app.add_exception_handler(sa_exc.DBAPIError, db_error_handler)
+app.add_exception_handler(sa_exc.TimeoutError, pool_timeout_handler)
 
 # Trust Koyeb/X-Forwarded-* headers
 
@@ -53,12 +93,25 @@ app.add_middleware(
     https_only=COOKIE_SECURE,
 )
 
+# Per-request SQL count/time -> Server-Timing header + slow-request log
+app.add_middleware(ServerTimingMiddleware)
+# Requests with a valid x-profile header run under the stack sampler
+app.add_middleware(ProfilingMiddleware)
+# Route latency histograms and in-flight gauge for GET /metrics
+app.add_middleware(MetricsMiddleware)
+
 app.include_router(lists_router)
 app.include_router(auth_router)
 if google_router is not None:
     app.include_router(google_router)
 app.include_router(me_router)
+app.include_router(items_router)
+app.include_router(search_router)
+app.include_router(suggest_router)
+app.include_router(stats_router)
+app.include_router(sync_router)
 app.include_router(tasks_router)
+app.include_router(metrics_router)
 if email_test_router is not None:
     app.include_router(email_test_router)
 
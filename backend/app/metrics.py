@@ -0,0 +1,215 @@
+# app/metrics.py
+"""Process-local Prometheus metrics, rendered by GET /metrics.
+
+Recording is lock-free: every thread writes to its own shard (a plain dict
+reached through threading.local), so the event loop and the threadpool
+workers never contend. A lock is taken once per thread to register its
+shard, and at scrape time to list the shards, which are then summed.
+
+With several workers each process exposes its own numbers; Prometheus
+aggregates across instances as usual.
+"""
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterable
+
+# Seconds; covers fast reads through slow outbound calls
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_local = threading.local()
+_shards: list[dict] = []
+_shards_lock = threading.Lock()
+_metrics: list["_Metric"] = []
+_collectors: list[Callable[[], Iterable[str]]] = []
+
+
+def _shard() -> dict:
+    shard = getattr(_local, "shard", None)
+    if shard is None:
+        shard = _local.shard = {}
+        with _shards_lock:
+            _shards.append(shard)
+    return shard
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: tuple, values: tuple, extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _fmt(v: float) -> str:
+    if v == float("inf"):
+        return "+Inf"
+    return repr(float(v)) if isinstance(v, float) else str(v)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames: tuple = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        _metrics.append(self)
+
+    def _merged(self) -> dict:
+        with _shards_lock:
+            shards = list(_shards)
+        merged: dict = {}
+        for shard in shards:
+            for (metric, labels), value in list(shard.items()):
+                if metric is self:
+                    merged[labels] = self._add(merged.get(labels), value)
+        return merged
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for labels, value in sorted(self._merged().items(), key=lambda kv: tuple(map(str, kv[0]))):
+            lines.extend(self._lines(labels, value))
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, *labels, amount: float = 1) -> None:
+        shard = _shard()
+        key = (self, labels)
+        shard[key] = shard.get(key, 0) + amount
+
+    @staticmethod
+    def _add(a, b):
+        return (a or 0) + b
+
+    def _lines(self, labels, value):
+        return [f"{self.name}{_labels(self.labelnames, labels)} {_fmt(value)}"]
+
+
+class Gauge(Counter):
+    """Up/down gauge; each shard holds its thread's net delta."""
+
+    kind = "gauge"
+
+    def dec(self, *labels, amount: float = 1) -> None:
+        self.inc(*labels, amount=-amount)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: tuple = (), buckets: tuple = DEFAULT_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, *labels) -> None:
+        shard = _shard()
+        key = (self, labels)
+        cell = shard.get(key)
+        if cell is None:
+            # per-bucket counts (last is +Inf), then sum
+            cell = shard[key] = [0] * (len(self.buckets) + 1) + [0.0]
+        cell[bisect.bisect_left(self.buckets, value)] += 1
+        cell[-1] += value
+
+    @contextmanager
+    def time(self, *labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *labels)
+
+    @staticmethod
+    def _add(a, b):
+        return list(b) if a is None else [x + y for x, y in zip(a, b)]
+
+    def _lines(self, labels, cell):
+        lines, cumulative = [], 0
+        for bound, count in zip(self.buckets + (float("inf"),), cell[:-1]):
+            cumulative += count
+            le = 'le="' + _fmt(bound) + '"'
+            lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}")
+        lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {_fmt(cell[-1])}")
+        lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+
+def register_collector(fn: Callable[[], Iterable[str]]) -> None:
+    """Add a callback producing exposition lines at scrape time (for state owned elsewhere)."""
+    _collectors.append(fn)
+
+
+def render() -> str:
+    lines: list[str] = []
+    for metric in _metrics:
+        lines.extend(metric.render())
+    for collect in _collectors:
+        lines.extend(collect())
+    return "\n".join(lines) + "\n"
+
+
+# ---------- application metrics ----------
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds", "Request latency by route template.", ("method", "route", "status")
+)
+IN_FLIGHT = Gauge("http_requests_in_flight", "Requests currently being served.")
+POOL_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds", "Time spent waiting for a pooled DB connection.", ("pool",),
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0),
+)
+POOL_TIMEOUTS = Counter("db_pool_checkout_timeouts_total", "Checkouts that gave up waiting.", ("pool",))
+OUTBOUND_LATENCY = Histogram(
+    "outbound_request_duration_seconds", "Outbound HTTP call latency by provider.", ("provider", "status")
+)
+EMAILS = Counter("emails_total", "Email deliveries by kind, provider and result.", ("kind", "provider", "result"))
+RATE_LIMITED = Counter("rate_limit_rejections_total", "Requests rejected by app.rate_limit.", ("scope",))
+REMINDER_STAGE = Histogram(
+    "reminder_run_stage_seconds", "Reminder run duration by stage.", ("trigger", "stage"),
+    buckets=(0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0),
+)
+DB_TIMEOUTS = Counter(
+    "db_timeouts_total", "Statements cancelled by statement_timeout or lock_timeout.", ("route_class", "kind")
+)
+ADMISSION_WAIT = Histogram(
+    "admission_wait_seconds", "Time admitted requests queued for a DB slot.", ("lane",),
+    buckets=(0.001, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+ADMISSION_SHED = Counter("admission_shed_total", "Requests shed with 503 by admission control.", ("lane", "reason"))
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware recording latency per route template and in-flight requests."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        IN_FLIGHT.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            IN_FLIGHT.dec()
+            route = scope.get("route")
+            # Route template, never the raw path, to keep label cardinality bounded
+            template = getattr(route, "path", None) or "unmatched"
+            REQUEST_LATENCY.observe(time.perf_counter() - start, scope.get("method", ""), template, str(status))
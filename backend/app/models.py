@@ -1,9 +1,10 @@
 # backend/app/models.py
 from datetime import date, datetime
 from sqlalchemy import (
-    Column, String, Integer, Date, DateTime, Boolean, ForeignKey, func, Index
+    BigInteger, Column, String, Integer, Date, DateTime, Boolean, Float, ForeignKey, func, Index, text
 )
 from sqlalchemy.orm import DeclarativeBase, relationship
+from sqlalchemy import DDL, event
 import enum
 from sqlalchemy import Enum as SAEnum, UniqueConstraint
 
@@ -38,6 +39,9 @@ class User(Base):
         passive_deletes=True,
     )
 
+# Case-insensitive email lookups (bulk sharing resolves lower(email) IN (...))
+Index("ix_user_email_lower", func.lower(User.email))
+
 class GroceryList(Base):
     __tablename__ = "grocery_list"
 
@@ -47,6 +51,10 @@ class GroceryList(Base):
 
     # 👇 add/ensure this line exists
     created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    # Tombstone: set by DELETE /lists/{id}; app/list_purge.py removes the rows later
+    deleted_at = Column(DateTime(timezone=True), nullable=True)
+    # Change stamp of the last rename or delete of the list itself (see app/sync.py)
+    change_seq = Column(BigInteger, nullable=False, server_default="0")
 
     owner = relationship("User", back_populates="lists")
     items = relationship(
@@ -61,6 +69,17 @@ class GroceryList(Base):
         cascade="all, delete-orphan",
         passive_deletes=True,
     )
+
+    # Fetch created_at with the INSERT (RETURNING) instead of a follow-up SELECT
+    __mapper_args__ = {"eager_defaults": True}
+    __table_args__ = (
+        # Only tombstoned lists are indexed; the purger's scan stays tiny
+        Index(
+            "ix_grocery_list_deleted_at", "deleted_at",
+            postgresql_where=text("deleted_at IS NOT NULL"),
+            sqlite_where=text("deleted_at IS NOT NULL"),
+        ),
+    )
 # class GroceryList(Base):
 #     __tablename__ = "grocery_list"
 
@@ -103,6 +122,16 @@ class ListItem(Base):
     reminded_at = Column(DateTime(timezone=True), nullable=True)
     # Shopping state
     purchased = Column(Boolean, nullable=False, server_default="false")
+    # Change stamp of the item's last write (delta sync, app/sync.py)
+    seq = Column(BigInteger, nullable=False, server_default="0")
+    # Optimistic concurrency: bumped on every update, exposed as the item's ETag
+    version = Column(Integer, nullable=False, server_default="1")
+    # Fractional sort key (app/ordering.py); "" for items never positioned
+    position = Column(
+        String().with_variant(String(collation="C"), "postgresql"),
+        nullable=False,
+        server_default="",
+    )
 
     list_id = Column(
         Integer,
@@ -111,6 +140,59 @@ class ListItem(Base):
     )
 
     grocery_list = relationship("GroceryList", back_populates="items")
+
+    __table_args__ = (
+        # GET /items/expiring: per-list range scan on expiry
+        Index("ix_list_item_list_expiry", "list_id", "expiry"),
+        Index("ix_list_item_list_seq", "list_id", "seq"),
+        # GET /lists/{id}/items: ORDER BY position, and max(position) on append
+        Index("ix_list_item_list_position", "list_id", "position"),
+    )
+
+
+# ---------- item search indexes (queried by app/search.py) ----------
+# Postgres: trigram GIN on name and a tsvector GIN on name + description
+# (the Alembic migration builds the same indexes CONCURRENTLY).
+# SQLite: an external-content FTS5 table kept in step by triggers. It is
+# only created when the SQLite build has FTS5; search falls back to LIKE
+# otherwise.
+
+SEARCH_DOCUMENT_SQL = (
+    "to_tsvector('simple', coalesce(list_item.name, '') || ' ' || coalesce(list_item.description, ''))"
+)
+
+for _stmt in (
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS ix_list_item_name_trgm ON list_item USING gin (name gin_trgm_ops)",
+    f"CREATE INDEX IF NOT EXISTS ix_list_item_search_tsv ON list_item USING gin (({SEARCH_DOCUMENT_SQL}))",
+):
+    event.listen(ListItem.__table__, "after_create", DDL(_stmt).execute_if(dialect="postgresql"))
+
+
+def _sqlite_has_fts5(ddl, target, bind, **kw) -> bool:
+    return any("ENABLE_FTS5" in row[0] for row in bind.exec_driver_sql("PRAGMA compile_options"))
+
+
+for _stmt in (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS list_item_fts USING fts5("
+    "name, description, content='list_item', content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER IF NOT EXISTS list_item_fts_ai AFTER INSERT ON list_item BEGIN "
+    "INSERT INTO list_item_fts(rowid, name, description) VALUES (new.id, new.name, new.description); END",
+    "CREATE TRIGGER IF NOT EXISTS list_item_fts_ad AFTER DELETE ON list_item BEGIN "
+    "INSERT INTO list_item_fts(list_item_fts, rowid, name, description) "
+    "VALUES ('delete', old.id, old.name, old.description); END",
+    "CREATE TRIGGER IF NOT EXISTS list_item_fts_au AFTER UPDATE OF name, description ON list_item BEGIN "
+    "INSERT INTO list_item_fts(list_item_fts, rowid, name, description) "
+    "VALUES ('delete', old.id, old.name, old.description); "
+    "INSERT INTO list_item_fts(rowid, name, description) VALUES (new.id, new.name, new.description); END",
+):
+    event.listen(
+        ListItem.__table__, "after_create",
+        DDL(_stmt).execute_if(dialect="sqlite", callable_=_sqlite_has_fts5),
+    )
+event.listen(
+    ListItem.__table__, "before_drop", DDL("DROP TABLE IF EXISTS list_item_fts").execute_if(dialect="sqlite")
+)
     
     
 class ShareRole(str, enum.Enum):
@@ -126,12 +208,42 @@ class ListShare(Base):
     # name the SQL ENUM type to keep Alembic happy
     role = Column(SAEnum(ShareRole, name="share_role"), nullable=False, server_default="viewer")
     hidden = Column(Boolean, nullable=False, server_default="false")
-    __table_args__ = (UniqueConstraint("list_id", "user_id", name="uq_list_share_list_user"),)
+    seq = Column(BigInteger, nullable=False, server_default="0")
+    __table_args__ = (
+        UniqueConstraint("list_id", "user_id", name="uq_list_share_list_user"),
+        Index("ix_list_share_list_seq", "list_id", "seq"),
+    )
 
     user = relationship("User")
     list = relationship("GroceryList", back_populates="shares")
 
 
+class SyncTombstone(Base):
+    """A deleted item or share, so delta sync can report the delete."""
+    __tablename__ = "sync_tombstone"
+
+    id = Column(Integer, primary_key=True)
+    list_id = Column(Integer, ForeignKey("grocery_list.id", ondelete="CASCADE"), nullable=False)
+    seq = Column(BigInteger, nullable=False)
+    kind = Column(String, nullable=False)  # item | share
+    object_id = Column(Integer, nullable=False)
+
+    __table_args__ = (
+        Index("ix_sync_tombstone_list_seq", "list_id", "seq"),
+    )
+
+
+class SyncClock(Base):
+    """Single-row change clock for delta sync on SQLite; Postgres uses transaction ids."""
+    __tablename__ = "sync_clock"
+
+    id = Column(Integer, primary_key=True)
+    value = Column(BigInteger, nullable=False)
+
+
+event.listen(SyncClock.__table__, "after_create", DDL("INSERT INTO sync_clock (id, value) VALUES (1, 1)"))
+
+
 class PasswordResetCode(Base):
     __tablename__ = "password_reset_code"
 
@@ -157,3 +269,64 @@ class UsedResetToken(Base):
     jti = Column(String, nullable=False, unique=True, index=True)
     used_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
     expires_at = Column(DateTime(timezone=True), nullable=True)
+
+
+class ReminderQueue(Base):
+    """Items with a pending reminder, keyed by the day they become due.
+
+    Kept in step with ``list_item`` on every write that touches ``remind_on``
+    or ``purchased`` so reminder runs only read the due slice.
+    """
+    __tablename__ = "reminder_queue"
+
+    item_id = Column(Integer, ForeignKey("list_item.id", ondelete="CASCADE"), primary_key=True)
+    remind_on = Column(Date, nullable=False, index=True)
+    # Set while a reminder run sends the entry (app/reminders.py claim_reminders)
+    claimed_until = Column(DateTime(timezone=True), nullable=True)
+
+
+class PurchaseStat(Base):
+    """Per-user purchase counts by normalized item name ("buy again" / frequency).
+
+    Counts purchase events: bumped by app/purchase_stats.py whenever an item
+    in one of the user's lists is marked purchased and never decremented, so
+    stats never scan list_item.
+    """
+    __tablename__ = "purchase_stat"
+
+    user_id = Column(Integer, ForeignKey("user.id", ondelete="CASCADE"), primary_key=True)
+    name_key = Column(String, primary_key=True)  # app.suggest.normalize_name
+    display_name = Column(String, nullable=False)
+    count = Column(Integer, nullable=False, server_default="0")
+    last_purchased_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        Index("ix_purchase_stat_user_count", "user_id", "count"),
+        Index("ix_purchase_stat_user_last", "user_id", "last_purchased_at"),
+    )
+
+
+class ReminderRun(Base):
+    """History of real reminder runs with per-stage timings."""
+    __tablename__ = "reminder_run"
+
+    id = Column(Integer, primary_key=True)
+    started_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+    trigger = Column(String, nullable=False, server_default="cron")  # cron | scheduler
+    rows_scanned = Column(Integer, nullable=False, server_default="0")
+    owners = Column(Integer, nullable=False, server_default="0")
+    items = Column(Integer, nullable=False, server_default="0")
+    sent = Column(Integer, nullable=False, server_default="0")
+    failed = Column(Integer, nullable=False, server_default="0")
+    digest_bytes = Column(Integer, nullable=False, server_default="0")
+    query_ms = Column(Float, nullable=True)
+    render_ms = Column(Float, nullable=True)
+    send_ms = Column(Float, nullable=True)
+    mark_ms = Column(Float, nullable=True)
+    send_p50_ms = Column(Float, nullable=True)
+    send_p99_ms = Column(Float, nullable=True)
+
+    __table_args__ = (
+        Index("ix_reminder_run_started_at", "started_at"),
+    )
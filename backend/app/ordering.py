@@ -0,0 +1,157 @@
+# app/ordering.py
+"""Fractional position keys for user-defined item order.
+
+``list_item.position`` is a string over the digits 0-9a-z compared
+lexicographically (byte order; the column uses the "C" collation on
+Postgres). Between any two keys there is always another one, so moving an
+item rewrites that item's key and nothing else. Keys never end in "0",
+which keeps room below every key. Legacy items have the empty key and sort
+first, in id order.
+
+Repeated inserts at the same spot make keys longer. A list is rebalanced
+(every item gets a short, evenly spaced key) when a move lands next to an
+empty or duplicate key, and in the background by POST
+/tasks/rebalance-positions for lists with keys over POSITION_MAX_LENGTH.
+"""
+import os
+
+from sqlalchemy import bindparam, func, select, update
+from sqlalchemy.orm import Session
+
+from app.models import ListItem
+from app import sync
+
+DIGITS = "0123456789abcdefghijklmnopqrstuvwxyz"
+_BASE = len(DIGITS)
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+def _midpoint(a: str, b: str | None) -> str:
+    # a < b; b None means "no upper bound"; neither ends in "0"
+    if b is not None:
+        n = 0
+        while n < len(b) and (a[n] if n < len(a) else "0") == b[n]:
+            n += 1
+        if n:
+            return b[:n] + _midpoint(a[n:], b[n:])
+    da = DIGITS.index(a[0]) if a else 0
+    db = DIGITS.index(b[0]) if b is not None else _BASE
+    if db - da > 1:
+        return DIGITS[(da + db) // 2]
+    if b is not None and len(b) > 1:
+        return b[0]
+    return DIGITS[da] + _midpoint(a[1:], None)
+
+
+def _increment(a: str) -> str:
+    # Shortest step up: keeps append-heavy lists from growing keys quickly
+    for i, ch in enumerate(a):
+        if ch != DIGITS[-1]:
+            return a[:i] + DIGITS[DIGITS.index(ch) + 1]
+    return a + DIGITS[_BASE // 2]
+
+
+def key_between(a: str | None, b: str | None) -> str:
+    """A key strictly between ``a`` and ``b``; None (or "" for ``a``) means unbounded."""
+    if a and b is not None and a >= b:
+        raise ValueError(f"{a!r} must sort before {b!r}")
+    if b is None and a:
+        return _increment(a)
+    return _midpoint(a or "", b)
+
+
+def spread(n: int, prefix: str = "") -> list[str]:
+    """``n`` evenly spaced keys in ascending order, all starting with ``prefix``."""
+    width = 1
+    while _BASE ** width <= n:
+        width += 1
+    keys = []
+    for i in range(1, n + 1):
+        v = i * _BASE ** width // (n + 1)
+        digits = []
+        for _ in range(width):
+            v, d = divmod(v, _BASE)
+            digits.append(DIGITS[d])
+        keys.append(prefix + "".join(reversed(digits)).rstrip("0"))
+    return keys
+
+
+def last_key(db: Session, list_id: int) -> str:
+    """The list's highest key ("" when it has none); index-only on ix_list_item_list_position."""
+    return db.execute(
+        select(func.max(ListItem.position)).where(ListItem.list_id == list_id)
+    ).scalar() or ""
+
+
+def key_for_move(db: Session, list_id: int, item_id: int, after_id: int | None) -> str | None:
+    """Key placing ``item_id`` right after ``after_id`` (first when None).
+
+    Returns None when a neighbour has an empty or duplicate key; rebalance
+    the list and ask again. Raises LookupError if ``after_id`` is not in the list.
+    """
+    lo = None
+    if after_id is not None:
+        lo = db.execute(
+            select(ListItem.position).where(ListItem.id == after_id, ListItem.list_id == list_id)
+        ).scalar()
+        if lo is None:
+            raise LookupError(after_id)
+        if lo == "":
+            return None
+    nxt = select(ListItem.position).where(ListItem.list_id == list_id, ListItem.id != item_id)
+    if after_id is not None:
+        nxt = nxt.where(ListItem.position >= lo, ListItem.id != after_id)
+    hi = db.execute(nxt.order_by(ListItem.position).limit(1)).scalar()
+    if hi == "" or (hi is not None and hi == lo):
+        return None
+    return key_between(lo, hi)
+
+
+_SET_POSITION = (
+    update(ListItem.__table__)
+    .where(ListItem.__table__.c.id == bindparam("item_id"))
+    .values(position=bindparam("new_position"))
+)
+
+
+def rebalance(db: Session, list_id: int) -> int:
+    """Give every item of the list a fresh short key, keeping the current order.
+
+    Rows are stamped for delta sync so clients pick up the new keys; version
+    is left alone, since the visible order does not change. Nothing locks
+    the list: a move committed while this runs can be overwritten (last
+    writer wins), the same as two racing moves. Returns the number of items
+    rewritten.
+    """
+    ids = db.execute(
+        select(ListItem.id).where(ListItem.list_id == list_id).order_by(ListItem.position, ListItem.id)
+    ).scalars().all()
+    if ids:
+        db.execute(
+            _SET_POSITION.values(seq=sync.stamp(db)),
+            [{"item_id": i, "new_position": k} for i, k in zip(ids, spread(len(ids)))],
+        )
+    return len(ids)
+
+
+def rebalance_long_keys(db: Session, max_length: int | None = None, max_lists: int = 100) -> dict:
+    """Rebalance up to ``max_lists`` lists holding a key longer than ``max_length``, one commit each."""
+    max_length = max_length or _env_int("POSITION_MAX_LENGTH", 24)
+    list_ids = db.execute(
+        select(ListItem.list_id)
+        .where(func.length(ListItem.position) > max_length)
+        .distinct()
+        .limit(max_lists)
+    ).scalars().all()
+    db.commit()
+    items = 0
+    for list_id in list_ids:
+        items += rebalance(db, list_id)
+        db.commit()
+    return {"lists": len(list_ids), "items": items, "remaining": len(list_ids) == max_lists}
@@ -1,11 +1,13 @@
 # app/permissions.py
-from sqlalchemy import select
+from sqlalchemy import select, union_all
 from app.models import GroceryList, ListShare, ShareRole
 
 def can_read(db, user_id: int, list_id: int) -> bool:
     # owner
     gl = db.get(GroceryList, list_id)
-    if gl and gl.owner_id == user_id:
+    if gl is None or gl.deleted_at is not None:
+        return False
+    if gl.owner_id == user_id:
         return True
     # shared
     q = select(ListShare).where(ListShare.list_id == list_id, ListShare.user_id == user_id)
@@ -14,7 +16,9 @@ def can_read(db, user_id: int, list_id: int) -> bool:
 def can_write(db, user_id: int, list_id: int) -> bool:
     # owner
     gl = db.get(GroceryList, list_id)
-    if gl and gl.owner_id == user_id:
+    if gl is None or gl.deleted_at is not None:
+        return False
+    if gl.owner_id == user_id:
         return True
     # shared as editor
     q = select(ListShare).where(
@@ -23,3 +27,31 @@ def can_write(db, user_id: int, list_id: int) -> bool:
         ListShare.role == ShareRole.editor,
     )
     return db.execute(q).scalar_one_or_none() is not None
+
+def readable_list_ids(user_id: int):
+    """Subquery of ids of every list the user can read: owned or shared, not deleted."""
+    owned = select(GroceryList.id).where(
+        GroceryList.owner_id == user_id, GroceryList.deleted_at.is_(None)
+    )
+    shared = (
+        select(ListShare.list_id)
+        .join(GroceryList, GroceryList.id == ListShare.list_id)
+        .where(ListShare.user_id == user_id, GroceryList.deleted_at.is_(None))
+    )
+    return union_all(owned, shared)
+
+def editable_list_ids(user_id: int):
+    """Subquery of ids of every list the user can edit: owned or shared as editor, not deleted."""
+    owned = select(GroceryList.id).where(
+        GroceryList.owner_id == user_id, GroceryList.deleted_at.is_(None)
+    )
+    shared = (
+        select(ListShare.list_id)
+        .join(GroceryList, GroceryList.id == ListShare.list_id)
+        .where(
+            ListShare.user_id == user_id,
+            ListShare.role == ShareRole.editor,
+            GroceryList.deleted_at.is_(None),
+        )
+    )
+    return union_all(owned, shared)
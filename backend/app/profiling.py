@@ -0,0 +1,195 @@
+# app/profiling.py
+"""On-demand request profiling and an optional background stack sampler.
+
+Per request: send ``x-profile: <PROFILE_SECRET>`` (falls back to
+CRON_SECRET; with neither set profiling is off). The request then runs
+while a sampler thread records stacks every 1/PROFILE_REQUEST_HZ seconds.
+The folded stacks ("frame;frame;frame count", the input format of
+flamegraph.pl and speedscope) are written to PROFILE_DIR. The response
+carries ``x-profile-id``; fetch the profile from GET /tasks/profiles/{id}.
+That route and GET /tasks/hot-stacks take the CRON_SECRET and are off
+(404) when it is unset.
+
+Samples come from every busy thread, so concurrent requests on other
+worker threads can show up too; profile on a quiet instance for a clean
+picture.
+
+Background: PROFILE_SAMPLE_HZ > 0 starts one low-rate sampler for the
+whole process that aggregates hot stacks across all requests (GET
+/tasks/hot-stacks). Nothing runs and nothing is hooked when it is 0.
+"""
+import logging
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+
+from starlette.concurrency import run_in_threadpool
+
+log = logging.getLogger("app.profiling")
+
+# A thread whose innermost frame sits in one of these is waiting, not working
+_IDLE_FILES = ("threading.py", "selectors.py", "queue.py")
+_MAX_DEPTH = 64
+_KEEP_PROFILES = 50
+
+
+def _profile_secret() -> str | None:
+    return os.getenv("PROFILE_SECRET") or os.getenv("CRON_SECRET") or None
+
+
+def profile_dir() -> str:
+    return os.getenv("PROFILE_DIR") or os.path.join(tempfile.gettempdir(), "smartgrocery-profiles")
+
+
+def _fold(frame) -> str | None:
+    if frame.f_code.co_filename.endswith(_IDLE_FILES):
+        return None
+    names = []
+    while frame is not None and len(names) < _MAX_DEPTH:
+        code = frame.f_code
+        names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+class StackSampler:
+    """Samples every busy thread's stack at ``hz`` into a Counter of folded stacks."""
+
+    def __init__(self, hz: float, max_stacks: int = 5000):
+        self.interval = 1.0 / max(hz, 0.1)
+        self.max_stacks = max_stacks
+        self.stacks: Counter[str] = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    def start(self) -> "StackSampler":
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(1.0)
+
+    def _run(self) -> None:
+        me = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            folded = [
+                _fold(frame) for ident, frame in sys._current_frames().items() if ident != me
+            ]
+            with self._lock:
+                self.samples += 1
+                for stack in folded:
+                    if stack:
+                        self.stacks[stack] += 1
+                if len(self.stacks) > self.max_stacks:
+                    # keep the hottest half; rare stacks are noise at this point
+                    self.stacks = Counter(dict(self.stacks.most_common(self.max_stacks // 2)))
+
+    def folded(self, limit: int | None = None) -> str:
+        with self._lock:
+            top = self.stacks.most_common(limit)
+        return "".join(f"{stack} {count}\n" for stack, count in top)
+
+
+# ---------- per-request mode ----------
+
+def _safe_name(method: str, path: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_.-]+", "_", f"{method}{path}").strip("_")[:80]
+
+
+def _store(name: str, body: str) -> None:
+    d = profile_dir()
+    os.makedirs(d, exist_ok=True)
+    with open(os.path.join(d, name), "w") as f:
+        f.write(body)
+    files = sorted(os.listdir(d))
+    for old in files[:-_KEEP_PROFILES]:
+        try:
+            os.remove(os.path.join(d, old))
+        except OSError:
+            pass
+
+
+def _finish(sampler: StackSampler, name: str, method: str, path: str) -> None:
+    # Joins the sampler thread and writes a file: blocking, so never on the event loop
+    sampler.stop()
+    try:
+        _store(name, sampler.folded())
+        log.info("Profiled %s %s (%s samples) -> %s", method, path, sampler.samples, name)
+    except OSError:
+        log.exception("Could not store profile %s", name)
+
+
+def load_profile(profile_id: str) -> str | None:
+    if not re.fullmatch(r"[A-Za-z0-9_.-]+\.folded", profile_id):
+        return None
+    try:
+        with open(os.path.join(profile_dir(), profile_id)) as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+class ProfilingMiddleware:
+    """Profiles requests carrying a valid ``x-profile`` header; a no-op for the rest."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        secret = _profile_secret()
+        if not secret:
+            return await self.app(scope, receive, send)
+        header = dict(scope.get("headers") or ()).get(b"x-profile")
+        if header is None or header.decode("latin-1") != secret:
+            return await self.app(scope, receive, send)
+
+        started = time.time()
+        name = f"{int(started * 1000)}-{_safe_name(scope.get('method', ''), scope.get('path', ''))}.folded"
+        sampler = StackSampler(float(os.getenv("PROFILE_REQUEST_HZ", "1000"))).start()
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [(b"x-profile-id", name.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            await run_in_threadpool(_finish, sampler, name, scope.get("method"), scope.get("path"))
+
+
+# ---------- background sampler ----------
+
+_background: StackSampler | None = None
+
+
+def background_sampler() -> StackSampler | None:
+    return _background
+
+
+def start_background_sampler() -> StackSampler | None:
+    """Start the process-wide sampler when PROFILE_SAMPLE_HZ > 0."""
+    global _background
+    hz = float(os.getenv("PROFILE_SAMPLE_HZ", "0") or 0)
+    if hz <= 0 or _background is not None:
+        return _background
+    _background = StackSampler(hz).start()
+    return _background
+
+
+def stop_background_sampler() -> None:
+    global _background
+    if _background is not None:
+        _background.stop()
+        _background = None
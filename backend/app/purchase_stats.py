@@ -0,0 +1,148 @@
+# app/purchase_stats.py
+"""Incremental purchase rollups (purchase_stat) and their backfill.
+
+Each row counts purchase events for one normalized item name across a
+user's lists, plus when one was last bought. An event is an item added as
+purchased, flipped to purchased, or imported as purchased; writes count it
+in the same transaction. The count is append-only history: unchecking,
+renaming or deleting an item, or deleting its list, takes nothing back.
+
+The backfill seeds rows from the items currently marked purchased, a chunk
+of users per call, so it is idempotent and can resume from
+``next_after_user_id``. It never lowers a count the writes have already
+reached. History has no purchase timestamps; seeded rows use the list's
+creation time as ``last_purchased_at``.
+"""
+from collections.abc import Callable, Iterable
+from datetime import datetime, timezone
+
+from sqlalchemy import case, func, insert, literal, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.models import GroceryList, ListItem, PurchaseStat, User
+from app.suggest import normalize_name
+
+_UPSERTS = {"postgresql": pg_insert, "sqlite": sqlite_insert}
+
+
+def _merge(db: Session, rows: list[dict], count: Callable, refresh: bool = True) -> None:
+    """Insert ``rows`` or fold each into the user's existing row for that name.
+
+    ``count(new)`` builds the merged count from the existing column and the
+    incoming value. ``refresh`` replaces display_name and last_purchased_at;
+    otherwise existing values are kept.
+    """
+    if not rows:
+        return
+    upsert = _UPSERTS.get(db.get_bind().dialect.name)
+    if upsert is not None:
+        stmt = upsert(PurchaseStat).values(rows)
+        new = stmt.excluded
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=[PurchaseStat.user_id, PurchaseStat.name_key],
+            set_=_merged(count, new.count, new.display_name, new.last_purchased_at, refresh),
+        ))
+        return
+    # Portable fallback: UPDATE, else INSERT in a savepoint; a concurrent
+    # INSERT of the same key makes ours fail, and the retried UPDATE finds it
+    for row in rows:
+        merged = _merged(
+            count, literal(row["count"]), row["display_name"], row["last_purchased_at"], refresh
+        )
+        for _ in range(2):
+            res = db.execute(
+                update(PurchaseStat)
+                .where(PurchaseStat.user_id == row["user_id"], PurchaseStat.name_key == row["name_key"])
+                .values(merged)
+            )
+            if res.rowcount:
+                break
+            try:
+                with db.begin_nested():
+                    db.execute(insert(PurchaseStat).values(row))
+                break
+            except IntegrityError:
+                continue
+
+
+def _merged(count: Callable, new_count, display_name, last_purchased_at, refresh: bool) -> dict:
+    if refresh:
+        return {"count": count(new_count), "display_name": display_name, "last_purchased_at": last_purchased_at}
+    return {
+        "count": count(new_count),
+        "last_purchased_at": func.coalesce(PurchaseStat.last_purchased_at, last_purchased_at),
+    }
+
+
+def record_purchases(db: Session, user_id: int, names: Iterable[str]) -> None:
+    """Count one purchase event per name (one statement for the lot); the caller commits."""
+    now = datetime.now(timezone.utc)
+    rows: dict[str, dict] = {}
+    for name in names:
+        key = normalize_name(name)
+        if not key:
+            continue
+        row = rows.setdefault(key, {
+            "user_id": user_id, "name_key": key, "display_name": " ".join(name.split()),
+            "count": 0, "last_purchased_at": now,
+        })
+        row["count"] += 1
+    _merge(db, list(rows.values()), lambda new: PurchaseStat.count + new)
+
+
+def record_purchase(db: Session, user_id: int, name: str) -> None:
+    record_purchases(db, user_id, [name])
+
+
+def backfill(db: Session, after_user_id: int = 0, users: int = 500) -> dict:
+    """Seed the rollups of the next ``users`` users after ``after_user_id`` and commit."""
+    user_ids = db.execute(
+        select(User.id).where(User.id > after_user_id).order_by(User.id).limit(users)
+    ).scalars().all()
+    if not user_ids:
+        return {"users": 0, "rows": 0, "next_after_user_id": None}
+
+    rows = db.execute(
+        select(GroceryList.owner_id, ListItem.name, func.count(), func.max(GroceryList.created_at))
+        .join(GroceryList, GroceryList.id == ListItem.list_id)
+        .where(
+            GroceryList.owner_id.in_(user_ids),
+            GroceryList.deleted_at.is_(None),
+            ListItem.purchased == True,
+        )
+        .group_by(GroceryList.owner_id, ListItem.name)
+    ).all()
+
+    # Names differing only in case/spacing fold into one row
+    stats: dict[tuple[int, str], dict] = {}
+    for owner_id, name, count, last in rows:
+        key = normalize_name(name)
+        if not key:
+            continue
+        row = stats.get((owner_id, key))
+        if row is None:
+            stats[(owner_id, key)] = {
+                "user_id": owner_id, "name_key": key, "display_name": " ".join(name.split()),
+                "count": count, "last_purchased_at": last,
+            }
+            continue
+        row["count"] += count
+        if last is not None and (row["last_purchased_at"] is None or last > row["last_purchased_at"]):
+            row["last_purchased_at"] = last
+            row["display_name"] = " ".join(name.split())
+
+    # Raise counts to what the current items show, never lower them
+    _merge(
+        db, list(stats.values()),
+        lambda new: case((PurchaseStat.count < new, new), else_=PurchaseStat.count),
+        refresh=False,
+    )
+    db.commit()
+    return {
+        "users": len(user_ids),
+        "rows": len(stats),
+        "next_after_user_id": user_ids[-1] if len(user_ids) == users else None,
+    }
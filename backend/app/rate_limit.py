@@ -2,6 +2,8 @@ import time
 from collections import defaultdict, deque
 from typing import Tuple
 
+from app.metrics import RATE_LIMITED
+
 
 _windows: dict[Tuple[str, str], deque[float]] = defaultdict(deque)
 
@@ -21,6 +23,7 @@ def allow(key: str, scope: str, max_requests: int, window_seconds: int) -> bool:
     while dq and dq[0] < cutoff:
         dq.popleft()
     if len(dq) >= max_requests:
+        RATE_LIMITED.inc(scope)
         return False
     dq.append(now)
     return True
@@ -0,0 +1,218 @@
+# app/reminder_scheduler.py
+"""Optional in-process reminder scheduler.
+
+Enabled with REMINDER_SCHEDULER=1 and started from the FastAPI lifespan.
+Keeps the next due reminder_queue entries in a min-heap, sleeps until the
+earliest one is due, sends it and refills from the DB in key order.
+
+Only one worker runs it: on Postgres leadership is a session-level advisory
+lock held on a dedicated connection; other dialects assume a single process.
+The external cron endpoint (/tasks/run-reminders) keeps working alongside it;
+runs claim queue entries atomically, so the two never send the same reminder.
+"""
+import heapq
+import logging
+import os
+import threading
+from datetime import date, datetime, time, timedelta, timezone
+
+from sqlalchemy import select, text, tuple_
+
+from app.models import ReminderQueue
+
+log = logging.getLogger("app.reminders")
+
+# Arbitrary app-wide key for pg_try_advisory_lock
+ADVISORY_LOCK_KEY = 0x5347524D  # "SGRM"
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+class ReminderScheduler:
+    def __init__(self, engine, session_factory, send_due):
+        self.engine = engine
+        self.session_factory = session_factory
+        self.send_due = send_due  # (db, today, item_ids, trigger=...) -> report dict
+        self.batch = _env_int("REMINDER_SCHEDULER_BATCH", 500)
+        self.reload_seconds = _env_int("REMINDER_SCHEDULER_RELOAD_SECONDS", 300)
+        self.retry_seconds = _env_int("REMINDER_SCHEDULER_RETRY_SECONDS", 30)
+        # Hour of day (UTC) at which a remind_on date becomes due; matches the cron schedule.
+        self.send_hour = _env_int("REMINDER_SEND_HOUR_UTC", 14)
+
+        self._heap: list[tuple[date, int]] = []
+        self._horizon: tuple[date, int] | None = None  # last (remind_on, item_id) loaded
+        self._complete = False  # True once the whole queue fits in the heap
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._leader_conn = None
+
+    # ---------- lifecycle ----------
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="reminder-scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout)
+        self._release_leadership()
+
+    def notify(self, item_id: int, remind_on: date) -> None:
+        """Tell the scheduler about a newly (re)queued reminder in this process."""
+        key = (remind_on, item_id)
+        with self._lock:
+            if not (self._complete or (self._horizon is not None and key <= self._horizon)):
+                return  # beyond what's loaded; a later refill picks it up
+            first = not self._heap or key < self._heap[0]
+            heapq.heappush(self._heap, key)
+        if first:
+            self._wake.set()
+
+    # ---------- timing ----------
+
+    def due_at(self, remind_on: date) -> datetime:
+        return datetime.combine(remind_on, time(hour=self.send_hour), tzinfo=timezone.utc)
+
+    def _today(self, now: datetime) -> date:
+        # Latest remind_on date whose send time has passed
+        return (now - timedelta(hours=self.send_hour)).date()
+
+    # ---------- leader election ----------
+
+    def _acquire_leadership(self) -> bool:
+        if self.engine.dialect.name != "postgresql":
+            return True
+        if self._leader_conn is not None:
+            try:
+                self._leader_conn.execute(text("SELECT 1"))
+                return True
+            except Exception:
+                log.warning("Reminder scheduler lost its leader connection")
+                self._release_leadership()
+        conn = self.engine.connect()
+        got = conn.execute(text("SELECT pg_try_advisory_lock(:k)"), {"k": ADVISORY_LOCK_KEY}).scalar()
+        conn.commit()
+        if got:
+            self._leader_conn = conn
+            log.info("Reminder scheduler acquired leadership")
+            return True
+        conn.close()
+        return False
+
+    def _release_leadership(self) -> None:
+        conn, self._leader_conn = self._leader_conn, None
+        if conn is None:
+            return
+        try:
+            conn.execute(text("SELECT pg_advisory_unlock(:k)"), {"k": ADVISORY_LOCK_KEY})
+            conn.commit()
+        except Exception:
+            pass
+        finally:
+            conn.close()
+
+    # ---------- heap maintenance ----------
+
+    def _load(self, db, reset: bool = False) -> None:
+        with self._lock:
+            if reset:
+                self._heap, self._horizon, self._complete = [], None, False
+            if self._complete:
+                return
+            horizon = self._horizon
+        stmt = select(ReminderQueue.remind_on, ReminderQueue.item_id)
+        if horizon is not None:
+            stmt = stmt.where(tuple_(ReminderQueue.remind_on, ReminderQueue.item_id) > horizon)
+        rows = db.execute(
+            stmt.order_by(ReminderQueue.remind_on, ReminderQueue.item_id).limit(self.batch)
+        ).all()
+        with self._lock:
+            for remind_on, item_id in rows:
+                heapq.heappush(self._heap, (remind_on, item_id))
+            if rows:
+                self._horizon = tuple(rows[-1])
+            self._complete = len(rows) < self.batch
+
+    def _pop_due(self, today: date) -> list[int]:
+        with self._lock:
+            ids = []
+            while self._heap and self._heap[0][0] <= today:
+                ids.append(heapq.heappop(self._heap)[1])
+            return ids
+
+    def _next_wait(self, now: datetime) -> float:
+        with self._lock:
+            head = self._heap[0] if self._heap else None
+        wait = float(self.reload_seconds)
+        if head is not None:
+            wait = min(wait, (self.due_at(head[0]) - now).total_seconds())
+        return max(wait, 0.0)
+
+    # ---------- main loop ----------
+
+    def _run(self) -> None:
+        next_reload = datetime.now(timezone.utc)
+        while not self._stop.is_set():
+            try:
+                if not self._acquire_leadership():
+                    self._stop.wait(self.retry_seconds)
+                    continue
+                now = datetime.now(timezone.utc)
+                db = self.session_factory()
+                try:
+                    if now >= next_reload:
+                        # Writes from other workers never reach notify(); reload periodically.
+                        self._load(db, reset=True)
+                        next_reload = now + timedelta(seconds=self.reload_seconds)
+                    due = self._pop_due(self._today(now))
+                    if due:
+                        report = self.send_due(db, self._today(now), due, trigger="scheduler")
+                        log.info("Reminder scheduler sent %s digest(s) for %s item(s)", report["sent"], len(due))
+                    with self._lock:
+                        low = len(self._heap) < self.batch // 4 and not self._complete
+                    if low:
+                        self._load(db)
+                finally:
+                    db.close()
+                self._wake.clear()
+                self._wake.wait(self._next_wait(datetime.now(timezone.utc)))
+            except Exception:
+                log.exception("Reminder scheduler iteration failed")
+                self._stop.wait(self.retry_seconds)
+        self._release_leadership()
+
+
+_scheduler: ReminderScheduler | None = None
+
+
+def get_scheduler() -> ReminderScheduler | None:
+    return _scheduler
+
+
+def start_scheduler() -> ReminderScheduler | None:
+    """Start the scheduler if REMINDER_SCHEDULER is enabled; returns it or None."""
+    global _scheduler
+    if (os.getenv("REMINDER_SCHEDULER", "").lower() not in ("1", "true", "yes")):
+        return None
+    from app.database import background_session, get_engine
+    from app.routers.tasks import send_due_reminders
+
+    _scheduler = ReminderScheduler(get_engine(), background_session, send_due_reminders)
+    _scheduler.start()
+    return _scheduler
+
+
+def stop_scheduler() -> None:
+    global _scheduler
+    if _scheduler is not None:
+        _scheduler.stop()
+        _scheduler = None
@@ -0,0 +1,110 @@
+# app/reminders.py
+import os
+from datetime import date, datetime, timedelta, timezone
+
+from sqlalchemy import and_, delete, event, insert, or_, select, update
+from sqlalchemy.orm import Session
+
+from app.models import ListItem, ReminderQueue
+from app.reminder_scheduler import get_scheduler
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+def _is_pending(item: ListItem) -> bool:
+    return item.remind_on is not None and item.reminded_at is None and not item.purchased
+
+
+def sync_reminder_queue(db: Session, item: ListItem) -> None:
+    """Add, move or drop the item's reminder_queue entry to match its fields.
+
+    Call after changing remind_on/reminded_at/purchased; the caller commits.
+    """
+    if item.id is None:
+        if not _is_pending(item):
+            return
+        db.flush()  # need the item id for the queue row
+    entry = db.get(ReminderQueue, item.id)
+    if _is_pending(item):
+        if entry:
+            entry.remind_on = item.remind_on
+            entry.claimed_until = None
+        else:
+            db.add(ReminderQueue(item_id=item.id, remind_on=item.remind_on))
+        if get_scheduler() is not None:
+            # Told after commit: until then the scheduler's session cannot see the entry
+            db.info.setdefault("reminder_notify", []).append((item.id, item.remind_on))
+    elif entry:
+        db.delete(entry)
+
+
+@event.listens_for(Session, "after_commit")
+def _notify_scheduler(session):
+    pending = session.info.pop("reminder_notify", None)
+    scheduler = get_scheduler()
+    if pending and scheduler is not None:
+        for item_id, remind_on in pending:
+            scheduler.notify(item_id, remind_on)
+
+
+@event.listens_for(Session, "after_rollback")
+def _drop_notifications(session):
+    session.info.pop("reminder_notify", None)
+
+
+def claim_reminders(db: Session, today: date, item_ids: list[int] | None = None) -> list[int]:
+    """Claim the due queue entries (optionally only ``item_ids``) for one run and commit.
+
+    One conditional UPDATE sets ``claimed_until``, so concurrent runs (the
+    scheduler and the cron endpoint, or two workers) never claim the same
+    entry. Sent entries are popped; an entry whose run died becomes
+    claimable again after REMINDER_CLAIM_SECONDS.
+    """
+    now = datetime.now(timezone.utc)
+    stmt = (
+        update(ReminderQueue)
+        .where(
+            ReminderQueue.remind_on <= today,
+            or_(ReminderQueue.claimed_until.is_(None), ReminderQueue.claimed_until < now),
+        )
+        .values(claimed_until=now + timedelta(seconds=_env_int("REMINDER_CLAIM_SECONDS", 600)))
+        .returning(ReminderQueue.item_id)
+        .execution_options(synchronize_session=False)
+    )
+    if item_ids is not None:
+        stmt = stmt.where(ReminderQueue.item_id.in_(item_ids))
+    claimed = list(db.execute(stmt).scalars())
+    db.commit()
+    return claimed
+
+
+def pop_reminders(db: Session, item_ids: list[int]) -> None:
+    if item_ids:
+        db.execute(delete(ReminderQueue).where(ReminderQueue.item_id.in_(item_ids)))
+
+
+def enqueue_list(db: Session, list_id: int) -> None:
+    """Queue every pending reminder in the list that is not queued yet.
+
+    Set-based counterpart of sync_reminder_queue for bulk writes (import).
+    The scheduler, if running, picks these up on its next reload.
+    """
+    pending = (
+        select(ListItem.id, ListItem.remind_on)
+        .outerjoin(ReminderQueue, ReminderQueue.item_id == ListItem.id)
+        .where(
+            and_(
+                ListItem.list_id == list_id,
+                ListItem.remind_on.is_not(None),
+                ListItem.reminded_at.is_(None),
+                ListItem.purchased.is_(False),
+                ReminderQueue.item_id.is_(None),
+            )
+        )
+    )
+    db.execute(insert(ReminderQueue).from_select(["item_id", "remind_on"], pending))
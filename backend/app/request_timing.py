@@ -0,0 +1,102 @@
+# app/request_timing.py
+"""Per-request SQL accounting, Server-Timing header and slow-request log.
+
+Engine event hooks count statements and time spent in the driver for the
+request in progress (tracked in a contextvar, which Starlette copies into
+the threadpool running sync routes and dependencies). The middleware
+reports the split as
+
+    Server-Timing: db;dur=3.1;desc="4 queries", app;dur=5.2, total;dur=8.3
+
+and logs requests slower than SLOW_REQUEST_MS (default 500) on the
+"app.requests" logger. SERVER_TIMING=0 drops the header; the log stays.
+"""
+import logging
+import os
+import time
+from contextvars import ContextVar
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+log = logging.getLogger("app.requests")
+
+
+class RequestStats:
+    __slots__ = ("queries", "db_seconds")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+
+
+_current: ContextVar[RequestStats | None] = ContextVar("request_stats", default=None)
+
+
+def current_stats() -> RequestStats | None:
+    return _current.get()
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    starts = conn.info.get("query_start")
+    if stats is None or not starts:
+        return
+    stats.queries += 1
+    stats.db_seconds += time.perf_counter() - starts.pop()
+
+
+def _flag(name: str, default: str) -> bool:
+    return os.getenv(name, default).lower() in ("1", "true", "yes")
+
+
+class ServerTimingMiddleware:
+    """Pure ASGI middleware (no BaseHTTPMiddleware) so streaming responses pass through."""
+
+    def __init__(self, app):
+        self.app = app
+        self.header = _flag("SERVER_TIMING", "1")
+        self.slow_ms = float(os.getenv("SLOW_REQUEST_MS", "500"))
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        stats = RequestStats()
+        token = _current.set(stats)
+        start = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if self.header:
+                    total_ms = (time.perf_counter() - start) * 1000.0
+                    db_ms = stats.db_seconds * 1000.0
+                    value = (
+                        f'db;dur={db_ms:.1f};desc="{stats.queries} queries", '
+                        f"app;dur={max(total_ms - db_ms, 0.0):.1f}, total;dur={total_ms:.1f}"
+                    )
+                    message["headers"] = list(message.get("headers", [])) + [
+                        (b"server-timing", value.encode("latin-1"))
+                    ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            total_ms = (time.perf_counter() - start) * 1000.0
+            if total_ms >= self.slow_ms:
+                log.warning(
+                    "Slow request %s %s -> %s in %.0f ms (db %.0f ms, %s queries)",
+                    scope.get("method"), scope.get("path"), status, total_ms,
+                    stats.db_seconds * 1000.0, stats.queries,
+                )
@@ -5,6 +5,7 @@ from fastapi import APIRouter, Depends, HTTPException, status, Response, Request
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 
+from app import email_breaker, email_throttle
 from app.database import get_db
 from app.models import User, PasswordResetCode, UsedResetToken
 from app.schemas import RegisterRequest, UserRead, TokenResponse
@@ -17,6 +18,7 @@ from app.security import (
 )
 from app.security_cookies import set_login_cookie, clear_login_cookie
 from app.rate_limit import allow as allow_rate
+from app.metrics import OUTBOUND_LATENCY
 from app.deps import get_current_user_any as get_current_user
 
 router = APIRouter(prefix="/auth", tags=["auth"])
@@ -132,11 +134,12 @@ def forgot_password(payload: ForgotPassword, request: Request, db: Session = Dep
         if not token:
             raise HTTPException(status_code=400, detail="Captcha required")
         try:
-            r = httpx.post(
-                "https://challenges.cloudflare.com/turnstile/v0/siteverify",
-                data={"secret": secret, "response": token, "remoteip": ip},
-                timeout=10.0,
-            )
+            with OUTBOUND_LATENCY.time("turnstile", "-"):
+                r = httpx.post(
+                    "https://challenges.cloudflare.com/turnstile/v0/siteverify",
+                    data={"secret": secret, "response": token, "remoteip": ip},
+                    timeout=10.0,
+                )
             data = r.json()
             if not data.get("success"):
                 raise HTTPException(status_code=400, detail="Captcha invalid")
@@ -290,123 +293,134 @@ def reset_password(payload: ResetPassword, request: Request, db: Session = Depen
 
 
 def _send_reset_code_email(to: str, code: str, minutes: int) -> dict:
-    """Send a password reset email via configured provider.
+    """Send a password reset email via the configured providers, in order:
 
-    Supported:
+    - Vercel relay (VERCEL_SEND_RESET_URL)
     - Resend API (RESEND_API_KEY, EMAIL_FROM)
     - SMTP (SMTP_HOST, SMTP_PORT, SMTP_USER, SMTP_PASS, EMAIL_FROM)
+    A failing provider, or one whose circuit is open, fails over to the next.
     If no provider configured, this is a no-op (dev fallback returns URL in API).
     """
     import os
     from email.message import EmailMessage
 
     frm = os.getenv("EMAIL_FROM") or "SmartGrocery <no-reply@smartgrocery.online>"
+    attempts = []
 
     # Prefer Vercel function if configured (keeps Resend key in Vercel)
     vercel_url = os.getenv("VERCEL_SEND_RESET_URL")
     if vercel_url:
-        import httpx
-        headers = {"x-api-key": (os.getenv("EMAIL_TEST_SECRET") or os.getenv("CRON_SECRET") or "")}
-        payload = {"to": to, "code": code, "minutes": minutes, "from": frm}
-        r = httpx.post(vercel_url, json=payload, headers=headers, timeout=10.0)
-        try:
-            r.raise_for_status()
-        except httpx.HTTPStatusError as e:
-            body = None
+        def via_vercel():
+            import httpx
+            headers = {"x-api-key": (os.getenv("EMAIL_TEST_SECRET") or os.getenv("CRON_SECRET") or "")}
+            payload = {"to": to, "code": code, "minutes": minutes, "from": frm}
+            r = email_throttle.post(
+                "vercel", vercel_url, priority=email_throttle.TRANSACTIONAL,
+                json=payload, headers=headers, timeout=10.0,
+            )
             try:
-                body = e.response.json()
+                r.raise_for_status()
+            except httpx.HTTPStatusError as e:
+                body = None
+                try:
+                    body = e.response.json()
+                except Exception:
+                    body = e.response.text
+                logging.getLogger("app.email").error("Vercel send failed %s body=%s", e.response.status_code, body)
+                raise
+            try:
+                data = r.json()
             except Exception:
-                body = e.response.text
-            logging.getLogger("app.email").error("Vercel send failed %s body=%s", e.response.status_code, body)
-            raise
-        try:
-            data = r.json()
-        except Exception:
-            data = {"text": r.text}
-        logging.getLogger("app.email").info("Vercel relay sent reset code to %s", to)
-        return {"provider": "vercel", "status": r.status_code, "response": data}
+                data = {"text": r.text}
+            logging.getLogger("app.email").info("Vercel relay sent reset code to %s", to)
+            return {"provider": "vercel", "status": r.status_code, "response": data}
+        attempts.append(("vercel", via_vercel))
 
-    # Try Resend first
+    # Then Resend
     rk = os.getenv("RESEND_API_KEY")
     if rk:
-        import httpx
-
-        from urllib.parse import quote_plus
-
-        reset_link = f"{_frontend_url()}/reset?code={quote_plus(code)}&email={quote_plus(to)}"
-
-        html = f"""
-        <table width="100%" cellpadding="0" cellspacing="0" role="presentation" style="background:#eff4ff;padding:24px 12px;">
-          <tr>
-            <td align="center">
-              <table width="520" cellpadding="0" cellspacing="0" role="presentation" style="background:#ffffff;border-radius:14px;box-shadow:0 12px 30px rgba(15,23,42,0.08);font-family:Segoe UI,Roboto,sans-serif;color:#0f172a;">
-                <tr>
-                  <td style="padding:26px 30px;border-radius:14px 14px 0 0;background:#1d4ed8;color:#fff;">
-                    <div style="font-size:20px;font-weight:600;">SmartGrocery</div>
-                    <div style="font-size:14px;opacity:0.9;margin-top:4px;">Password reset request</div>
-                  </td>
-                </tr>
-                <tr>
-                  <td style="padding:26px 30px;">
-                    <p style="margin:0 0 14px;font-size:16px;">Hi there,</p>
-                    <p style="margin:0 0 18px;font-size:15px;line-height:1.5;">
-                      We received a request to reset your SmartGrocery password. Enter the one-time code below within {minutes} minutes.
-                    </p>
-                    <div style="font-size:30px;letter-spacing:10px;font-weight:600;background:#f4f7ff;border:2px dashed #c7d7ff;padding:18px 12px;text-align:center;border-radius:12px;color:#1d4ed8;">
-                      {code}
-                    </div>
-                    <p style="margin:22px 0 10px;font-size:14px;color:#475569;text-align:center;">You can also use the button:</p>
-                    <a href="{reset_link}"
-                       style="display:inline-block;background:#2563eb;color:#ffffff;text-decoration:none;padding:12px 30px;border-radius:999px;font-weight:600;font-size:14px;">
-                      Enter code in SmartGrocery
-                    </a>
-                    <p style="margin:24px 0 0;font-size:13px;color:#64748b;line-height:1.5;">
-                      If you did not request this reset, you can safely ignore this email and your password will stay the same.
-                    </p>
-                  </td>
-                </tr>
-                <tr>
-                  <td style="padding:18px 30px;background:#f8fafc;border-radius:0 0 14px 14px;border-top:1px solid #e2e8f0;text-align:center;font-size:12px;color:#94a3b8;">
-                    SmartGrocery &middot; Shared lists • Pantry reminders • Recipe mode
-                  </td>
-                </tr>
-              </table>
-            </td>
-          </tr>
-        </table>
-        """
-        text = (
-            "SmartGrocery password reset\n\n"
-            "We received a request to reset your SmartGrocery password.\n"
-            f"Reset code: {code}\n"
-            f"This code expires in {minutes} minutes.\n"
-            "Enter the code in the SmartGrocery app or ignore this email to keep your password unchanged.\n"
-        )
-        payload = {"from": frm, "to": [to], "subject": "SmartGrocery: Your reset code", "html": html, "text": text}
-        r = httpx.post(
-            "https://api.resend.com/emails",
-            headers={"Authorization": f"Bearer {rk}", "Content-Type": "application/json"},
-            json=payload,
-            timeout=10.0,
-        )
-        try:
-            r.raise_for_status()
-        except httpx.HTTPStatusError as e:
-            # Log provider response for debugging
-            body = None
+        def via_resend():
+            import httpx
+
+            from urllib.parse import quote_plus
+
+            reset_link = f"{_frontend_url()}/reset?code={quote_plus(code)}&email={quote_plus(to)}"
+
+            html = f"""
+            <table width="100%" cellpadding="0" cellspacing="0" role="presentation" style="background:#eff4ff;padding:24px 12px;">
+              <tr>
+                <td align="center">
+                  <table width="520" cellpadding="0" cellspacing="0" role="presentation" style="background:#ffffff;border-radius:14px;box-shadow:0 12px 30px rgba(15,23,42,0.08);font-family:Segoe UI,Roboto,sans-serif;color:#0f172a;">
+                    <tr>
+                      <td style="padding:26px 30px;border-radius:14px 14px 0 0;background:#1d4ed8;color:#fff;">
+                        <div style="font-size:20px;font-weight:600;">SmartGrocery</div>
+                        <div style="font-size:14px;opacity:0.9;margin-top:4px;">Password reset request</div>
+                      </td>
+                    </tr>
+                    <tr>
+                      <td style="padding:26px 30px;">
+                        <p style="margin:0 0 14px;font-size:16px;">Hi there,</p>
+                        <p style="margin:0 0 18px;font-size:15px;line-height:1.5;">
+                          We received a request to reset your SmartGrocery password. Enter the one-time code below within {minutes} minutes.
+                        </p>
+                        <div style="font-size:30px;letter-spacing:10px;font-weight:600;background:#f4f7ff;border:2px dashed #c7d7ff;padding:18px 12px;text-align:center;border-radius:12px;color:#1d4ed8;">
+                          {code}
+                        </div>
+                        <p style="margin:22px 0 10px;font-size:14px;color:#475569;text-align:center;">You can also use the button:</p>
+                        <a href="{reset_link}"
+                           style="display:inline-block;background:#2563eb;color:#ffffff;text-decoration:none;padding:12px 30px;border-radius:999px;font-weight:600;font-size:14px;">
+                          Enter code in SmartGrocery
+                        </a>
+                        <p style="margin:24px 0 0;font-size:13px;color:#64748b;line-height:1.5;">
+                          If you did not request this reset, you can safely ignore this email and your password will stay the same.
+                        </p>
+                      </td>
+                    </tr>
+                    <tr>
+                      <td style="padding:18px 30px;background:#f8fafc;border-radius:0 0 14px 14px;border-top:1px solid #e2e8f0;text-align:center;font-size:12px;color:#94a3b8;">
+                        SmartGrocery &middot; Shared lists • Pantry reminders • Recipe mode
+                      </td>
+                    </tr>
+                  </table>
+                </td>
+              </tr>
+            </table>
+            """
+            text = (
+                "SmartGrocery password reset\n\n"
+                "We received a request to reset your SmartGrocery password.\n"
+                f"Reset code: {code}\n"
+                f"This code expires in {minutes} minutes.\n"
+                "Enter the code in the SmartGrocery app or ignore this email to keep your password unchanged.\n"
+            )
+            payload = {"from": frm, "to": [to], "subject": "SmartGrocery: Your reset code", "html": html, "text": text}
+            r = email_throttle.post(
+                "resend",
+                "https://api.resend.com/emails",
+                priority=email_throttle.TRANSACTIONAL,
+                headers={"Authorization": f"Bearer {rk}", "Content-Type": "application/json"},
+                json=payload,
+                timeout=10.0,
+            )
+            try:
+                r.raise_for_status()
+            except httpx.HTTPStatusError as e:
+                # Log provider response for debugging
+                body = None
+                try:
+                    body = e.response.json()
+                except Exception:
+                    body = e.response.text
+                logging.getLogger("app.email").error("Resend error status=%s body=%s", e.response.status_code, body)
+                raise
+            # Success
             try:
-                body = e.response.json()
+                data = r.json()
             except Exception:
-                body = e.response.text
-            logging.getLogger("app.email").error("Resend error status=%s body=%s", e.response.status_code, body)
-            raise
-        # Success
-        try:
-            data = r.json()
-        except Exception:
-            data = {"text": r.text}
-        logging.getLogger("app.email").info("Resend sent reset code to %s id=%s", to, (data.get("id") if isinstance(data, dict) else "?"))
-        return {"provider": "resend", "status": r.status_code, "response": data}
+                data = {"text": r.text}
+            logging.getLogger("app.email").info("Resend sent reset code to %s id=%s", to, (data.get("id") if isinstance(data, dict) else "?"))
+            return {"provider": "resend", "status": r.status_code, "response": data}
+        attempts.append(("resend", via_resend))
 
     # Fallback to SMTP if configured
     host = os.getenv("SMTP_HOST")
@@ -414,37 +428,41 @@ def _send_reset_code_email(to: str, code: str, minutes: int) -> dict:
     user = os.getenv("SMTP_USER")
     pwd = os.getenv("SMTP_PASS")
     if host and user and pwd:
-        import smtplib
-
-        msg = EmailMessage()
-        msg["Subject"] = "SmartGrocery: Your reset code"
-        msg["From"] = frm
-        msg["To"] = to
-        msg.set_content(
-            f"Hello,\n\n"
-            f"We received a request to reset your SmartGrocery password.\n"
-            f"Reset code: {code}\n"
-            f"This code expires in {minutes} minutes.\n"
-            f"If you did not request this, you can ignore this email.\n"
-        )
-        msg.add_alternative(
-            f"""
-            <p>Hello,</p>
-            <p>We received a request to reset your SmartGrocery password.</p>
-            <p>Use this reset code in the app:</p>
-            <pre style=\"background:#f6f8fa;padding:12px;border-radius:6px;white-space:pre-wrap;word-break:break-all;\">{code}</pre>
-            <p>This code expires in {minutes} minutes.</p>
-            <p>If you did not request this, you can ignore this email.</p>
-            """,
-            subtype="html",
-        )
+        def via_smtp():
+            import smtplib
+
+            msg = EmailMessage()
+            msg["Subject"] = "SmartGrocery: Your reset code"
+            msg["From"] = frm
+            msg["To"] = to
+            msg.set_content(
+                f"Hello,\n\n"
+                f"We received a request to reset your SmartGrocery password.\n"
+                f"Reset code: {code}\n"
+                f"This code expires in {minutes} minutes.\n"
+                f"If you did not request this, you can ignore this email.\n"
+            )
+            msg.add_alternative(
+                f"""
+                <p>Hello,</p>
+                <p>We received a request to reset your SmartGrocery password.</p>
+                <p>Use this reset code in the app:</p>
+                <pre style=\"background:#f6f8fa;padding:12px;border-radius:6px;white-space:pre-wrap;word-break:break-all;\">{code}</pre>
+                <p>This code expires in {minutes} minutes.</p>
+                <p>If you did not request this, you can ignore this email.</p>
+                """,
+                subtype="html",
+            )
+
+            with email_throttle.slot("smtp", email_throttle.TRANSACTIONAL), smtplib.SMTP(host, port, timeout=10.0) as s:
+                s.starttls()
+                s.login(user, pwd)
+                s.send_message(msg)
+            return {"provider": "smtp"}
+        attempts.append(("smtp", via_smtp))
 
-        with smtplib.SMTP(host, port) as s:
-            s.starttls()
-            s.login(user, pwd)
-            s.send_message(msg)
-        return
     # Otherwise, no provider configured → do nothing
+    return email_breaker.deliver(attempts, kind="reset_code")
 
 
 # # app/routers/auth.py
@@ -1,9 +1,9 @@
 # app/routers/auth_google.py
 import os
+from functools import lru_cache
 from urllib.parse import urlencode
 from fastapi import APIRouter, Request, Depends
 from starlette.responses import RedirectResponse
-from authlib.integrations.starlette_client import OAuth, OAuthError
 from sqlalchemy.orm import Session
 
 from app.database import get_db
@@ -34,14 +34,19 @@ GOOGLE_CLIENT_SECRET = os.getenv("GOOGLE_CLIENT_SECRET")
 if not GOOGLE_CLIENT_ID or not GOOGLE_CLIENT_SECRET:
     raise RuntimeError("GOOGLE_CLIENT_ID and GOOGLE_CLIENT_SECRET must be set")
 
-oauth = OAuth()
-oauth.register(
-    name="google",
-    server_metadata_url="https://accounts.google.com/.well-known/openid-configuration",
-    client_id=GOOGLE_CLIENT_ID,
-    client_secret=GOOGLE_CLIENT_SECRET,
-    client_kwargs={"scope": "openid email profile"},
-)
+@lru_cache(maxsize=1)
+def _oauth():
+    # authlib (and httpx under it) is heavy; build the client on first login
+    from authlib.integrations.starlette_client import OAuth
+    oauth = OAuth()
+    oauth.register(
+        name="google",
+        server_metadata_url="https://accounts.google.com/.well-known/openid-configuration",
+        client_id=GOOGLE_CLIENT_ID,
+        client_secret=GOOGLE_CLIENT_SECRET,
+        client_kwargs={"scope": "openid email profile"},
+    )
+    return oauth
 
 # Optional: include token in fragment for Safari/ITP fallback
 TOKEN_IN_FRAGMENT = (os.getenv("OAUTH_TOKEN_IN_FRAGMENT", "1").lower() in ("1", "true", "yes"))
@@ -50,15 +55,16 @@ FRAGMENT_TOKEN_PARAM = os.getenv("OAUTH_FRAGMENT_TOKEN_PARAM") or COOKIE_NAME
 @router.get("/login")
 async def google_login(request: Request):
     redirect_uri = f"{_backend_url(request)}/auth/google/callback"
-    return await oauth.google.authorize_redirect(request, redirect_uri)
+    return await _oauth().google.authorize_redirect(request, redirect_uri)
 
 @router.get("/callback")
 async def google_callback(request: Request, db: Session = Depends(get_db)):
     if request.query_params.get("error"):
         return RedirectResponse(f"{_frontend_url()}/login")
 
+    from authlib.integrations.starlette_client import OAuthError
     try:
-        token = await oauth.google.authorize_access_token(request)
+        token = await _oauth().google.authorize_access_token(request)
     except OAuthError:
         return RedirectResponse(f"{_frontend_url()}/login")
 
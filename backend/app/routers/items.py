@@ -0,0 +1,60 @@
+# app/routers/items.py
+from datetime import date, timedelta
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import select, tuple_
+from sqlalchemy.orm import Session
+
+from app.database import get_read_db
+from app.deps import get_current_user_any_read as get_current_user_read
+from app.fast_json import json_response, rows_to_dicts
+from app.models import GroceryList, ListItem, User
+from app.permissions import readable_list_ids
+from app.schemas import ExpiringPage, ItemRead
+
+router = APIRouter(prefix="/items", tags=["items"])
+
+_FIELDS = tuple(ItemRead.model_fields) + ("list_name",)
+_COLUMNS = tuple(getattr(ListItem, f) for f in ItemRead.model_fields) + (GroceryList.name,)
+
+
+def _parse_cursor(cursor: str) -> tuple[date, int]:
+    try:
+        day, item_id = cursor.split(":", 1)
+        return date.fromisoformat(day), int(item_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+@router.get("/expiring", response_model=ExpiringPage)
+def expiring_items(
+    within_days: int = Query(default=7, ge=0, le=365),
+    limit: int = Query(default=50, ge=1, le=200),
+    cursor: str | None = None,
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user_read),
+):
+    """Items expiring within ``within_days`` (or already expired) across every readable list.
+
+    Ordered by (expiry, id) and paged by keyset: pass ``next_cursor`` back
+    as ``cursor``. One query per page, served by the (list_id, expiry)
+    index over the caller's lists.
+    """
+    stmt = (
+        select(*_COLUMNS)
+        .join(GroceryList, GroceryList.id == ListItem.list_id)
+        .where(
+            ListItem.list_id.in_(readable_list_ids(current_user.id)),
+            ListItem.expiry.is_not(None),
+            ListItem.expiry <= date.today() + timedelta(days=within_days),
+        )
+    )
+    if cursor:
+        stmt = stmt.where(tuple_(ListItem.expiry, ListItem.id) > _parse_cursor(cursor))
+    rows = db.execute(stmt.order_by(ListItem.expiry, ListItem.id).limit(limit + 1)).all()
+    page = rows_to_dicts(_FIELDS, rows[:limit])
+    next_cursor = None
+    if len(rows) > limit:
+        last = page[-1]
+        next_cursor = f"{last['expiry'].isoformat()}:{last['id']}"
+    return json_response({"items": page, "next_cursor": next_cursor})
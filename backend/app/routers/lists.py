@@ -1,17 +1,25 @@
 # app/routers/lists.py
-from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import Session
-from sqlalchemy import select, or_, and_
+from sqlalchemy import select, insert, update, func, literal, null, or_, and_
 
-from app.database import get_db
+from app.database import detached_session, get_db, get_read_db
 from app.models import GroceryList, User, ListItem, ListShare, ShareRole
 from app.schemas import (
-    ListCreate, ListRead, ListUpdate,
-    ItemCreate, ItemRead, ItemUpdate,
-    ShareCreate, ShareRead, ShareRoleUpdate,
+    ListCreate, ListRead, ListUpdate, ListDuplicate,
+    ItemCreate, ItemRead, ItemUpdate, ItemMove,
+    ShareCreate, ShareRead, ShareRoleUpdate, ShareBulkCreate, ShareBulkResult,
     ListReadEx,
 )
 from app.deps import get_current_user_any as get_current_user
+from app.deps import get_current_user_any_read as get_current_user_read
+from app.permissions import editable_list_ids
+from app.reminders import enqueue_list, sync_reminder_queue
+from app import list_io, list_purge, ordering, purchase_stats, suggest, sync
+from app.fast_json import json_response, rows_to_dicts
 
 router = APIRouter(prefix="/lists", tags=["lists"])
 
@@ -19,7 +27,7 @@ router = APIRouter(prefix="/lists", tags=["lists"])
 
 def _get_list_or_404(db: Session, list_id: int) -> GroceryList:
     gl = db.get(GroceryList, list_id)
-    if not gl:
+    if not gl or gl.deleted_at is not None:
         raise HTTPException(status_code=404, detail="List not found")
     return gl
 
@@ -51,6 +59,41 @@ def _require_edit(db: Session, gl: GroceryList, user: User):
     if not _can_edit(db, gl, user):
         raise HTTPException(status_code=404, detail="List not found")
 
+def _item_or_404(db: Session, item_id: int, user: User) -> tuple[int, int]:
+    """(list_id, version) of the item if the user may edit its list; one lookup, no locks."""
+    row = db.execute(
+        select(ListItem.list_id, ListItem.version, ListItem.list_id.in_(editable_list_ids(user.id)))
+        .where(ListItem.id == item_id)
+    ).first()
+    if row is None:
+        raise HTTPException(status_code=404, detail="Item not found")
+    if not row[2]:
+        raise HTTPException(status_code=404, detail="List not found")
+    return row[0], row[1]
+
+def _etag(version: int) -> str:
+    return f'"{version}"'
+
+def _stale_item(db: Session, item_id: int, user: User) -> HTTPException:
+    """412 carrying the current ETag; 404 (raised) if the item is gone or not editable."""
+    _, current = _item_or_404(db, item_id, user)
+    return HTTPException(
+        status_code=status.HTTP_412_PRECONDITION_FAILED,
+        detail="Item was modified by someone else",
+        headers={"ETag": _etag(current)},
+    )
+
+def _if_match_versions(if_match: str | None) -> list[int] | None:
+    """Item versions an If-Match header accepts; None when absent or "*" (unconditional)."""
+    if if_match is None or if_match.strip() == "*":
+        return None
+    versions = []
+    for tag in if_match.split(","):
+        tag = tag.strip().removeprefix("W/").strip('"')
+        if tag.isdigit():
+            versions.append(int(tag))
+    return versions  # nothing parseable matches nothing: 412
+
 # ---------- Lists ----------
 
 @router.post("/", response_model=ListRead, status_code=201)
@@ -61,69 +104,62 @@ def create_list(
 ):
     new = GroceryList(name=payload.name, owner_id=current_user.id)
     db.add(new)
+    db.flush()  # id and created_at come back with the INSERT (eager_defaults)
+    out = ListRead.model_validate(new)
     db.commit()
-    db.refresh(new)
-    return new
+    return out
+
+_LIST_COLUMNS = (GroceryList.id, GroceryList.name, GroceryList.owner_id, GroceryList.created_at)
 
 @router.get("/", response_model=list[ListReadEx])
 def read_lists(
     include_hidden: bool = False,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user_read),
 ):
+    # Fast path: Core rows straight to JSON bytes, same shape as ListReadEx
     # Owned lists
     owned = db.execute(
-        select(GroceryList).where(GroceryList.owner_id == current_user.id)
-    ).scalars().all()
+        select(*_LIST_COLUMNS).where(
+            GroceryList.owner_id == current_user.id, GroceryList.deleted_at.is_(None)
+        )
+    ).all()
 
     # Shared-to-me lists (optionally filter hidden)
     shared_rows = db.execute(
-        select(GroceryList, ListShare)
+        select(*_LIST_COLUMNS, ListShare.role, ListShare.hidden)
         .join(ListShare, ListShare.list_id == GroceryList.id)
         .where(
             and_(
                 ListShare.user_id == current_user.id,
+                GroceryList.deleted_at.is_(None),
                 True if include_hidden else (ListShare.hidden == False),
             )
         )
     ).all()
 
-    out: list[ListReadEx] = []
-
-    for gl in owned:
-        out.append(ListReadEx(
-            id=gl.id,
-            name=gl.name,
-            owner_id=gl.owner_id,
-            created_at=getattr(gl, "created_at", None),
-            shared=False,
-            role="owner",
-            hidden=False,
-        ))
-
-    for gl, sh in shared_rows:
-        out.append(ListReadEx(
-            id=gl.id,
-            name=gl.name,
-            owner_id=gl.owner_id,
-            created_at=getattr(gl, "created_at", None),
-            shared=True,
-            role=("editor" if sh.role == ShareRole.editor else "viewer"),
-            hidden=bool(sh.hidden),
-        ))
-
     # De-dup by id (owned wins)
     uniq = {}
-    for r in out:
-        if r.shared and r.id in uniq:
+    for id_, name, owner_id, created_at in owned:
+        uniq[id_] = {
+            "id": id_, "name": name, "owner_id": owner_id, "created_at": created_at,
+            "shared": False, "role": "owner", "hidden": False,
+        }
+    for id_, name, owner_id, created_at, role, hidden in shared_rows:
+        if id_ in uniq:
             # keep existing (owner) over shared
             continue
-        uniq[r.id] = r
+        uniq[id_] = {
+            "id": id_, "name": name, "owner_id": owner_id, "created_at": created_at,
+            "shared": True,
+            "role": ("editor" if role == ShareRole.editor else "viewer"),
+            "hidden": bool(hidden),
+        }
 
     # Sort newest first by created_at if available
     ordered = list(uniq.values())
-    ordered.sort(key=lambda r: (r.created_at or 0), reverse=True)
-    return ordered
+    ordered.sort(key=lambda r: (r["created_at"] or 0), reverse=True)
+    return json_response(ordered)
 
 @router.post("/{list_id}/hide", status_code=204)
 def hide_list_for_me(
@@ -142,8 +178,11 @@ def hide_list_for_me(
     ).scalar_one_or_none()
     if not share:
         raise HTTPException(status_code=404, detail="List not found")
-    share.hidden = True
-    db.commit()
+    # Stamp only real changes, so a repeated hide writes nothing and syncs nothing
+    if not share.hidden:
+        share.hidden = True
+        share.seq = sync.stamp(db)
+        db.commit()
     return Response(status_code=204)
 
 @router.delete("/{list_id}/hide", status_code=204)
@@ -152,15 +191,21 @@ def unhide_list_for_me(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
+    # Deleted (tombstoned) lists are gone for sharees too
     share = db.execute(
-        select(ListShare).where(
-            (ListShare.list_id == list_id) & (ListShare.user_id == current_user.id)
+        select(ListShare)
+        .join(GroceryList, GroceryList.id == ListShare.list_id)
+        .where(
+            (ListShare.list_id == list_id) & (ListShare.user_id == current_user.id),
+            GroceryList.deleted_at.is_(None),
         )
     ).scalar_one_or_none()
     if not share:
         raise HTTPException(status_code=404, detail="List not found")
-    share.hidden = False
-    db.commit()
+    if share.hidden:
+        share.hidden = False
+        share.seq = sync.stamp(db)
+        db.commit()
     return Response(status_code=204)
 
 @router.delete("/{list_id}", status_code=204)
@@ -169,19 +214,70 @@ def delete_list(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    gl = db.get(GroceryList, list_id)
-    if not gl or gl.owner_id != current_user.id:
+    # Tombstone only: one UPDATE whatever the list size; app/list_purge.py
+    # deletes the items in batches afterwards
+    res = db.execute(
+        update(GroceryList)
+        .where(
+            GroceryList.id == list_id,
+            GroceryList.owner_id == current_user.id,
+            GroceryList.deleted_at.is_(None),
+        )
+        .values(deleted_at=func.now(), change_seq=sync.stamp(db))
+    )
+    if res.rowcount == 0:
         raise HTTPException(status_code=404, detail="List not found")
-    db.delete(gl)
     db.commit()
+    list_purge.notify()
     return Response(status_code=204)
 
+@router.post("/{list_id}/duplicate", response_model=ListRead, status_code=201)
+def duplicate_list(
+    list_id: int,
+    payload: ListDuplicate | None = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    payload = payload or ListDuplicate()
+    gl = _get_list_or_404(db, list_id)
+    _require_read(db, gl, current_user)
+
+    new = GroceryList(name=payload.name or f"{gl.name} (copy)", owner_id=current_user.id)
+    db.add(new)
+    db.flush()
+    out = ListRead.model_validate(new)
+
+    # Copies start unpurchased (a new shopping trip, not a purchase event)
+    # and keep their order; reminders restart unless dropped. Reads break
+    # position ties (and unpositioned "" items) by id, so the copies get
+    # their new ids in that same order.
+    copy = select(
+        ListItem.name, ListItem.quantity, ListItem.expiry, ListItem.description,
+        null() if payload.reset_reminders else ListItem.remind_on,
+        literal(False), ListItem.position, literal(out.id),
+    ).where(ListItem.list_id == list_id).order_by(ListItem.position, ListItem.id)
+    if payload.unpurchased_only:
+        copy = copy.where(ListItem.purchased.is_(False))
+    db.execute(
+        insert(ListItem).from_select(
+            ["name", "quantity", "expiry", "description", "remind_on", "purchased", "position", "list_id"],
+            copy,
+        )
+    )
+    if not payload.reset_reminders:
+        enqueue_list(db, out.id)
+    user_id = current_user.id
+    db.commit()
+    suggest.get_index().invalidate(user_id)
+    return out
+
 # ---------- Items ----------
 
 @router.post("/{list_id}/items", response_model=ItemRead, status_code=status.HTTP_201_CREATED)
 def add_item(
     list_id: int,
     payload: ItemCreate,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
@@ -196,60 +292,198 @@ def add_item(
         remind_on=payload.remind_on,
         purchased=(payload.purchased if payload.purchased is not None else False),
         list_id=list_id,
+        seq=sync.stamp(db),
+        version=1,
+        # Appended; two concurrent appends can tie, which GET orders by id
+        # and the next move next to them rebalances (app/ordering.py)
+        position=ordering.key_between(ordering.last_key(db, list_id), None),
     )
     db.add(item)
+    db.flush()
+    sync_reminder_queue(db, item)
+    if item.purchased:
+        purchase_stats.record_purchase(db, gl.owner_id, item.name)
+    # Serialize before commit: every field is known here, so no reload round trip
+    out = ItemRead.model_validate(item)
+    owner_id = gl.owner_id
     db.commit()
-    db.refresh(item)
-    return item
+    response.headers["ETag"] = _etag(out.version)
+    suggest.get_index().record(owner_id, out.name)
+    return out
+
+_ITEM_FIELDS = tuple(ItemRead.model_fields)
+_ITEM_COLUMNS = tuple(getattr(ListItem, f) for f in _ITEM_FIELDS)
+_LIST_OWNER = (
+    select(GroceryList.owner_id).where(GroceryList.id == ListItem.list_id).scalar_subquery().label("owner_id")
+)
 
 @router.get("/{list_id}/items", response_model=list[ItemRead])
 def get_items(
     list_id: int,
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user_read),
+):
+    gl = _get_list_or_404(db, list_id)
+    _require_read(db, gl, current_user)
+    # Fast path: select only the ItemRead columns and encode rows directly
+    rows = db.execute(
+        select(*_ITEM_COLUMNS)
+        .where(ListItem.list_id == list_id)
+        .order_by(ListItem.position, ListItem.id)
+    ).all()
+    return json_response(rows_to_dicts(_ITEM_FIELDS, rows))
+
+@router.get("/{list_id}/export")
+def export_items(
+    list_id: int,
+    fmt: str = Query("csv", alias="format", pattern="^(csv|ndjson)$"),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user_read),
+):
+    gl = _get_list_or_404(db, list_id)
+    _require_read(db, gl, current_user)
+    return StreamingResponse(
+        list_io.iter_export(lambda: detached_session(db), list_id, fmt),
+        media_type=list_io.FORMATS[fmt],
+        headers={"Content-Disposition": f'attachment; filename="list-{list_id}.{fmt}"'},
+    )
+
+@router.post("/{list_id}/import")
+def import_items(
+    list_id: int,
+    request: Request,
+    fmt: str = Query("csv", alias="format", pattern="^(csv|ndjson)$"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
     gl = _get_list_or_404(db, list_id)
-    _require_read(db, gl, current_user)
-    return db.execute(
-        select(ListItem).where(ListItem.list_id == list_id)
-    ).scalars().all()
+    _require_edit(db, gl, current_user)
+    # All-or-nothing: a bad record raises before commit and the session rolls back on close
+    seq = sync.current_stamp(db)
+    imported = list_io.import_items(
+        db, list_id, list_io.body_lines(request), fmt,
+        seq=seq, after=ordering.last_key(db, list_id), owner_id=gl.owner_id,
+    )
+    enqueue_list(db, list_id)
+    owner_id = gl.owner_id
+    db.commit()
+    suggest.get_index().invalidate(owner_id)
+    return {"imported": imported}
 
 @router.patch("/items/{item_id}", response_model=ItemRead)
 def update_item(
     item_id: int,
     payload: ItemUpdate,
+    response: Response,
+    if_match: str | None = Header(default=None),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    item = db.get(ListItem, item_id)
-    if not item:
-        raise HTTPException(status_code=404, detail="Item not found")
-    gl = _get_list_or_404(db, item.list_id)
-    _require_edit(db, gl, current_user)
+    versions = _if_match_versions(if_match)
 
-    if payload.name is not None:
-        item.name = payload.name or item.name
+    values = {}
+    if payload.name:
+        values["name"] = payload.name
     if payload.quantity is not None:
-        item.quantity = payload.quantity
+        values["quantity"] = payload.quantity
     if payload.expiry is not None:
-        item.expiry = payload.expiry
+        values["expiry"] = payload.expiry
     if payload.description is not None:
         # allow clearing description with empty string
-        item.description = payload.description or None
-    try:
-        provided = getattr(payload, "model_fields_set", set())
-    except Exception:
-        provided = set()
-    if "remind_on" in provided:
+        values["description"] = payload.description or None
+    if "remind_on" in payload.model_fields_set:
         # allow setting or clearing
-        item.remind_on = payload.remind_on
-        item.reminded_at = None
+        values["remind_on"] = payload.remind_on
+        values["reminded_at"] = None
+
+    if not values and payload.purchased is None:
+        # Nothing to change: no write, so no new version and no sync stamp
+        row = db.execute(
+            select(*_ITEM_COLUMNS)
+            .where(ListItem.id == item_id, ListItem.list_id.in_(editable_list_ids(current_user.id)))
+        ).first()
+        if row is None or (versions is not None and row.version not in versions):
+            raise _stale_item(db, item_id, current_user)
+        out = ItemRead.model_validate(row)
+        response.headers["ETag"] = _etag(out.version)
+        return out
+
+    # Optimistic concurrency: permission check, version check and write in one
+    # conditional UPDATE; nothing is locked beyond the item row itself
+    stmt = (
+        update(ListItem)
+        .where(ListItem.id == item_id, ListItem.list_id.in_(editable_list_ids(current_user.id)))
+        .values(**values, seq=sync.stamp(db), version=ListItem.version + 1)
+        .returning(*_ITEM_COLUMNS, ListItem.reminded_at, _LIST_OWNER)
+        .execution_options(synchronize_session=False)
+    )
+    if versions is not None:
+        stmt = stmt.where(ListItem.version.in_(versions))
+    attempts = [(False, stmt)]
     if payload.purchased is not None:
-        item.purchased = bool(payload.purchased)
+        # RETURNING only has new values; the WHERE tells whether purchased flipped.
+        # Toggles are the common case, so try the flip first.
+        purchased = bool(payload.purchased)
+        stmt = stmt.values(purchased=purchased)
+        attempts = [(True, stmt.where(ListItem.purchased != purchased)),
+                    (False, stmt.where(ListItem.purchased == purchased))]
+    # A toggle by someone else between the two attempts makes both miss;
+    # without If-Match that is no conflict, so go round again
+    rounds = 3 if versions is None and len(attempts) == 2 else 1
+    for flipped, attempt in attempts * rounds:
+        row = db.execute(attempt).first()
+        if row is not None:
+            break
+    else:
+        # A version that no longer matches (412), or a missing item or list (404)
+        if versions is not None:
+            raise _stale_item(db, item_id, current_user)
+        _item_or_404(db, item_id, current_user)
+        raise HTTPException(status_code=409, detail="Item is being changed concurrently, retry")
+    owner_id = row.owner_id
+
+    if flipped and row.purchased:
+        # Count the purchase in the rollup, in the same transaction
+        purchase_stats.record_purchase(db, owner_id, row.name)
+    if "remind_on" in values or payload.purchased is not None:
+        sync_reminder_queue(db, row)
+
+    out = ItemRead.model_validate(row)
+    db.commit()
+    response.headers["ETag"] = _etag(out.version)
+    if payload.name:
+        suggest.get_index().record(owner_id, out.name)
+    return out
 
+@router.post("/items/{item_id}/move", response_model=ItemRead)
+def move_item(
+    item_id: int,
+    payload: ItemMove,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    if payload.after_id == item_id:
+        raise HTTPException(status_code=422, detail="Cannot move an item after itself")
+    list_id, _ = _item_or_404(db, item_id, current_user)
+    try:
+        key = ordering.key_for_move(db, list_id, item_id, payload.after_id)
+        if key is None:
+            # Unpositioned or tied neighbours: give the whole list keys once, then place the item
+            ordering.rebalance(db, list_id)
+            key = ordering.key_for_move(db, list_id, item_id, payload.after_id)
+    except LookupError:
+        raise HTTPException(status_code=404, detail="Item not found")
+    # One row rewritten, however long the list; version is kept, order is not an edit conflict
+    row = db.execute(
+        update(ListItem)
+        .where(ListItem.id == item_id)
+        .values(position=key, seq=sync.stamp(db))
+        .returning(*_ITEM_COLUMNS)
+        .execution_options(synchronize_session=False)
+    ).first()
+    out = ItemRead.model_validate(row)
     db.commit()
-    db.refresh(item)
-    return item
+    return out
 
 @router.delete("/items/{item_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_item(
@@ -262,6 +496,7 @@ def delete_item(
         raise HTTPException(status_code=404, detail="Item not found")
     gl = _get_list_or_404(db, item.list_id)
     _require_edit(db, gl, current_user)
+    sync.tombstone(db, item.list_id, "item", item.id)
     db.delete(item)
     db.commit()
     return Response(status_code=status.HTTP_204_NO_CONTENT)
@@ -271,26 +506,29 @@ def delete_item(
 @router.get("/{list_id}/share", response_model=list[ShareRead])
 def list_shares(
     list_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user_read),
 ):
     gl = _get_list_or_404(db, list_id)
     if gl.owner_id != current_user.id:
         raise HTTPException(status_code=404, detail="List not found")
 
-    shares = db.execute(
-        select(ListShare).where(ListShare.list_id == list_id)
-    ).scalars().all()
+    # One query: join the sharee's email instead of lazy-loading s.user per share
+    rows = db.execute(
+        select(ListShare.id, ListShare.list_id, ListShare.user_id, User.email, ListShare.role)
+        .outerjoin(User, User.id == ListShare.user_id)
+        .where(ListShare.list_id == list_id)
+    ).all()
 
     return [
         ShareRead(
-            id=s.id,
-            list_id=s.list_id,
-            user_id=s.user_id,
-            email=s.user.email if s.user else "",
-            role=s.role.value if hasattr(s.role, "value") else str(s.role),
+            id=id_,
+            list_id=list_id_,
+            user_id=user_id,
+            email=email or "",
+            role=role.value if hasattr(role, "value") else str(role),
         )
-        for s in shares
+        for id_, list_id_, user_id, email, role in rows
     ]
 
 @router.post("/{list_id}/share", response_model=ShareRead, status_code=201)
@@ -320,26 +558,101 @@ def create_or_update_share(
     ).scalar_one_or_none()
 
     if share:
-        share.role = ShareRole(payload.role)
+        if share.role != ShareRole(payload.role):
+            share.role = ShareRole(payload.role)
+            share.seq = sync.stamp(db)
     else:
         share = ListShare(
             list_id=list_id,
             user_id=target.id,
             role=ShareRole(payload.role),
             hidden=False,
+            seq=sync.stamp(db),
         )
         db.add(share)
+    db.flush()
 
-    db.commit()
-    db.refresh(share)
-
-    return ShareRead(
+    out = ShareRead(
         id=share.id,
         list_id=share.list_id,
         user_id=share.user_id,
         email=target.email,
         role=share.role.value,
     )
+    db.commit()
+    return out
+
+def _upsert_shares(db: Session, rows: list[dict]):
+    """INSERT ... ON CONFLICT (list_id, user_id) DO UPDATE role, RETURNING the shares."""
+    if db.get_bind().dialect.name == "postgresql":
+        stmt = pg_insert(ListShare).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            constraint="uq_list_share_list_user",
+            set_={"role": stmt.excluded.role, "seq": stmt.excluded.seq},
+        )
+    else:
+        stmt = sqlite_insert(ListShare).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[ListShare.list_id, ListShare.user_id],
+            set_={"role": stmt.excluded.role, "seq": stmt.excluded.seq},
+        )
+    return db.execute(stmt.returning(ListShare.id, ListShare.user_id)).all()
+
+@router.post("/{list_id}/share/bulk", response_model=list[ShareBulkResult])
+def bulk_share(
+    list_id: int,
+    payload: ShareBulkCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Share with many emails at once; one result per distinct email, in request order."""
+    gl = _get_list_or_404(db, list_id)
+    if gl.owner_id != current_user.id:
+        raise HTTPException(status_code=404, detail="List not found")
+
+    requested: dict[str, str] = {}
+    for e in payload.emails:
+        requested.setdefault(e.lower(), e)
+    # One lookup for every email; a stored address spelled as requested wins over a case variant
+    users: dict[str, tuple[int, str]] = {}
+    for uid, email in db.execute(
+        select(User.id, User.email).where(func.lower(User.email).in_(list(requested)))
+    ):
+        key = email.lower()
+        if key not in users or email == requested[key]:
+            users[key] = (uid, email)
+    me = current_user.email.lower()
+    targets = {uid for key, (uid, _) in users.items() if key != me}
+
+    shared: dict[int, int] = {}
+    existing: set[int] = set()
+    if targets:
+        # "created" vs "updated" is only a label: a concurrent share of the same
+        # user can make both requests report "created", the upsert keeps one row
+        existing = set(db.execute(
+            select(ListShare.user_id).where(ListShare.list_id == list_id, ListShare.user_id.in_(targets))
+        ).scalars())
+        role = ShareRole(payload.role)
+        shared = {user_id: share_id for share_id, user_id in _upsert_shares(db, [
+            {"list_id": list_id, "user_id": uid, "role": role, "hidden": False, "seq": sync.stamp(db)}
+            for uid in targets
+        ])}
+
+    results = []
+    for key, asked in requested.items():
+        if key == me:
+            results.append(ShareBulkResult(email=asked, status="self"))
+        elif key not in users:
+            results.append(ShareBulkResult(email=asked, status="user_not_found"))
+        else:
+            uid, email = users[key]
+            results.append(ShareBulkResult(
+                email=asked,
+                status="updated" if uid in existing else "created",
+                share=ShareRead(id=shared[uid], list_id=list_id, user_id=uid, email=email, role=payload.role),
+            ))
+    db.commit()
+    return results
 
 @router.patch("/{list_id}/share/{share_id}", response_model=ShareRead)
 def update_share_role(
@@ -357,18 +670,19 @@ def update_share_role(
     if not share or share.list_id != list_id:
         raise HTTPException(status_code=404, detail="Share not found")
 
-    share.role = ShareRole(payload.role)
-    db.commit()
-    db.refresh(share)
-
+    if share.role != ShareRole(payload.role):
+        share.role = ShareRole(payload.role)
+        share.seq = sync.stamp(db)
     target = db.get(User, share.user_id)
-    return ShareRead(
+    out = ShareRead(
         id=share.id,
         list_id=share.list_id,
         user_id=share.user_id,
         email=target.email if target else "",
         role=share.role.value,
     )
+    db.commit()
+    return out
 
 @router.delete("/{list_id}/share/{share_id}", status_code=204)
 def revoke_share(
@@ -385,6 +699,7 @@ def revoke_share(
     if not share or share.list_id != list_id:
         raise HTTPException(status_code=404, detail="Share not found")
 
+    sync.tombstone(db, list_id, "share", share.id)
     db.delete(share)
     db.commit()
     return Response(status_code=204)
@@ -396,12 +711,21 @@ def rename_list(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    gl = db.get(GroceryList, list_id)
-    if not gl or gl.owner_id != current_user.id:
+    gl = _get_list_or_404(db, list_id)
+    if gl.owner_id != current_user.id:
         raise HTTPException(status_code=404, detail="List not found")
-    gl.name = payload.name.strip()
-    if not gl.name:
+    name = payload.name.strip()
+    if not name:
         raise HTTPException(status_code=400, detail="Name cannot be empty")
-    db.commit()
-    db.refresh(gl)
-    return gl
+    out = ListRead(id=gl.id, name=name, owner_id=gl.owner_id, created_at=gl.created_at)
+    # Name and sync stamp in one UPDATE, with no reload of the stamped value;
+    # the same name again is not a change
+    if name != gl.name:
+        db.execute(
+            update(GroceryList)
+            .where(GroceryList.id == list_id)
+            .values(name=name, change_seq=sync.stamp(db))
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+    return out
@@ -6,11 +6,12 @@ from app.database import get_db
 from app.models import User
 from app.schemas import UserProfileRead, UserMeUpdate
 from app.deps import get_current_user_any as get_current_user
+from app.deps import get_current_user_any_read as get_current_user_read
 
 router = APIRouter(tags=["me"])
 
 @router.get("/me", response_model=UserProfileRead)
-def get_me(current: User = Depends(get_current_user)):
+def get_me(current: User = Depends(get_current_user_read)):
     return current
 
 @router.patch("/me", response_model=UserProfileRead)
@@ -30,6 +31,6 @@ def update_me(
         # store None when blank
         current.picture = (data["picture"] or None)
 
+    out = UserProfileRead.model_validate(current)
     db.commit()
-    db.refresh(current)
-    return current
+    return out
@@ -0,0 +1,26 @@
+# app/routers/metrics.py
+import os
+
+from fastapi import APIRouter, Header, HTTPException
+from fastapi.responses import PlainTextResponse
+
+from app import metrics
+
+router = APIRouter(tags=["metrics"])
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def prometheus_metrics(
+    x_api_key: str | None = Header(default=None, alias="x-api-key"),
+    authorization: str | None = Header(default=None),
+):
+    """Prometheus text exposition for this process.
+
+    When METRICS_TOKEN is set, scrapers must send it as a Bearer token or x-api-key.
+    """
+    token = os.getenv("METRICS_TOKEN")
+    if token:
+        bearer = authorization.split(" ", 1)[1] if authorization and authorization.lower().startswith("bearer ") else None
+        if token not in (x_api_key, bearer):
+            raise HTTPException(status_code=401, detail="Unauthorized")
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
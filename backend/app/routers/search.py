@@ -0,0 +1,28 @@
+# app/routers/search.py
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from app import search
+from app.database import get_read_db
+from app.deps import get_current_user_any_read as get_current_user_read
+from app.fast_json import json_response, rows_to_dicts
+from app.models import User
+from app.schemas import ItemSearchPage
+
+router = APIRouter(prefix="/search", tags=["search"])
+
+
+@router.get("/items", response_model=ItemSearchPage)
+def search_items(
+    q: str = Query(min_length=1, max_length=100),
+    limit: int = Query(default=20, ge=1, le=100),
+    offset: int = Query(default=0, ge=0, le=1000),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user_read),
+):
+    """Items matching ``q`` in the caller's own and shared lists, best match first."""
+    rows, more = search.search_items(db, current_user.id, q.strip(), limit, offset)
+    return json_response({
+        "results": rows_to_dicts(search.FIELDS, rows),
+        "next_offset": offset + limit if more else None,
+    })
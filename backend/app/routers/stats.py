@@ -0,0 +1,48 @@
+# app/routers/stats.py
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.database import get_read_db
+from app.deps import get_current_user_any_read as get_current_user_read
+from app.fast_json import json_response, rows_to_dicts
+from app.models import PurchaseStat, User
+from app.schemas import PurchaseStatRead
+
+router = APIRouter(prefix="/stats", tags=["stats"])
+
+_FIELDS = ("name", "count", "last_purchased_at")
+_COLUMNS = (PurchaseStat.display_name, PurchaseStat.count, PurchaseStat.last_purchased_at)
+
+
+def _top(db: Session, user_id: int, order, limit: int):
+    # Reads only the rollup; both orders are served by a (user_id, ...) index
+    rows = db.execute(
+        select(*_COLUMNS)
+        .where(PurchaseStat.user_id == user_id, PurchaseStat.count > 0)
+        .order_by(*order)
+        .limit(limit)
+    ).all()
+    return json_response(rows_to_dicts(_FIELDS, rows))
+
+
+@router.get("/buy-again", response_model=list[PurchaseStatRead])
+def buy_again(
+    limit: int = Query(default=20, ge=1, le=100),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user_read),
+):
+    """Most recently purchased item names."""
+    order = (PurchaseStat.last_purchased_at.desc().nulls_last(), PurchaseStat.count.desc())
+    return _top(db, current_user.id, order, limit)
+
+
+@router.get("/frequent", response_model=list[PurchaseStatRead])
+def frequent(
+    limit: int = Query(default=20, ge=1, le=100),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user_read),
+):
+    """Most often purchased item names."""
+    order = (PurchaseStat.count.desc(), PurchaseStat.last_purchased_at.desc().nulls_last())
+    return _top(db, current_user.id, order, limit)
@@ -0,0 +1,24 @@
+# app/routers/suggest.py
+from fastapi import APIRouter, Depends, Query
+
+from app import suggest
+from app.database import get_lazy_read_db
+from app.deps import get_current_user_id
+from app.fast_json import json_response
+
+router = APIRouter(prefix="/suggest", tags=["suggest"])
+
+
+@router.get("", response_model=list[str])
+def suggest_names(
+    prefix: str = Query(default="", max_length=100),
+    limit: int = Query(default=10, ge=1, le=50),
+    open_session=Depends(get_lazy_read_db),
+    user_id: int = Depends(get_current_user_id),
+):
+    """Item names from the caller's history starting with ``prefix``, most used and recent first.
+
+    Served from memory once the caller's index is warm: no session and no
+    admission slot unless the index has to be (re)built.
+    """
+    return json_response(suggest.get_index().suggest(open_session, user_id, prefix, limit))
@@ -0,0 +1,25 @@
+# app/routers/sync.py
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+
+from app import sync
+from app.database import get_read_db
+from app.deps import get_current_user_any_read as get_current_user_read
+from app.fast_json import json_response
+from app.models import User
+
+router = APIRouter(prefix="/sync", tags=["sync"])
+
+
+@router.get("")
+def delta_sync(
+    since: str | None = None,
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user_read),
+):
+    """Lists, items and shares changed since the ``since`` token, plus deletes and a new token.
+
+    Without ``since`` everything readable is returned. Apply the response,
+    store ``token`` and send it back next time.
+    """
+    return json_response(sync.changes(db, current_user, since))
@@ -1,64 +1,74 @@
 # app/routers/tasks.py
+import logging
+import math
 import os
-from datetime import datetime, date
+import time
+from datetime import datetime, date, timezone
 from typing import Dict, List
 
-from fastapi import APIRouter, Header, HTTPException
-from sqlalchemy import select, and_
+from fastapi import APIRouter, Header, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+from sqlalchemy import select
+from sqlalchemy.orm import Session
 
-from app.database import SessionLocal
-from app.models import ListItem, GroceryList, User
+from app import email_breaker, email_throttle, list_purge, ordering, profiling, purchase_stats
+from app.database import ROUTE_BACKGROUND, SessionLocal
+from app.models import ListItem, GroceryList, User, ReminderQueue, ReminderRun
 from app.email_resend import ensure_contact
+from app.metrics import REMINDER_STAGE
+from app.reminders import claim_reminders, pop_reminders
 
 router = APIRouter(prefix="/tasks", tags=["tasks"])
 
 
 def _send_email(to: str, subject: str, html: str, text: str | None = None) -> None:
+    """Send via Resend, failing over to SMTP; no-op when neither is configured."""
     frm = os.getenv("EMAIL_FROM") or "SmartGrocery <no-reply@smartgrocery.online>"
+    attempts = []
+
     rk = os.getenv("RESEND_API_KEY")
     if rk:
-        import httpx
-
-        payload = {"from": frm, "to": [to], "subject": subject, "html": html}
-        if text:
-            payload["text"] = text
-        r = httpx.post(
-            "https://api.resend.com/emails",
-            headers={"Authorization": f"Bearer {rk}", "Content-Type": "application/json"},
-            json=payload,
-            timeout=10.0,
-        )
-        r.raise_for_status()
-        return
+        def via_resend():
+            payload = {"from": frm, "to": [to], "subject": subject, "html": html}
+            if text:
+                payload["text"] = text
+            r = email_throttle.post(
+                "resend",
+                "https://api.resend.com/emails",
+                priority=email_throttle.BULK,
+                headers={"Authorization": f"Bearer {rk}", "Content-Type": "application/json"},
+                json=payload,
+                timeout=10.0,
+            )
+            r.raise_for_status()
+        attempts.append(("resend", via_resend))
 
     host = os.getenv("SMTP_HOST")
     port = int(os.getenv("SMTP_PORT", "587"))
     user = os.getenv("SMTP_USER")
     pwd = os.getenv("SMTP_PASS")
     if host and user and pwd:
-        from email.message import EmailMessage
-        import smtplib
-
-        msg = EmailMessage()
-        msg["Subject"] = subject
-        msg["From"] = frm
-        msg["To"] = to
-        if text:
-            msg.set_content(text)
-        msg.add_alternative(html, subtype="html")
-        with smtplib.SMTP(host, port) as s:
-            s.starttls()
-            s.login(user, pwd)
-            s.send_message(msg)
-        return
-    # No provider configured - noop
+        def via_smtp():
+            from email.message import EmailMessage
+            import smtplib
 
+            msg = EmailMessage()
+            msg["Subject"] = subject
+            msg["From"] = frm
+            msg["To"] = to
+            if text:
+                msg.set_content(text)
+            msg.add_alternative(html, subtype="html")
+            with email_throttle.slot("smtp", email_throttle.BULK), smtplib.SMTP(host, port, timeout=10.0) as s:
+                s.starttls()
+                s.login(user, pwd)
+                s.send_message(msg)
+        attempts.append(("smtp", via_smtp))
 
-@router.post("/run-reminders")
-def run_reminders(
-    x_api_key: str | None = Header(default=None, alias="x-api-key"),
-    authorization: str | None = Header(default=None),
-):
+    email_breaker.deliver(attempts, kind="reminder")
+
+
+def _require_cron_secret(x_api_key: str | None, authorization: str | None) -> None:
     secret = os.getenv("CRON_SECRET")
     token_ok = False
     if secret:
@@ -69,44 +79,94 @@ def run_reminders(
         if not token_ok:
             raise HTTPException(status_code=401, detail="Unauthorized")
 
-    # Only open DB session after passing authorization (saves a connection on unauthorized calls).
-    db = SessionLocal()
+
+def _require_configured_cron_secret(x_api_key: str | None, authorization: str | None) -> None:
+    # Stack dumps expose code paths and data: without CRON_SECRET these routes do not exist
+    if not os.getenv("CRON_SECRET"):
+        raise HTTPException(status_code=404, detail="Not Found")
+    _require_cron_secret(x_api_key, authorization)
+
+
+def _percentile(values: List[float], pct: float) -> float | None:
+    if not values:
+        return None
+    ordered = sorted(values)
+    # Nearest rank: the smallest value with at least pct% of the values at or below it
+    k = max(0, min(len(ordered) - 1, math.ceil(pct / 100.0 * len(ordered)) - 1))
+    return round(ordered[k], 2)
+
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000.0, 2)
+
+
+def send_due_reminders(
+    db: Session,
+    today: date,
+    item_ids: List[int] | None = None,
+    dry_run: bool = False,
+    trigger: str = "cron",
+) -> dict:
+    """Send one digest per owner for queued reminders due on or before ``today``.
+
+    ``item_ids`` narrows the run to specific queue entries (used by the
+    in-process scheduler); stale entries are popped either way. Entries are
+    claimed up front (``claim_reminders``), so a concurrent run never sends
+    the same reminder twice.
+    ``dry_run`` renders every digest but sends nothing and changes nothing.
+
+    Returns a report with row/owner counts, digest bytes and per-stage
+    timings; real runs are also recorded in ``reminder_run``.
+    """
+    started_at = datetime.now(timezone.utc)
+    t_query = t_render = t_send = t_mark = 0.0
+    send_latencies: List[float] = []
+    digest_bytes = 0
+    failed = 0
+
+    # Pop due entries from reminder_queue instead of scanning list_item;
+    # the outer join also surfaces stale entries (item deleted/purchased).
+    t0 = time.perf_counter()
+    if not dry_run:
+        item_ids = claim_reminders(db, today, item_ids)
+    stmt = (
+        select(ReminderQueue.item_id, ListItem, GroceryList, User)
+        .outerjoin(ListItem, ListItem.id == ReminderQueue.item_id)
+        .outerjoin(GroceryList, ListItem.list_id == GroceryList.id)
+        .outerjoin(User, GroceryList.owner_id == User.id)
+        .where(ReminderQueue.remind_on <= today)
+    )
+    if item_ids is not None:
+        stmt = stmt.where(ReminderQueue.item_id.in_(item_ids))
+    q = db.execute(stmt).all()
+    t_query = time.perf_counter() - t0
+
+    # Group by owner
+    grouped: Dict[int, List[ListItem]] = {}
+    owners: Dict[int, User] = {}
+    stale: List[int] = []
+    for item_id, item, gl, owner in q:
+        if (
+            item is None or owner is None or gl.deleted_at is not None
+            or item.reminded_at is not None or item.purchased
+        ):
+            stale.append(item_id)
+            continue
+        owners[owner.id] = owner
+        grouped.setdefault(owner.id, []).append((item, gl))
+
+    if stale and not dry_run:
+        t0 = time.perf_counter()
+        pop_reminders(db, stale)
+        db.commit()
+        t_mark += time.perf_counter() - t0
+
+    total_sent = 0
+    now = datetime.utcnow()
     try:
-        today = date.today()
-        # Items to remind: remind_on <= today and (reminded_at is null or reminded_at < remind_on)
-        q = (
-            db.execute(
-                select(ListItem, GroceryList, User)
-                .join(GroceryList, ListItem.list_id == GroceryList.id)
-                .join(User, GroceryList.owner_id == User.id)
-                .where(
-                    and_(
-                        ListItem.remind_on.is_not(None),
-                        ListItem.remind_on <= today,
-                        ListItem.reminded_at.is_(None),
-                        ListItem.purchased.is_(False),
-                    )
-                )
-            )
-            .all()
-        )
-
-        if not q:
-            return {"ok": True, "sent": 0}
-
-        # Group by owner
-        grouped: Dict[int, List[ListItem]] = {}
-        owners: Dict[int, User] = {}
-        lists_map: Dict[int, GroceryList] = {}
-        for item, gl, owner in q:
-            owners[owner.id] = owner
-            lists_map[gl.id] = gl
-            grouped.setdefault(owner.id, []).append((item, gl))
-
-        total_sent = 0
-        now = datetime.utcnow()
         for owner_id, pairs in grouped.items():
             owner = owners[owner_id]
+            t0 = time.perf_counter()
             # Build digest HTML
             rows = []
             text_rows = []
@@ -130,18 +190,192 @@ def run_reminders(
                 + "\n".join(text_rows)
                 + "\n\nYou can adjust or clear reminders in the app.\n"
             )
+            digest_bytes += len(html.encode("utf-8")) + len(text.encode("utf-8"))
+            t_render += time.perf_counter() - t0
+            if dry_run:
+                continue
+
+            t0 = time.perf_counter()
             try:
                 if (os.getenv("RESEND_ENFORCE_AUDIENCE", "").lower() in ("1", "true", "yes")):
                     ensure_contact(owner.email, owner.name)
             except Exception:
                 pass
-            _send_email(owner.email, "SmartGrocery reminders", html, text)
+            try:
+                _send_email(owner.email, "SmartGrocery reminders", html, text)
+            except Exception:
+                failed += 1
+                raise
+            finally:
+                elapsed = time.perf_counter() - t0
+                t_send += elapsed
+                send_latencies.append(elapsed * 1000.0)
             total_sent += 1
+
             # Mark items as reminded
+            t0 = time.perf_counter()
             for item, _ in pairs:
                 item.reminded_at = now
+            pop_reminders(db, [item.id for item, _ in pairs])
             db.commit()
+            t_mark += time.perf_counter() - t0
+    finally:
+        report = {
+            "dry_run": dry_run,
+            "trigger": trigger,
+            "rows_scanned": len(q),
+            "stale": len(stale),
+            "owners": len(grouped),
+            "items": sum(len(p) for p in grouped.values()),
+            "sent": total_sent,
+            "failed": failed,
+            "digest_bytes": digest_bytes,
+            "query_ms": _ms(t_query),
+            "render_ms": _ms(t_render),
+            "send_ms": _ms(t_send),
+            "mark_ms": _ms(t_mark),
+            "send_p50_ms": _percentile(send_latencies, 50),
+            "send_p99_ms": _percentile(send_latencies, 99),
+        }
+        if not dry_run:
+            _record_run(db, started_at, report)
+            for stage, seconds in (("query", t_query), ("render", t_render), ("send", t_send), ("mark", t_mark)):
+                REMINDER_STAGE.observe(seconds, trigger, stage)
+            REMINDER_STAGE.observe((datetime.now(timezone.utc) - started_at).total_seconds(), trigger, "total")
+    return report
+
+
+def _record_run(db: Session, started_at: datetime, report: dict) -> None:
+    try:
+        db.rollback()  # drop anything half-done by a failed send before recording
+        db.add(ReminderRun(
+            started_at=started_at,
+            finished_at=datetime.now(timezone.utc),
+            **{k: v for k, v in report.items() if k not in ("dry_run", "stale")},
+        ))
+        db.commit()
+    except Exception:
+        logging.getLogger("app.reminders").exception("Could not record reminder run")
+        db.rollback()
+
+
+@router.post("/run-reminders")
+def run_reminders(
+    dry_run: bool = False,
+    x_api_key: str | None = Header(default=None, alias="x-api-key"),
+    authorization: str | None = Header(default=None),
+):
+    _require_cron_secret(x_api_key, authorization)
+
+    # Only open DB session after passing authorization (saves a connection on unauthorized calls).
+    db = SessionLocal(info={"route_class": ROUTE_BACKGROUND})
+    try:
+        report = send_due_reminders(db, date.today(), dry_run=dry_run)
+        return {"ok": True, "sent": report["sent"], "report": report}
+    finally:
+        db.close()
 
-        return {"ok": True, "sent": total_sent}
+
+@router.post("/purge-lists")
+def purge_lists(
+    max_seconds: int = Query(default=20, ge=1, le=300),
+    x_api_key: str | None = Header(default=None, alias="x-api-key"),
+    authorization: str | None = Header(default=None),
+):
+    """Remove deleted (tombstoned) lists in batches; call again while ``remaining`` is true."""
+    _require_cron_secret(x_api_key, authorization)
+    db = SessionLocal(info={"route_class": ROUTE_BACKGROUND})
+    try:
+        return {"ok": True, **list_purge.purge_deleted_lists(db, max_seconds=max_seconds)}
+    finally:
+        db.close()
+
+
+@router.post("/rebalance-positions")
+def rebalance_positions(
+    max_lists: int = Query(default=100, ge=1, le=1000),
+    x_api_key: str | None = Header(default=None, alias="x-api-key"),
+    authorization: str | None = Header(default=None),
+):
+    """Re-key lists whose item position keys grew past POSITION_MAX_LENGTH; call again while ``remaining``."""
+    _require_cron_secret(x_api_key, authorization)
+    db = SessionLocal(info={"route_class": ROUTE_BACKGROUND})
+    try:
+        return {"ok": True, **ordering.rebalance_long_keys(db, max_lists=max_lists)}
+    finally:
+        db.close()
+
+
+@router.post("/backfill-purchase-stats")
+def backfill_purchase_stats(
+    after_user_id: int = Query(default=0, ge=0),
+    users: int = Query(default=500, ge=1, le=5000),
+    x_api_key: str | None = Header(default=None, alias="x-api-key"),
+    authorization: str | None = Header(default=None),
+):
+    """Seed purchase_stat from current items for one chunk of users; call again with ``next_after_user_id`` until null."""
+    _require_cron_secret(x_api_key, authorization)
+    db = SessionLocal(info={"route_class": ROUTE_BACKGROUND})
+    try:
+        return {"ok": True, **purchase_stats.backfill(db, after_user_id, users)}
+    finally:
+        db.close()
+
+
+@router.get("/reminder-runs")
+def reminder_runs(
+    limit: int = Query(default=20, ge=1, le=500),
+    x_api_key: str | None = Header(default=None, alias="x-api-key"),
+    authorization: str | None = Header(default=None),
+):
+    """Most recent reminder runs with their stage timings, newest first."""
+    _require_cron_secret(x_api_key, authorization)
+    db = SessionLocal(info={"route_class": ROUTE_BACKGROUND})
+    try:
+        runs = db.execute(
+            select(ReminderRun).order_by(ReminderRun.id.desc()).limit(limit)
+        ).scalars().all()
+        return {"runs": [
+            {c.name: getattr(r, c.name) for c in ReminderRun.__table__.columns}
+            for r in runs
+        ]}
     finally:
         db.close()
+
+
+@router.get("/email-providers")
+def email_providers(
+    x_api_key: str | None = Header(default=None, alias="x-api-key"),
+    authorization: str | None = Header(default=None),
+):
+    """Circuit breaker state and trip counts per email provider."""
+    _require_cron_secret(x_api_key, authorization)
+    return {"providers": email_breaker.snapshot()}
+
+
+@router.get("/profiles/{profile_id}", response_class=PlainTextResponse)
+def get_profile(
+    profile_id: str,
+    x_api_key: str | None = Header(default=None, alias="x-api-key"),
+    authorization: str | None = Header(default=None),
+):
+    """Folded stacks of a request profiled via the x-profile header (flamegraph.pl / speedscope)."""
+    _require_configured_cron_secret(x_api_key, authorization)
+    body = profiling.load_profile(profile_id)
+    if body is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return body
+
+
+@router.get("/hot-stacks", response_class=PlainTextResponse)
+def hot_stacks(
+    limit: int = Query(default=200, ge=1, le=5000),
+    x_api_key: str | None = Header(default=None, alias="x-api-key"),
+    authorization: str | None = Header(default=None),
+):
+    """Hottest folded stacks from the background sampler (PROFILE_SAMPLE_HZ > 0)."""
+    _require_configured_cron_secret(x_api_key, authorization)
+    sampler = profiling.background_sampler()
+    if sampler is None:
+        raise HTTPException(status_code=404, detail="Background sampler is disabled")
+    return sampler.folded(limit)
@@ -19,6 +19,11 @@ class ListRead(BaseModel):
 class ListUpdate(BaseModel):
     name: str
 
+class ListDuplicate(BaseModel):
+    name: Optional[str] = None  # default: "<source name> (copy)"
+    unpurchased_only: bool = False
+    reset_reminders: bool = False
+
 class ItemCreate(BaseModel):
     name: str
     quantity: int = 1
@@ -36,8 +41,30 @@ class ItemRead(BaseModel):
     description: Optional[str] = None
     remind_on: Optional[date] = None
     purchased: bool = False
+    version: int = 1
+    position: str = ""
     model_config = ConfigDict(from_attributes=True)
 
+class ExpiringItem(ItemRead):
+    list_name: str
+
+class ExpiringPage(BaseModel):
+    items: list[ExpiringItem]
+    next_cursor: Optional[str] = None
+
+class ItemSearchHit(ItemRead):
+    list_name: str
+    score: float
+
+class ItemSearchPage(BaseModel):
+    results: list[ItemSearchHit]
+    next_offset: Optional[int] = None
+
+class PurchaseStatRead(BaseModel):
+    name: str
+    count: int
+    last_purchased_at: Optional[datetime] = None
+
 class ItemUpdate(BaseModel):
     name: Optional[str] = None
     quantity: Optional[int] = None
@@ -46,6 +73,10 @@ class ItemUpdate(BaseModel):
     remind_on: Optional[date] = None
     purchased: Optional[bool] = None
 
+class ItemMove(BaseModel):
+    # Place the item right after this one; None moves it to the top
+    after_id: Optional[int] = None
+
 # ----- Auth / Profile -----
 class RegisterRequest(BaseModel):
     email: EmailStr = Field(..., examples=["alice@example.com"])
@@ -120,6 +151,15 @@ class ShareRead(BaseModel):
 class ShareRoleUpdate(BaseModel):
     role: Literal["viewer", "editor"]
 
+class ShareBulkCreate(BaseModel):
+    emails: list[EmailStr] = Field(..., min_length=1, max_length=100)
+    role: Literal["viewer", "editor"] = "viewer"
+
+class ShareBulkResult(BaseModel):
+    email: str
+    status: Literal["created", "updated", "user_not_found", "self"]
+    share: Optional[ShareRead] = None
+
 # Extended list shape for /lists/ (includes caller’s relationship)
 class ListReadEx(ListRead):
     shared: bool = False
@@ -0,0 +1,108 @@
+# app/search.py
+"""Item search across every list the caller can read.
+
+Three backends, picked per dialect:
+
+- Postgres: full-text match on name + description (tsvector GIN index)
+  or a fuzzy trigram match on the name (pg_trgm GIN index, so typos and
+  partial words like "oat mlk" still hit). Ranked by the better of
+  ts_rank_cd and word_similarity.
+- SQLite with FTS5: prefix match on every word, ranked by bm25.
+- Anything else: substring LIKE, name matches ranked above description
+  matches.
+
+The access filter (owned or shared, not deleted) is applied in the same
+query, so no hit from an unreadable list ever leaves the database.
+"""
+import re
+
+from sqlalchemy import case, column, func, literal, literal_column, or_, select, table, text
+from sqlalchemy.orm import Session
+
+from app.models import SEARCH_DOCUMENT_SQL, GroceryList, ListItem
+from app.permissions import readable_list_ids
+
+FIELDS = (
+    "id", "name", "quantity", "expiry", "list_id", "description", "remind_on", "purchased",
+    "version", "position", "list_name", "score",
+)
+_ITEM_COLUMNS = tuple(getattr(ListItem, f) for f in FIELDS[:-2])
+
+_fts = table("list_item_fts", column("rowid"))
+
+
+def _base(score):
+    return (
+        select(*_ITEM_COLUMNS, GroceryList.name.label("list_name"), score.label("score"))
+        .join(GroceryList, GroceryList.id == ListItem.list_id)
+    )
+
+
+def _postgres(q: str):
+    tsquery = func.websearch_to_tsquery(literal_column("'simple'"), q)
+    document = literal_column(SEARCH_DOCUMENT_SQL)
+    score = func.greatest(func.ts_rank_cd(document, tsquery), func.word_similarity(q, ListItem.name))
+    return _base(score).where(
+        or_(document.op("@@")(tsquery), literal(q).op("<%")(ListItem.name))
+    ), score.desc()
+
+
+def fts5_query(q: str) -> str | None:
+    """Every word as a quoted prefix term, implicitly ANDed; None if q has no words."""
+    words = re.findall(r"\w+", q)
+    return " ".join(f'"{w}"*' for w in words) or None
+
+
+def _sqlite_fts(q: str):
+    match = fts5_query(q)
+    if match is None:
+        return None, None
+    # bm25() is lower-is-better; negate it so higher scores rank first everywhere
+    score = -func.bm25(literal_column("list_item_fts"))
+    stmt = (
+        _base(score)
+        .select_from(_fts.join(ListItem, ListItem.id == _fts.c.rowid))
+        .where(literal_column("list_item_fts").op("MATCH")(match))
+    )
+    return stmt, score.desc()
+
+
+def _like(q: str):
+    escaped = q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    contains = f"%{escaped}%"
+    score = case(
+        (ListItem.name.ilike(f"{escaped}%", escape="\\"), 1.0),
+        (ListItem.name.ilike(contains, escape="\\"), 0.75),
+        else_=0.5,
+    )
+    return _base(score).where(
+        or_(ListItem.name.ilike(contains, escape="\\"), ListItem.description.ilike(contains, escape="\\"))
+    ), score.desc()
+
+
+def _has_fts5_table(db: Session) -> bool:
+    return db.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'list_item_fts'")
+    ).first() is not None
+
+
+def search_items(db: Session, user_id: int, q: str, limit: int, offset: int) -> tuple[list, bool]:
+    """Ranked hits for ``q`` as rows in FIELDS order, and whether more follow."""
+    if not q:
+        return [], False
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        stmt, order = _postgres(q)
+    elif dialect == "sqlite" and _has_fts5_table(db):
+        stmt, order = _sqlite_fts(q)
+    else:
+        stmt, order = _like(q)
+    if stmt is None:
+        return [], False
+    rows = db.execute(
+        stmt.where(ListItem.list_id.in_(readable_list_ids(user_id)))
+        .order_by(order, ListItem.id.desc())
+        .limit(limit + 1)
+        .offset(offset)
+    ).all()
+    return rows[:limit], len(rows) > limit
@@ -3,7 +3,7 @@ import os
 import secrets
 import jwt
 from datetime import datetime, timedelta, timezone
-from argon2 import PasswordHasher, exceptions as argon2_exc
+from functools import lru_cache
 
 SECRET_KEY = (
     os.getenv("SECRET_KEY")
@@ -16,14 +16,25 @@ ACCESS_TOKEN_EXPIRE_MINUTES = int(
     or os.getenv("JWT_ACCESS_TOKEN_EXPIRE_MINUTES", "60")
 )
 
-PH = PasswordHasher()
+@lru_cache(maxsize=1)
+def password_hasher():
+    # argon2 is only needed by password routes; import it on first use
+    from argon2 import PasswordHasher
+    return PasswordHasher()
+
+def __getattr__(name):
+    # Backwards compatible module attribute: app.security.PH
+    if name == "PH":
+        return password_hasher()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 def hash_password(plain_password: str) -> str:
-    return PH.hash(plain_password)
+    return password_hasher().hash(plain_password)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
+    from argon2 import exceptions as argon2_exc
     try:
-        return PH.verify(hashed_password, plain_password)
+        return password_hasher().verify(hashed_password, plain_password)
     except argon2_exc.VerifyMismatchError:
         return False
 
@@ -0,0 +1,152 @@
+# app/suggest.py
+"""In-memory item-name autocomplete, one prefix index per user.
+
+A user's index holds every item name from the lists they own, keyed by
+``normalize_name`` and kept as a sorted array, so a prefix lookup is a
+bisect plus a short scan. Suggestions are ranked by frequency decayed by
+recency (half-life SUGGEST_HALF_LIFE_DAYS).
+
+Indexes are built lazily from list_item on a user's first request,
+updated in place on item writes in this process and rebuilt after
+SUGGEST_TTL_SECONDS, which picks up writes served by other workers. At most
+SUGGEST_MAX_USERS indexes are kept; the least recently used goes first.
+"""
+import bisect
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, ContextManager
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.models import GroceryList, ListItem
+
+# How many prefix matches are ranked per lookup; bounds the work on short prefixes
+_MAX_SCAN = 500
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+def normalize_name(name: str) -> str:
+    """Case- and whitespace-insensitive key for an item name."""
+    return " ".join(name.split()).casefold()
+
+
+class UserIndex:
+    __slots__ = ("keys", "entries", "built_at")
+
+    def __init__(self):
+        self.keys: list[str] = []  # sorted normalized names
+        self.entries: dict[str, list] = {}  # key -> [display name, count, last seen (epoch s)]
+        self.built_at = time.monotonic()
+
+    def add(self, name: str, count: int = 1, seen: float | None = None) -> None:
+        key = normalize_name(name)
+        if not key:
+            return
+        seen = seen if seen is not None else time.time()
+        entry = self.entries.get(key)
+        if entry is None:
+            self.entries[key] = [" ".join(name.split()), count, seen]
+            bisect.insort(self.keys, key)
+            return
+        entry[1] += count
+        if seen >= entry[2]:
+            entry[0], entry[2] = " ".join(name.split()), seen  # latest spelling wins
+
+    def lookup(self, prefix: str, limit: int, half_life_days: float) -> list[str]:
+        key = normalize_name(prefix)
+        start = bisect.bisect_left(self.keys, key)
+        now = time.time()
+        half_life = max(half_life_days, 0.01) * 86400.0
+        scored = []
+        for k in self.keys[start:start + _MAX_SCAN]:
+            if not k.startswith(key):
+                break
+            name, count, seen = self.entries[k]
+            scored.append((count * 0.5 ** (max(now - seen, 0.0) / half_life), name))
+        scored.sort(key=lambda s: (-s[0], s[1]))
+        return [name for _, name in scored[:limit]]
+
+
+class SuggestIndex:
+    def __init__(self, max_users: int, ttl_seconds: float, half_life_days: float):
+        self.max_users = max_users
+        self.ttl = ttl_seconds
+        self.half_life_days = half_life_days
+        self._users: OrderedDict[int, UserIndex] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "SuggestIndex":
+        return cls(
+            max_users=int(_env_float("SUGGEST_MAX_USERS", 1000)),
+            ttl_seconds=_env_float("SUGGEST_TTL_SECONDS", 600),
+            half_life_days=_env_float("SUGGEST_HALF_LIFE_DAYS", 30),
+        )
+
+    def _cached(self, user_id: int) -> UserIndex | None:
+        with self._lock:
+            idx = self._users.get(user_id)
+            if idx is None:
+                return None
+            if time.monotonic() - idx.built_at > self.ttl:
+                del self._users[user_id]
+                return None
+            self._users.move_to_end(user_id)
+            return idx
+
+    def _build(self, db: Session, user_id: int) -> UserIndex:
+        rows = db.execute(
+            select(ListItem.name, func.count(), func.max(GroceryList.created_at))
+            .join(GroceryList, GroceryList.id == ListItem.list_id)
+            .where(GroceryList.owner_id == user_id, GroceryList.deleted_at.is_(None))
+            .group_by(ListItem.name)
+        ).all()
+        idx = UserIndex()
+        for name, count, created_at in rows:
+            idx.add(name, count, created_at.timestamp() if created_at else 0.0)
+        return idx
+
+    def suggest(self, open_session: Callable[[], ContextManager[Session]], user_id: int, prefix: str,
+                limit: int = 10) -> list[str]:
+        """Ranked names; ``open_session`` is only called to (re)build a missing index."""
+        idx = self._cached(user_id)
+        if idx is None:
+            with open_session() as db:
+                idx = self._build(db, user_id)
+            with self._lock:
+                self._users[user_id] = idx
+                while len(self._users) > self.max_users:
+                    self._users.popitem(last=False)
+        with self._lock:
+            return idx.lookup(prefix, limit, self.half_life_days)
+
+    def record(self, user_id: int, name: str) -> None:
+        """Count a newly written item name; only touches an index that is loaded."""
+        with self._lock:
+            idx = self._users.get(user_id)
+            if idx is not None:
+                idx.add(name)
+
+    def invalidate(self, user_id: int) -> None:
+        """Drop a user's index (after bulk writes); the next lookup rebuilds it."""
+        with self._lock:
+            self._users.pop(user_id, None)
+
+
+_index: SuggestIndex | None = None
+
+
+def get_index() -> SuggestIndex:
+    global _index
+    if _index is None:
+        _index = SuggestIndex.from_env()
+    return _index
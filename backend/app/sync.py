@@ -0,0 +1,169 @@
+# app/sync.py
+"""Delta sync: change stamps, tombstones and sync tokens.
+
+Every write to a list, an item or a share sets the changed row's ``seq``
+(``change_seq`` on grocery_list) to the writing transaction's stamp,
+inline in the same statement: no counter row is locked, so writers to the
+same list never queue behind each other. Deleted items and shares leave a
+``sync_tombstone`` with the stamp.
+
+Stamps are not in commit order, so a client cannot just ask for "seq above
+the highest one I saw". Instead each sync hands out a watermark W that no
+transaction still uncommitted at that moment can stamp below:
+
+* Postgres: the stamp is the transaction id (``pg_current_xact_id()``), W is
+  the xmin of the reading snapshot (every older transaction has finished).
+* SQLite (development): writers hold the database write lock until commit
+  and stamp with ``sync_clock.value``; a sync advances the clock (waiting
+  for the lock) and W is the new value.
+
+A sync token holds W and the ids of the lists the client knows. The next
+GET /sync returns rows with ``seq >= W`` of those lists, and every row of
+lists new to the client. A row can come back twice; applying it again is
+harmless. Lists the caller can no longer read (deleted, unshared) come back
+in ``removed_lists``.
+"""
+import base64
+import json
+
+from fastapi import HTTPException
+from sqlalchemy import BigInteger, Text, and_, cast, func, or_, select, update
+from sqlalchemy.orm import Session
+
+from app.models import GroceryList, ListItem, ListShare, ShareRole, SyncClock, SyncTombstone, User
+from app.schemas import ItemRead
+
+
+def stamp(db: Session):
+    """SQL expression for the current transaction's change stamp; use it inside the write."""
+    if db.get_bind().dialect.name == "postgresql":
+        return cast(cast(func.pg_current_xact_id(), Text), BigInteger)
+    return select(SyncClock.value).where(SyncClock.id == 1).scalar_subquery()
+
+
+def current_stamp(db: Session) -> int:
+    """The stamp as a value, for bulk paths (COPY) that cannot embed an expression."""
+    if db.get_bind().dialect.name == "postgresql":
+        return db.execute(select(stamp(db))).scalar_one()
+    # A no-op UPDATE takes the write lock first, so the clock cannot move before commit
+    return db.execute(
+        update(SyncClock).where(SyncClock.id == 1).values(value=SyncClock.value)
+        .returning(SyncClock.value).execution_options(synchronize_session=False)
+    ).scalar_one()
+
+
+def watermark(db: Session) -> int:
+    """Lowest stamp a transaction that has not committed yet can still write."""
+    if db.get_bind().dialect.name == "postgresql":
+        return db.execute(
+            select(cast(cast(func.pg_snapshot_xmin(func.pg_current_snapshot()), Text), BigInteger))
+        ).scalar_one()
+    value = db.execute(
+        update(SyncClock).where(SyncClock.id == 1).values(value=SyncClock.value + 1)
+        .returning(SyncClock.value).execution_options(synchronize_session=False)
+    ).scalar_one()
+    db.commit()
+    return value
+
+
+def tombstone(db: Session, list_id: int, kind: str, object_id: int) -> None:
+    db.add(SyncTombstone(list_id=list_id, seq=stamp(db), kind=kind, object_id=object_id))
+
+
+def encode_token(watermark: int, list_ids) -> str:
+    raw = json.dumps({"w": watermark, "l": sorted(list_ids)}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_token(token: str | None) -> tuple[int, set[int]]:
+    if not token:
+        return 0, set()
+    try:
+        raw = json.loads(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+        return int(raw["w"]), {int(lid) for lid in raw["l"]}
+    except (ValueError, AttributeError, TypeError, KeyError):
+        raise HTTPException(status_code=400, detail="Invalid sync token")
+
+
+_LIST_FIELDS = ("id", "name", "owner_id", "created_at")
+_LIST_COLUMNS = tuple(getattr(GroceryList, f) for f in _LIST_FIELDS)
+ITEM_FIELDS = tuple(ItemRead.model_fields)
+_ITEM_COLUMNS = tuple(getattr(ListItem, f) for f in ITEM_FIELDS)
+SHARE_FIELDS = ("id", "list_id", "user_id", "email", "role")
+
+
+def _newer(column_list_id, column_seq, since: int, known: set[int], new: set[int]):
+    # Known lists from the watermark on (ix_*_list_seq range scans), new lists in full
+    clauses = []
+    if known:
+        clauses.append(and_(column_list_id.in_(known), column_seq >= since))
+    if new:
+        clauses.append(column_list_id.in_(new))
+    return or_(*clauses)
+
+
+def changes(db: Session, user: User, token: str | None) -> dict:
+    since, seen = decode_token(token)
+    user_id = user.id  # watermark() may commit, which expires ``user``
+    w = watermark(db)
+
+    # Owned and shared lists in one pass; the caller's own share row carries role and hidden
+    rows = db.execute(
+        select(*_LIST_COLUMNS, GroceryList.change_seq, ListShare.role, ListShare.hidden, ListShare.seq)
+        .outerjoin(ListShare, and_(ListShare.list_id == GroceryList.id, ListShare.user_id == user_id))
+        .where(
+            GroceryList.deleted_at.is_(None),
+            or_(GroceryList.owner_id == user_id, ListShare.id.is_not(None)),
+        )
+    ).all()
+
+    lists: dict[int, dict] = {}
+    changed: set[int] = set()
+    for row in rows:
+        if row[2] == user_id:
+            role, hidden = "owner", False
+        else:
+            role, hidden = ("editor" if row[5] == ShareRole.editor else "viewer"), bool(row[6])
+        lists[row[0]] = {**dict(zip(_LIST_FIELDS, row)), "role": role, "hidden": hidden}
+        if max(row[4], row[7] or 0) >= since:
+            changed.add(row[0])
+    known = seen & lists.keys()
+    new = lists.keys() - seen
+    out = {
+        "lists": [lists[lid] for lid in lists if lid in changed or lid in new],
+        "removed_lists": sorted(seen - lists.keys()),
+        "items": [],
+        "deleted_items": [],
+        "shares": [],
+        "deleted_shares": [],
+        "token": encode_token(w, lists),
+    }
+    if not lists:
+        return out
+
+    out["items"] = [
+        dict(zip(ITEM_FIELDS, row))
+        for row in db.execute(select(*_ITEM_COLUMNS).where(_newer(ListItem.list_id, ListItem.seq, since, known, new)))
+    ]
+    # Share rosters are visible to the owner only, as in GET /lists/{id}/share
+    owned_ids = {lid for lid, l in lists.items() if l["role"] == "owner"}
+    if owned_ids:
+        out["shares"] = [
+            {**dict(zip(SHARE_FIELDS, row)), "role": row[4].value, "email": row[3] or ""}
+            for row in db.execute(
+                select(ListShare.id, ListShare.list_id, ListShare.user_id, User.email, ListShare.role)
+                .outerjoin(User, User.id == ListShare.user_id)
+                .where(_newer(ListShare.list_id, ListShare.seq, since, known & owned_ids, new & owned_ids))
+            )
+        ]
+    if known:
+        # New lists come in full, so only deletes in known lists matter
+        for kind, object_id, list_id in db.execute(
+            select(SyncTombstone.kind, SyncTombstone.object_id, SyncTombstone.list_id)
+            .where(SyncTombstone.list_id.in_(known), SyncTombstone.seq >= since)
+        ):
+            if kind == "item":
+                out["deleted_items"].append(object_id)
+            elif list_id in owned_ids:
+                out["deleted_shares"].append(object_id)
+    return out
@@ -1,13 +1,18 @@
 # backend/tests/conftest.py
 import os
+import uuid
+from contextlib import contextmanager
+from typing import NamedTuple
+
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 
 from app.main import app
-from app.database import get_db
-from app.models import Base
+from app.database import get_db, get_lazy_read_db, get_read_db
+from app.models import Base, User
+from app.security import create_access_token
 
 # use a file-based sqlite so multiple threads can access it
 TEST_DB_URL = "sqlite:///./test.db"
@@ -37,7 +42,57 @@ def _get_test_db():
 
 # override the app's DB dependency to use our sqlite test DB
 app.dependency_overrides[get_db] = _get_test_db
+app.dependency_overrides[get_read_db] = _get_test_db
+app.dependency_overrides[get_lazy_read_db] = lambda: contextmanager(_get_test_db)
 
 @pytest.fixture()
 def client():
     return TestClient(app)
+
+class NewUser(NamedTuple):
+    id: int
+    email: str
+    headers: dict
+
+@pytest.fixture()
+def make_user():
+    """Factory: each call creates a fresh user and returns (id, email, Bearer headers)."""
+    def _make(prefix: str = "user") -> NewUser:
+        db = TestingSessionLocal()
+        try:
+            u = User(email=f"{prefix}-{uuid.uuid4().hex[:10]}@example.com")
+            db.add(u)
+            db.commit()
+            db.refresh(u)
+            return NewUser(u.id, u.email, {"Authorization": f"Bearer {create_access_token(u.id)}"})
+        finally:
+            db.close()
+    return _make
+
+@pytest.fixture()
+def auth_headers(make_user):
+    """Create a fresh user and return a Bearer header authenticating as them."""
+    return make_user().headers
+
+@contextmanager
+def assert_max_queries(limit: int):
+    """Fail if the block runs more than ``limit`` SQL statements on the test DB.
+
+    Guards routes against N+1 regressions:
+
+        with assert_max_queries(3):
+            client.get("/lists/", headers=auth_headers)
+    """
+    statements: list[str] = []
+
+    def _record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", _record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", _record)
+    assert len(statements) <= limit, (
+        f"{len(statements)} queries, expected at most {limit}:\n" + "\n".join(statements)
+    )
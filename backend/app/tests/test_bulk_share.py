@@ -0,0 +1,34 @@
+from app.tests.conftest import assert_max_queries
+
+
+def test_bulk_share_resolves_and_upserts_in_fixed_queries(client, make_user):
+    _, owner_email, owner = make_user("bulk")
+    friends = [make_user("bulk") for _ in range(12)]
+    list_id = client.post("/lists/", json={"name": "Household"}, headers=owner).json()["id"]
+    client.post(f"/lists/{list_id}/share", json={"email": friends[0].email, "role": "viewer"}, headers=owner)
+
+    emails = [friends[0].email.upper()] + [f.email for f in friends[1:]] + [owner_email, "nobody@example.com"]
+    # user, list, email lookup, existing shares, upsert: whatever the number of emails
+    with assert_max_queries(5):
+        r = client.post(f"/lists/{list_id}/share/bulk", json={"emails": emails, "role": "editor"},
+                        headers=owner)
+    assert r.status_code == 200
+    results = r.json()
+    assert [x["status"] for x in results] == ["updated"] + ["created"] * 11 + ["self", "user_not_found"]
+    # Matched case-insensitively; the share carries the stored address
+    assert results[0]["share"]["email"] == friends[0].email
+
+    shares = client.get(f"/lists/{list_id}/share", headers=owner).json()
+    assert len(shares) == 12 and {s["role"] for s in shares} == {"editor"}
+    # Sharees see the list with their new role
+    lists = client.get("/lists/", headers=friends[5].headers).json()
+    assert [(l["id"], l["role"]) for l in lists if l["id"] == list_id] == [(list_id, "editor")]
+
+
+def test_bulk_share_is_owner_only(client, make_user):
+    _, friend_email, friend = make_user("bulk")
+    owner = make_user("bulk").headers
+    list_id = client.post("/lists/", json={"name": "Mine"}, headers=owner).json()["id"]
+    r = client.post(f"/lists/{list_id}/share/bulk", json={"emails": [friend_email]}, headers=friend)
+    assert r.status_code == 404
+    assert client.post(f"/lists/{list_id}/share/bulk", json={"emails": []}, headers=owner).status_code == 422
@@ -0,0 +1,91 @@
+from types import SimpleNamespace
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import exc as sa_exc
+
+from app import database
+
+
+class _PgError(Exception):
+    def __init__(self, pgcode):
+        super().__init__(pgcode)
+        self.pgcode = pgcode
+
+
+class _FakeConnection:
+    def __init__(self, dialect):
+        self.dialect = SimpleNamespace(name=dialect)
+        self.info = {}
+        self.executed = []
+
+    def execute(self, stmt, params=None):
+        self.executed.append((str(stmt), params))
+
+
+def test_timeouts_per_route_class_and_env_override(monkeypatch):
+    assert database.timeouts_for(database.ROUTE_READ) == (5_000, 1_000)
+    monkeypatch.setenv("DB_STATEMENT_TIMEOUT_BACKGROUND_MS", "0")
+    assert database.timeouts_for(database.ROUTE_BACKGROUND) == (0, 10_000)
+
+
+def test_set_local_only_on_postgres():
+    session = SimpleNamespace(info={"route_class": database.ROUTE_READ})
+    pg = _FakeConnection("postgresql")
+    database._apply_timeouts(session, None, pg)
+    assert pg.info["route_class"] == "read"
+    [(sql, params)] = pg.executed
+    assert "statement_timeout" in sql and "lock_timeout" in sql
+    assert params == {"statement": "5000ms", "lock": "1000ms"}
+
+    sqlite = _FakeConnection("sqlite")
+    database._apply_timeouts(session, None, sqlite)
+    assert sqlite.executed == []
+
+
+def test_timeouts_map_to_503_and_504():
+    app = FastAPI()
+    app.add_exception_handler(sa_exc.DBAPIError, database.db_error_handler)
+    app.add_exception_handler(sa_exc.TimeoutError, database.pool_timeout_handler)
+
+    @app.get("/slow")
+    def slow():
+        raise sa_exc.OperationalError("SELECT 1", {}, _PgError("57014"))
+
+    @app.get("/locked")
+    def locked():
+        raise sa_exc.OperationalError("UPDATE x", {}, _PgError("55P03"))
+
+    @app.get("/pool")
+    def pool():
+        raise sa_exc.TimeoutError("QueuePool limit reached")
+
+    @app.get("/other")
+    def other():
+        raise sa_exc.OperationalError("SELECT 1", {}, _PgError("42P01"))
+
+    client = TestClient(app, raise_server_exceptions=False)
+    assert client.get("/slow").status_code == 504
+    r = client.get("/locked")
+    assert r.status_code == 503 and r.headers["retry-after"] == "1"
+    assert client.get("/pool").status_code == 503
+    assert client.get("/other").status_code == 500
+
+
+def test_streamed_export_reads_under_the_read_route_class(client, auth_headers, monkeypatch):
+    seen = []
+    real = database.detached_session
+
+    def spy(db):
+        session = real(db)
+        seen.append(session.info["route_class"])
+        return session
+    monkeypatch.setattr("app.routers.lists.detached_session", spy)
+
+    list_id = client.post("/lists/", json={"name": "Export"}, headers=auth_headers).json()["id"]
+    client.post(f"/lists/{list_id}/items", json={"name": "Rice"}, headers=auth_headers)
+    r = client.get(f"/lists/{list_id}/export", params={"format": "ndjson"}, headers=auth_headers)
+    assert r.status_code == 200 and b"Rice" in r.content
+    # The request session was closed before the body streamed; the export's own
+    # session kept the route class, so after_begin applies the read timeouts
+    assert seen == [database.ROUTE_READ]
@@ -0,0 +1,65 @@
+from sqlalchemy import select
+
+from app.models import ReminderQueue, ListItem
+from app.tests.conftest import TestingSessionLocal, assert_max_queries
+
+
+def _queued(list_id: int) -> int:
+    db = TestingSessionLocal()
+    try:
+        return len(db.execute(
+            select(ReminderQueue.item_id).join(ListItem, ListItem.id == ReminderQueue.item_id)
+            .where(ListItem.list_id == list_id)
+        ).all())
+    finally:
+        db.close()
+
+
+def test_duplicate_copies_items_in_one_transaction(client, make_user):
+    _, viewer_email, viewer = make_user("dup")
+    owner = make_user("dup").headers
+    stranger = make_user("dup").headers
+    list_id = client.post("/lists/", json={"name": "Weekly"}, headers=owner).json()["id"]
+    for body in ({"name": "Milk", "quantity": 2}, {"name": "Bread", "purchased": True},
+                 {"name": "Eggs", "remind_on": "2030-01-01"}):
+        client.post(f"/lists/{list_id}/items", json=body, headers=owner)
+    client.post(f"/lists/{list_id}/share", json={"email": viewer_email, "role": "viewer"}, headers=owner)
+
+    # Read access is enough; the copy belongs to the caller
+    with assert_max_queries(6):
+        r = client.post(f"/lists/{list_id}/duplicate", headers=viewer)
+    assert r.status_code == 201
+    copy = r.json()
+    assert copy["name"] == "Weekly (copy)" and copy["id"] != list_id
+    items = client.get(f"/lists/{copy['id']}/items", headers=viewer).json()
+    assert [(i["name"], i["quantity"], i["purchased"]) for i in items] == [
+        ("Milk", 2, False), ("Bread", 1, False), ("Eggs", 1, False)
+    ]
+    assert _queued(copy["id"]) == 1
+
+    r = client.post(f"/lists/{list_id}/duplicate", headers=owner,
+                    json={"name": "Next week", "unpurchased_only": True, "reset_reminders": True})
+    lean = r.json()["id"]
+    items = client.get(f"/lists/{lean}/items", headers=owner).json()
+    assert [i["name"] for i in items] == ["Milk", "Eggs"] and items[1]["remind_on"] is None
+    assert _queued(lean) == 0
+
+    assert client.post(f"/lists/{list_id}/duplicate", headers=stranger).status_code == 404
+
+
+def test_duplicate_keeps_the_order_of_unpositioned_and_tied_items(client, auth_headers):
+    list_id = client.post("/lists/", json={"name": "Legacy"}, headers=auth_headers).json()["id"]
+    db = TestingSessionLocal()
+    try:
+        # Rows from before ordering existed have no position; ties fall back to id
+        for name, position in (("Tea", "a"), ("Jam", ""), ("Rice", "a"), ("Salt", ""), ("Figs", "0")):
+            db.add(ListItem(list_id=list_id, name=name, position=position, purchased=False))
+        db.commit()
+    finally:
+        db.close()
+    source = [i["name"] for i in client.get(f"/lists/{list_id}/items", headers=auth_headers).json()]
+    assert source == ["Jam", "Salt", "Figs", "Tea", "Rice"]
+
+    copy_id = client.post(f"/lists/{list_id}/duplicate", headers=auth_headers).json()["id"]
+    copied = [i["name"] for i in client.get(f"/lists/{copy_id}/items", headers=auth_headers).json()]
+    assert copied == source
@@ -0,0 +1,48 @@
+import pytest
+
+from app import email_breaker
+from app.email_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpen
+
+
+def test_breaker_opens_then_probes():
+    b = CircuitBreaker("p", failure_threshold=2, reset_timeout=0.0)
+    b.record_failure()
+    assert b.state == CLOSED
+    b.record_failure()
+    assert b.state == OPEN and b.trips == 1
+
+    # reset_timeout elapsed: exactly one half-open probe is allowed
+    assert b.allow() is True
+    assert b.state == HALF_OPEN
+    assert b.allow() is False
+    b.record_failure()
+    assert b.state == OPEN and b.trips == 2
+
+    assert b.allow() is True
+    b.record_success()
+    assert b.state == CLOSED
+
+
+def test_deliver_fails_over_and_skips_open_circuit(monkeypatch):
+    monkeypatch.setattr(email_breaker, "_breakers", {})
+    calls = []
+
+    def down():
+        calls.append("a")
+        raise TimeoutError("slow provider")
+
+    def up():
+        calls.append("b")
+        return "sent"
+
+    for _ in range(3):
+        assert email_breaker.deliver([("a", down), ("b", up)]) == "sent"
+    assert email_breaker.snapshot()["a"]["state"] == OPEN
+
+    calls.clear()
+    assert email_breaker.deliver([("a", down), ("b", up)]) == "sent"
+    assert calls == ["b"]  # open circuit is skipped without calling it
+
+    with pytest.raises(CircuitOpen):
+        email_breaker.deliver([("a", down)])
+    assert email_breaker.deliver([]) is None
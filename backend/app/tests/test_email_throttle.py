@@ -0,0 +1,47 @@
+import threading
+import time
+
+import pytest
+
+from app.email_throttle import BULK, TRANSACTIONAL, EmailThrottled, TokenBucket, retry_after_seconds
+
+
+def test_bucket_paces_to_rate():
+    b = TokenBucket(rate=20.0, burst=1.0)
+    t0 = time.monotonic()
+    for _ in range(5):
+        b.acquire(BULK, max_wait=2.0)
+    # first token is free, the next four wait ~50ms each
+    assert time.monotonic() - t0 >= 0.18
+
+
+def test_blocked_bucket_times_out():
+    b = TokenBucket(rate=100.0, burst=1.0)
+    b.block_for(5.0)
+    with pytest.raises(EmailThrottled):
+        b.acquire(BULK, max_wait=0.05)
+
+
+def test_transactional_goes_before_waiting_bulk():
+    b = TokenBucket(rate=10.0, burst=1.0)
+    b.acquire(BULK)  # drain
+    order = []
+
+    def send(kind):
+        b.acquire(kind, max_wait=2.0)
+        order.append(kind)
+
+    bulk = threading.Thread(target=send, args=(BULK,))
+    urgent = threading.Thread(target=send, args=(TRANSACTIONAL,))
+    bulk.start()
+    time.sleep(0.01)
+    urgent.start()
+    bulk.join()
+    urgent.join()
+    assert order == [TRANSACTIONAL, BULK]
+
+
+def test_retry_after_parsing():
+    assert retry_after_seconds("3") == 3.0
+    assert retry_after_seconds(None, default=1.5) == 1.5
+    assert retry_after_seconds("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
@@ -0,0 +1,48 @@
+from datetime import date, timedelta
+
+from app.models import ListShare, ShareRole
+from app.tests.conftest import TestingSessionLocal, assert_max_queries
+
+
+def test_expiring_across_own_and_shared_lists_with_keyset_pages(client, make_user):
+    today = date.today()
+    me_id, _, owner_headers = make_user()
+    friend_headers = make_user("friend").headers
+    mine = client.post("/lists/", json={"name": "Fridge"}, headers=owner_headers).json()["id"]
+    theirs = client.post("/lists/", json={"name": "Shared pantry"}, headers=friend_headers).json()["id"]
+    private = client.post("/lists/", json={"name": "Private"}, headers=friend_headers).json()["id"]
+    db = TestingSessionLocal()
+    try:
+        db.add(ListShare(list_id=theirs, user_id=me_id, role=ShareRole.viewer, hidden=False))
+        db.commit()
+    finally:
+        db.close()
+
+    def add(list_id, headers, name, days):
+        expiry = (today + timedelta(days=days)).isoformat() if days is not None else None
+        client.post(f"/lists/{list_id}/items", json={"name": name, "expiry": expiry}, headers=headers)
+
+    add(mine, owner_headers, "yogurt", 2)
+    add(mine, owner_headers, "old milk", -1)
+    add(mine, owner_headers, "rice", 200)
+    add(mine, owner_headers, "salt", None)
+    add(theirs, friend_headers, "cheese", 2)
+    add(theirs, friend_headers, "bread", 5)
+    add(private, friend_headers, "secret ham", 1)
+
+    seen, cursor = [], None
+    while True:
+        params = {"within_days": 7, "limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        with assert_max_queries(2):
+            body = client.get("/items/expiring", params=params, headers=owner_headers).json()
+        seen += [(i["name"], i["list_name"]) for i in body["items"]]
+        cursor = body["next_cursor"]
+        if cursor is None:
+            break
+
+    assert seen == [
+        ("old milk", "Fridge"), ("yogurt", "Fridge"), ("cheese", "Shared pantry"), ("bread", "Shared pantry"),
+    ]
+    assert client.get("/items/expiring", params={"cursor": "nope"}, headers=owner_headers).status_code == 400
@@ -0,0 +1,58 @@
+import json
+from datetime import datetime, timezone
+
+from pydantic import TypeAdapter
+
+from app import fast_json
+from app.models import ListItem
+from app.schemas import ItemRead, ListReadEx
+from app.tests.conftest import TestingSessionLocal
+
+
+def _fastapi_bytes(adapter: TypeAdapter, objs) -> bytes:
+    # What FastAPI renders for a response_model: validate, dump in JSON mode, JSONResponse.render
+    return json.dumps(
+        adapter.dump_python(adapter.validate_python(objs, from_attributes=True), mode="json"),
+        ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":"),
+    ).encode("utf-8")
+
+
+def test_items_fast_path_is_byte_compatible(client, auth_headers, monkeypatch):
+    list_id = client.post("/lists/", json={"name": "Épicerie"}, headers=auth_headers).json()["id"]
+    client.post(f"/lists/{list_id}/items", json={"name": "Crème fraîche", "quantity": 2,
+                "expiry": "2030-01-02", "description": "tub \"large\""}, headers=auth_headers)
+    client.post(f"/lists/{list_id}/items", json={"name": "Milk", "purchased": True,
+                "remind_on": "2030-01-01"}, headers=auth_headers)
+
+    body = client.get(f"/lists/{list_id}/items", headers=auth_headers).content
+    db = TestingSessionLocal()
+    try:
+        items = (
+            db.query(ListItem).filter(ListItem.list_id == list_id)
+            .order_by(ListItem.position, ListItem.id).all()
+        )
+        assert body == _fastapi_bytes(TypeAdapter(list[ItemRead]), items)
+    finally:
+        db.close()
+
+    # stdlib fallback encodes identically
+    monkeypatch.setattr(fast_json, "orjson", None)
+    assert client.get(f"/lists/{list_id}/items", headers=auth_headers).content == body
+
+
+def test_lists_fast_path_is_byte_compatible(client, auth_headers):
+    client.post("/lists/", json={"name": "Weekly"}, headers=auth_headers)
+    body = client.get("/lists/", headers=auth_headers).content
+    adapter = TypeAdapter(list[ListReadEx])
+    assert body == _fastapi_bytes(adapter, adapter.validate_json(body))
+
+
+def test_utc_datetimes_use_z_suffix_like_pydantic():
+    dt = datetime(2030, 1, 2, 3, 4, 5, 678, tzinfo=timezone.utc)
+    expected = TypeAdapter(datetime).dump_json(dt)
+    assert fast_json.dumps(dt) == expected
+    fast_json_orjson, fast_json.orjson = fast_json.orjson, None
+    try:
+        assert fast_json.dumps(dt) == expected
+    finally:
+        fast_json.orjson = fast_json_orjson
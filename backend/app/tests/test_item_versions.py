@@ -0,0 +1,76 @@
+from sqlalchemy import event
+
+from app.tests.conftest import engine
+
+
+def test_if_match_rejects_stale_writes_with_412(client, make_user):
+    _, editor_email, editor = make_user("ver")
+    owner = make_user("ver").headers
+    list_id = client.post("/lists/", json={"name": "Shared"}, headers=owner).json()["id"]
+    client.post(f"/lists/{list_id}/share", json={"email": editor_email, "role": "editor"}, headers=owner)
+    r = client.post(f"/lists/{list_id}/items", json={"name": "Eggs"}, headers=owner)
+    item_id, etag = r.json()["id"], r.headers["etag"]
+    assert r.json()["version"] == 1 and etag == '"1"'
+
+    # Both editors read version 1; the first write wins
+    r = client.patch(f"/lists/items/{item_id}", json={"purchased": True},
+                     headers={**editor, "If-Match": etag})
+    assert r.status_code == 200 and r.json()["version"] == 2 and r.headers["etag"] == '"2"'
+    r = client.patch(f"/lists/items/{item_id}", json={"quantity": 5},
+                     headers={**owner, "If-Match": etag})
+    assert r.status_code == 412 and r.headers["etag"] == '"2"'
+
+    items = client.get(f"/lists/{list_id}/items", headers=owner).json()
+    assert items[0]["quantity"] == 1 and items[0]["purchased"] is True
+
+    # Retrying against the current ETag succeeds; no If-Match (or "*") stays unconditional
+    r = client.patch(f"/lists/items/{item_id}", json={"quantity": 5},
+                     headers={**owner, "If-Match": 'W/"2"'})
+    assert r.status_code == 200 and r.json()["version"] == 3
+    assert client.patch(f"/lists/items/{item_id}", json={"quantity": 6}, headers=owner).json()["version"] == 4
+    r = client.patch(f"/lists/items/{item_id}", json={"quantity": 7}, headers={**owner, "If-Match": "*"})
+    assert r.json()["version"] == 5
+
+
+def test_conditional_update_checks_permissions_first(client, make_user):
+    _, viewer_email, viewer = make_user("ver")
+    owner = make_user("ver").headers
+    list_id = client.post("/lists/", json={"name": "Read only"}, headers=owner).json()["id"]
+    client.post(f"/lists/{list_id}/share", json={"email": viewer_email, "role": "viewer"}, headers=owner)
+    item_id = client.post(f"/lists/{list_id}/items", json={"name": "Tea"}, headers=owner).json()["id"]
+
+    r = client.patch(f"/lists/items/{item_id}", json={"quantity": 2}, headers={**viewer, "If-Match": '"1"'})
+    assert r.status_code == 404 and r.json()["detail"] == "List not found"
+    assert client.patch("/lists/items/999999", json={"quantity": 2}, headers=owner).status_code == 404
+    assert client.get(f"/lists/{list_id}/items", headers=owner).json()[0]["version"] == 1
+
+
+def test_empty_patch_writes_nothing(client, auth_headers):
+    list_id = client.post("/lists/", json={"name": "Idle"}, headers=auth_headers).json()["id"]
+    item_id = client.post(f"/lists/{list_id}/items", json={"name": "Salt"}, headers=auth_headers).json()["id"]
+    r = client.patch(f"/lists/items/{item_id}", json={}, headers=auth_headers)
+    assert r.status_code == 200 and r.json()["version"] == 1 and r.headers["etag"] == '"1"'
+    r = client.patch(f"/lists/items/{item_id}", json={}, headers={**auth_headers, "If-Match": '"7"'})
+    assert r.status_code == 412 and r.headers["etag"] == '"1"'
+    assert client.patch("/lists/items/999999", json={}, headers=auth_headers).status_code == 404
+
+
+def test_unconditional_purchase_survives_a_concurrent_toggle(client, auth_headers):
+    list_id = client.post("/lists/", json={"name": "Busy"}, headers=auth_headers).json()["id"]
+    item_id = client.post(f"/lists/{list_id}/items", json={"name": "Milk"}, headers=auth_headers).json()["id"]
+
+    # Another client toggles the item right before each of the first two attempts, so both miss
+    toggles = iter([1, 0])
+
+    def _toggle(conn, cursor, statement, *args):
+        if statement.startswith("UPDATE list_item SET") and "RETURNING" in statement:
+            value = next(toggles, None)
+            if value is not None:
+                cursor.execute("UPDATE list_item SET purchased = ? WHERE id = ?", (value, item_id))
+
+    event.listen(engine, "before_cursor_execute", _toggle)
+    try:
+        r = client.patch(f"/lists/items/{item_id}", json={"purchased": True}, headers=auth_headers)
+    finally:
+        event.remove(engine, "before_cursor_execute", _toggle)
+    assert r.status_code == 200 and r.json()["purchased"] is True
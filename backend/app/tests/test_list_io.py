@@ -0,0 +1,59 @@
+import json
+
+from app.models import ListItem, ReminderQueue
+from app.tests.conftest import TestingSessionLocal
+
+
+def _new_list(client, headers, name="IO") -> int:
+    return client.post("/lists/", json={"name": name}, headers=headers).json()["id"]
+
+
+def test_csv_import_then_export_round_trip(client, auth_headers, monkeypatch):
+    monkeypatch.setenv("IMPORT_CHUNK_ROWS", "2")  # exercise several chunks
+    list_id = _new_list(client, auth_headers)
+    body = (
+        "name,quantity,expiry,description,remind_on,purchased\n"
+        "Milk,2,2030-01-02,,,false\n"
+        '"Crème, fraîche",1,,"line one\nline two",2030-01-01,\n'
+        "Eggs,12,,,,true\n"
+    )
+    r = client.post(f"/lists/{list_id}/import?format=csv", content=body.encode(), headers=auth_headers)
+    assert r.status_code == 200, r.text
+    assert r.json() == {"imported": 3}
+
+    r = client.get(f"/lists/{list_id}/export?format=csv", headers=auth_headers)
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/csv")
+    # purchased defaults to false on import and is written out explicitly
+    assert r.text == body.replace("2030-01-01,\n", "2030-01-01,false\n")
+
+    db = TestingSessionLocal()
+    try:
+        queued = db.query(ReminderQueue).join(ListItem, ListItem.id == ReminderQueue.item_id).filter(
+            ListItem.list_id == list_id
+        ).count()
+        assert queued == 1
+    finally:
+        db.close()
+
+
+def test_ndjson_export_feeds_import(client, auth_headers):
+    src = _new_list(client, auth_headers, "src")
+    client.post(f"/lists/{src}/items", json={"name": "Tea", "quantity": 3, "description": "green"}, headers=auth_headers)
+    exported = client.get(f"/lists/{src}/export?format=ndjson", headers=auth_headers)
+    assert [json.loads(line)["name"] for line in exported.text.splitlines()] == ["Tea"]
+
+    dst = _new_list(client, auth_headers, "dst")
+    r = client.post(f"/lists/{dst}/import?format=ndjson", content=exported.content, headers=auth_headers)
+    assert r.json() == {"imported": 1}
+    items = client.get(f"/lists/{dst}/items", headers=auth_headers).json()
+    assert [(i["name"], i["quantity"], i["description"]) for i in items] == [("Tea", 3, "green")]
+
+
+def test_import_is_all_or_nothing(client, auth_headers):
+    list_id = _new_list(client, auth_headers)
+    body = b'{"name": "ok"}\n{"name": "bad", "quantity": "lots"}\n'
+    r = client.post(f"/lists/{list_id}/import?format=ndjson", content=body, headers=auth_headers)
+    assert r.status_code == 422
+    assert r.json()["detail"].startswith("Line 2: quantity")
+    assert client.get(f"/lists/{list_id}/items", headers=auth_headers).json() == []
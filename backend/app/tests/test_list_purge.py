@@ -0,0 +1,51 @@
+from sqlalchemy import func, select
+
+from app.list_purge import purge_deleted_lists
+from app.models import GroceryList, ListItem, ReminderQueue
+from app.tests.conftest import TestingSessionLocal, assert_max_queries
+
+
+def test_delete_tombstones_then_purger_removes_rows(client, auth_headers):
+    list_id = client.post("/lists/", json={"name": "Doomed"}, headers=auth_headers).json()["id"]
+    for i in range(5):
+        client.post(f"/lists/{list_id}/items", json={"name": f"item {i}", "remind_on": "2030-01-01"},
+                    headers=auth_headers)
+
+    # Constant work in the request: no child rows are loaded or deleted
+    with assert_max_queries(3):
+        assert client.delete(f"/lists/{list_id}", headers=auth_headers).status_code == 204
+
+    assert list_id not in [l["id"] for l in client.get("/lists/", headers=auth_headers).json()]
+    assert client.get(f"/lists/{list_id}/items", headers=auth_headers).status_code == 404
+    assert client.delete(f"/lists/{list_id}", headers=auth_headers).status_code == 404
+
+    db = TestingSessionLocal()
+    try:
+        report = purge_deleted_lists(db, batch=2)
+        assert report["remaining"] is False
+        assert report["lists"] >= 1 and report["items"] >= 5
+        assert db.get(GroceryList, list_id) is None
+        assert db.scalar(select(func.count()).select_from(ListItem).where(ListItem.list_id == list_id)) == 0
+        assert db.scalar(
+            select(func.count()).select_from(ReminderQueue)
+            .join(ListItem, ListItem.id == ReminderQueue.item_id, isouter=True)
+            .where(ListItem.id.is_(None))
+        ) == 0
+    finally:
+        db.close()
+
+
+def test_sharee_cannot_hide_or_unhide_a_deleted_list(client, make_user):
+    owner = make_user().headers
+    _, friend_email, friend = make_user()
+    list_id = client.post("/lists/", json={"name": "Shared"}, headers=owner).json()["id"]
+    client.post(f"/lists/{list_id}/share", json={"email": friend_email, "role": "viewer"}, headers=owner)
+    assert client.post(f"/lists/{list_id}/hide", headers=friend).status_code == 204
+    sync_token = client.get("/sync", headers=friend).json()["token"]
+
+    client.delete(f"/lists/{list_id}", headers=owner)
+    assert client.delete(f"/lists/{list_id}/hide", headers=friend).status_code == 404
+    assert client.post(f"/lists/{list_id}/hide", headers=friend).status_code == 404
+    # Still reported as removed, not brought back by a fresh share stamp
+    delta = client.get("/sync", params={"since": sync_token}, headers=friend).json()
+    assert delta["removed_lists"] == [list_id] and delta["lists"] == []
@@ -0,0 +1,76 @@
+import threading
+
+from sqlalchemy import create_engine, text
+
+from app import metrics
+from app.database import TimedQueuePool
+from app.rate_limit import allow
+
+
+def _sample(body: str, prefix: str) -> float:
+    return sum(float(line.rsplit(" ", 1)[1]) for line in body.splitlines() if line.startswith(prefix))
+
+
+def test_metrics_endpoint_reports_route_templates(client, auth_headers, monkeypatch):
+    monkeypatch.delenv("METRICS_TOKEN", raising=False)
+    list_id = client.post("/lists/", json={"name": "Metrics"}, headers=auth_headers).json()["id"]
+    client.get(f"/lists/{list_id}/items", headers=auth_headers)
+
+    r = client.get("/metrics")
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/plain; version=0.0.4")
+    body = r.text
+    assert "# TYPE http_request_duration_seconds histogram" in body
+    # Labelled by template, not by the concrete path
+    assert 'route="/lists/{list_id}/items"' in body
+    assert f'route="/lists/{list_id}/items"' not in body
+    # The scrape itself is in flight while rendering
+    assert _sample(body, "http_requests_in_flight") == 1
+
+
+def test_metrics_token(client, monkeypatch):
+    monkeypatch.setenv("METRICS_TOKEN", "scrape-me")
+    assert client.get("/metrics").status_code == 401
+    assert client.get("/metrics", headers={"Authorization": "Bearer scrape-me"}).status_code == 200
+
+
+def test_shards_sum_across_threads():
+    counter = metrics.Counter("test_shard_total", "test", ("k",))
+    hist = metrics.Histogram("test_shard_seconds", "test", buckets=(0.1, 1.0))
+
+    def work():
+        for _ in range(1000):
+            counter.inc("a")
+            hist.observe(0.5)
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    body = metrics.render()
+    assert 'test_shard_total{k="a"} 4000' in body
+    assert 'test_shard_seconds_bucket{le="0.1"} 0' in body
+    assert 'test_shard_seconds_bucket{le="1.0"} 4000' in body
+    assert "test_shard_seconds_count 4000" in body
+
+
+def test_rate_limit_and_pool_wait_are_recorded(tmp_path):
+    before = _sample(metrics.render(), 'rate_limit_rejections_total{scope="metrics-test"}')
+    assert allow("k", "metrics-test", max_requests=1, window_seconds=60)
+    assert not allow("k", "metrics-test", max_requests=1, window_seconds=60)
+    assert _sample(metrics.render(), 'rate_limit_rejections_total{scope="metrics-test"}') == before + 1
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'pool.db'}", poolclass=TimedQueuePool, pool_size=1)
+    engine.pool.metrics_label = "test"
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+    engine.dispose()
+    assert _sample(metrics.render(), 'db_pool_checkout_wait_seconds_count{pool="test"}') == 1
+
+
+def test_email_deliveries_are_labelled_by_kind():
+    from app.email_breaker import deliver
+
+    deliver([("metrics-test", lambda: {"ok": True})], kind="reminder")
+    assert 'emails_total{kind="reminder",provider="metrics-test",result="sent"} 1' in metrics.render()
@@ -0,0 +1,89 @@
+import random
+
+from sqlalchemy import select, update
+
+from app import ordering
+from app.models import ListItem
+from app.routers import tasks
+from app.tests.conftest import TestingSessionLocal, assert_max_queries
+
+
+def test_key_between_always_finds_room():
+    rng = random.Random(7)
+    keys = ordering.spread(3)
+    for _ in range(2000):
+        i = rng.randrange(len(keys) + 1)
+        lo = keys[i - 1] if i else None
+        hi = keys[i] if i < len(keys) else None
+        key = ordering.key_between(lo, hi)
+        assert (lo is None or lo < key) and (hi is None or key < hi) and not key.endswith("0")
+        keys.insert(i, key)
+    assert keys == sorted(keys)
+
+    # Appends step the leading digit instead of halving the gap
+    key = None
+    for _ in range(100):
+        key = ordering.key_between(key, None)
+    assert len(key) <= 6
+
+
+def _names(client, list_id, headers):
+    return [i["name"] for i in client.get(f"/lists/{list_id}/items", headers=headers).json()]
+
+
+def test_move_rewrites_one_row_and_rebalances_legacy_lists(client, auth_headers):
+    list_id = client.post("/lists/", json={"name": "Aisles"}, headers=auth_headers).json()["id"]
+    ids = {
+        name: client.post(f"/lists/{list_id}/items", json={"name": name}, headers=auth_headers).json()["id"]
+        for name in ("milk", "bread", "eggs", "tea")
+    }
+    assert _names(client, list_id, auth_headers) == ["milk", "bread", "eggs", "tea"]
+
+    # user, item and permission lookup, after-key, next key, UPDATE ... RETURNING
+    with assert_max_queries(5):
+        r = client.post(f"/lists/items/{ids['tea']}/move", json={"after_id": ids["milk"]}, headers=auth_headers)
+    assert r.status_code == 200
+    client.post(f"/lists/items/{ids['eggs']}/move", json={"after_id": None}, headers=auth_headers)
+    assert _names(client, list_id, auth_headers) == ["eggs", "milk", "tea", "bread"]
+
+    # Items from before positions existed have "" keys; the first move re-keys the list
+    db = TestingSessionLocal()
+    try:
+        db.execute(update(ListItem).where(ListItem.list_id == list_id).values(position=""))
+        db.commit()
+    finally:
+        db.close()
+    assert _names(client, list_id, auth_headers) == ["milk", "bread", "eggs", "tea"]
+    client.post(f"/lists/items/{ids['milk']}/move", json={"after_id": ids["eggs"]}, headers=auth_headers)
+    assert _names(client, list_id, auth_headers) == ["bread", "eggs", "milk", "tea"]
+
+    assert client.post(f"/lists/items/{ids['tea']}/move", json={"after_id": ids["tea"]},
+                       headers=auth_headers).status_code == 422
+    assert client.post(f"/lists/items/{ids['tea']}/move", json={"after_id": 999999},
+                       headers=auth_headers).status_code == 404
+
+
+def test_rebalance_task_shortens_long_keys(client, auth_headers, monkeypatch):
+    monkeypatch.setenv("CRON_SECRET", "s3cret")
+    monkeypatch.setattr(tasks, "SessionLocal", TestingSessionLocal)
+    list_id = client.post("/lists/", json={"name": "Deep"}, headers=auth_headers).json()["id"]
+    first = client.post(f"/lists/{list_id}/items", json={"name": "first"}, headers=auth_headers).json()["id"]
+    client.post(f"/lists/{list_id}/items", json={"name": "second"}, headers=auth_headers)
+    # Moving items into the same gap over and over grows the keys
+    for i in range(40):
+        item = client.post(f"/lists/{list_id}/items", json={"name": f"n{i}"}, headers=auth_headers).json()
+        client.post(f"/lists/items/{item['id']}/move", json={"after_id": first}, headers=auth_headers)
+        first = item["id"]
+    before = _names(client, list_id, auth_headers)
+    assert before[-1] == "second"
+
+    monkeypatch.setenv("POSITION_MAX_LENGTH", "4")
+    r = client.post("/tasks/rebalance-positions", headers={"x-api-key": "s3cret"})
+    assert r.status_code == 200 and r.json()["lists"] >= 1
+    assert _names(client, list_id, auth_headers) == before
+    db = TestingSessionLocal()
+    try:
+        keys = db.execute(select(ListItem.position).where(ListItem.list_id == list_id)).scalars().all()
+    finally:
+        db.close()
+    assert max(map(len, keys)) <= 2
@@ -0,0 +1,86 @@
+import asyncio
+import re
+import threading
+import time
+
+from app import profiling
+
+
+def _busy_loop(stop: threading.Event) -> None:
+    while not stop.is_set():
+        sum(range(1000))
+
+
+def test_sampler_folds_busy_thread_stacks():
+    stop = threading.Event()
+    worker = threading.Thread(target=_busy_loop, args=(stop,))
+    worker.start()
+    sampler = profiling.StackSampler(hz=500).start()
+    time.sleep(0.2)
+    sampler.stop()
+    stop.set()
+    worker.join()
+
+    folded = sampler.folded()
+    assert sampler.samples > 0
+    assert "_busy_loop (test_profiling.py:" in folded
+    assert all(re.fullmatch(r".+ \d+", line) for line in folded.splitlines())
+
+
+def test_profile_header_stores_folded_stacks(client, auth_headers, monkeypatch, tmp_path):
+    monkeypatch.setenv("PROFILE_SECRET", "let-me-profile")
+    monkeypatch.setenv("CRON_SECRET", "cron")
+    monkeypatch.setenv("PROFILE_DIR", str(tmp_path))
+    # The file write happens in a worker thread, never on the event loop
+    store, store_loops = profiling._store, []
+
+    def _store(name, body):
+        try:
+            store_loops.append(asyncio.get_running_loop())
+        except RuntimeError:
+            store_loops.append(None)
+        store(name, body)
+
+    monkeypatch.setattr(profiling, "_store", _store)
+
+    plain = client.get("/lists/", headers=auth_headers)
+    assert "x-profile-id" not in plain.headers
+    wrong = client.get("/lists/", headers={**auth_headers, "x-profile": "nope"})
+    assert "x-profile-id" not in wrong.headers
+
+    r = client.get("/lists/", headers={**auth_headers, "x-profile": "let-me-profile"})
+    assert r.status_code == 200
+    profile_id = r.headers["x-profile-id"]
+    assert store_loops == [None]
+    assert profile_id.endswith("-GET_lists.folded")
+    cron = {"x-api-key": "cron"}
+    assert client.get(f"/tasks/profiles/{profile_id}").status_code == 401
+    fetched = client.get(f"/tasks/profiles/{profile_id}", headers=cron)
+    assert fetched.status_code == 200
+    assert fetched.text == (tmp_path / profile_id).read_text()
+    assert client.get("/tasks/profiles/..%2Fetc%2Fpasswd", headers=cron).status_code == 404
+
+    # Without CRON_SECRET the profile routes are off, not open
+    monkeypatch.delenv("CRON_SECRET")
+    assert client.get(f"/tasks/profiles/{profile_id}").status_code == 404
+    assert client.get("/tasks/hot-stacks").status_code == 404
+
+
+def test_hot_stacks_require_background_sampler(client, monkeypatch):
+    monkeypatch.setenv("CRON_SECRET", "cron")
+    cron = {"Authorization": "Bearer cron"}
+    monkeypatch.delenv("PROFILE_SAMPLE_HZ", raising=False)
+    assert profiling.start_background_sampler() is None
+    assert client.get("/tasks/hot-stacks", headers=cron).status_code == 404
+
+    monkeypatch.setenv("PROFILE_SAMPLE_HZ", "200")
+    sampler = profiling.start_background_sampler()
+    try:
+        time.sleep(0.05)
+        assert client.get("/tasks/hot-stacks?limit=5").status_code == 401
+        r = client.get("/tasks/hot-stacks?limit=5", headers=cron)
+        assert r.status_code == 200
+        assert len(r.text.splitlines()) <= 5
+    finally:
+        profiling.stop_background_sampler()
+    assert sampler.samples > 0
@@ -0,0 +1,89 @@
+from sqlalchemy import select
+
+from app import purchase_stats
+from app.models import PurchaseStat
+from app.purchase_stats import backfill
+from app.routers import tasks
+from app.tests.conftest import TestingSessionLocal
+
+
+def _user_stats(user_id: int) -> dict:
+    db = TestingSessionLocal()
+    try:
+        rows = db.execute(
+            select(PurchaseStat.name_key, PurchaseStat.count).where(PurchaseStat.user_id == user_id)
+        ).all()
+        return dict(rows)
+    finally:
+        db.close()
+
+
+def test_rollup_counts_purchase_events_and_backfill_never_lowers(client, auth_headers):
+    me = client.get("/me", headers=auth_headers).json()["id"]
+    list_id = client.post("/lists/", json={"name": "Stats"}, headers=auth_headers).json()["id"]
+    ids = [
+        client.post(f"/lists/{list_id}/items", json={"name": name}, headers=auth_headers).json()["id"]
+        for name in ("Milk", "milk ", "Eggs")
+    ]
+    client.post(f"/lists/{list_id}/items", json={"name": "Bread", "purchased": True}, headers=auth_headers)
+
+    for item_id in ids:
+        client.patch(f"/lists/items/{item_id}", json={"purchased": True}, headers=auth_headers)
+    # Repeating the same state is not a new purchase; unchecking takes nothing back,
+    # checking again is a second purchase
+    client.patch(f"/lists/items/{ids[0]}", json={"purchased": True}, headers=auth_headers)
+    client.patch(f"/lists/items/{ids[2]}", json={"purchased": False}, headers=auth_headers)
+    client.patch(f"/lists/items/{ids[2]}", json={"purchased": True}, headers=auth_headers)
+    # History survives renames and deletes
+    client.patch(f"/lists/items/{ids[1]}", json={"name": "Oat milk"}, headers=auth_headers)
+    client.delete(f"/lists/items/{ids[0]}", headers=auth_headers)
+    client.post(f"/lists/{list_id}/import", params={"format": "ndjson"}, headers=auth_headers,
+                content=b'{"name": "eggs", "purchased": true}\n{"name": "Tea"}\n')
+
+    incremental = _user_stats(me)
+    assert incremental == {"milk": 2, "eggs": 3, "bread": 1}
+
+    frequent = client.get("/stats/frequent", headers=auth_headers).json()
+    assert [(s["name"], s["count"]) for s in frequent] == [("eggs", 3), ("milk", 2), ("Bread", 1)]
+    buy_again = client.get("/stats/buy-again", params={"limit": 1}, headers=auth_headers).json()
+    assert len(buy_again) == 1 and buy_again[0]["last_purchased_at"]
+
+    # Current items show one "oat milk" and fewer eggs: the backfill adds the
+    # name it had not seen and leaves the higher counts alone
+    db = TestingSessionLocal()
+    try:
+        report = backfill(db, after_user_id=me - 1, users=1)
+    finally:
+        db.close()
+    assert report["users"] == 1 and report["next_after_user_id"] == me
+    assert _user_stats(me) == {**incremental, "oat milk": 1}
+
+
+def test_backfill_task_walks_users_in_chunks(client, auth_headers, monkeypatch):
+    monkeypatch.setenv("CRON_SECRET", "s3cret")
+    monkeypatch.setattr(tasks, "SessionLocal", TestingSessionLocal)
+    assert client.post("/tasks/backfill-purchase-stats").status_code == 401
+
+    after, calls = 0, 0
+    while after is not None:
+        r = client.post("/tasks/backfill-purchase-stats", params={"after_user_id": after, "users": 2},
+                        headers={"x-api-key": "s3cret"})
+        assert r.status_code == 200
+        after = r.json()["next_after_user_id"]
+        calls += 1
+    assert calls >= 1
+
+
+def test_portable_merge_without_native_upsert(client, auth_headers, monkeypatch):
+    # Dialects without ON CONFLICT take the UPDATE-then-INSERT path
+    monkeypatch.setattr(purchase_stats, "_UPSERTS", {})
+    me = client.get("/me", headers=auth_headers).json()["id"]
+    db = TestingSessionLocal()
+    try:
+        purchase_stats.record_purchases(db, me, ["Jam", "jam", "Honey"])
+        purchase_stats.record_purchase(db, me, "JAM")
+        db.commit()
+    finally:
+        db.close()
+    stats = _user_stats(me)
+    assert stats["jam"] == 3 and stats["honey"] == 1
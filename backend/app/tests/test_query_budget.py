@@ -0,0 +1,66 @@
+import uuid
+
+from app.models import ListShare, ShareRole, User
+from app.tests.conftest import TestingSessionLocal, assert_max_queries
+
+
+def _share_with_new_users(list_id: int, n: int) -> None:
+    db = TestingSessionLocal()
+    try:
+        for _ in range(n):
+            u = User(email=f"sharee-{uuid.uuid4().hex[:10]}@example.com")
+            db.add(u)
+            db.flush()
+            db.add(ListShare(list_id=list_id, user_id=u.id, role=ShareRole.viewer, hidden=False))
+        db.commit()
+    finally:
+        db.close()
+
+
+def test_read_routes_stay_within_query_budget(client, auth_headers):
+    list_id = client.post("/lists/", json={"name": "Budget"}, headers=auth_headers).json()["id"]
+    for i in range(5):
+        client.post(f"/lists/{list_id}/items", json={"name": f"item {i}"}, headers=auth_headers)
+    _share_with_new_users(list_id, 5)
+
+    with assert_max_queries(3):
+        client.get("/lists/", headers=auth_headers)
+    with assert_max_queries(3):
+        client.get(f"/lists/{list_id}/items", headers=auth_headers)
+    # Independent of the number of shares (was one lazy load per share)
+    with assert_max_queries(3):
+        r = client.get(f"/lists/{list_id}/share", headers=auth_headers)
+    assert len(r.json()) == 5 and all(s["email"] for s in r.json())
+    with assert_max_queries(1):
+        client.get("/me", headers=auth_headers)
+
+
+def test_write_routes_skip_refresh_round_trips(client, auth_headers):
+    with assert_max_queries(2):
+        r = client.post("/lists/", json={"name": "Writes"}, headers=auth_headers)
+    assert r.json()["created_at"]
+    list_id = r.json()["id"]
+
+    # +1 on add: the list's last position key (app/ordering.py)
+    with assert_max_queries(6):
+        item = client.post(f"/lists/{list_id}/items", json={"name": "Milk", "remind_on": "2030-01-01"},
+                           headers=auth_headers).json()
+    # user, then one permission- and version-checked UPDATE ... RETURNING; no list lock
+    with assert_max_queries(2):
+        client.patch(f"/lists/items/{item['id']}", json={"quantity": 2}, headers=auth_headers)
+    # A purchased toggle is still one item UPDATE (the WHERE on the old value detects
+    # the flip), plus the rollup upsert and the reminder queue lookup and drop
+    with assert_max_queries(5):
+        r = client.patch(f"/lists/items/{item['id']}", json={"purchased": True}, headers=auth_headers)
+    assert r.json()["purchased"] is True
+    with assert_max_queries(3):
+        client.patch(f"/lists/{list_id}", json={"name": "Renamed"}, headers=auth_headers)
+    with assert_max_queries(2):
+        client.patch("/me", json={"name": "Budget"}, headers=auth_headers)
+
+
+def test_server_timing_header_reports_db_split(client, auth_headers):
+    r = client.get("/lists/", headers=auth_headers)
+    timing = r.headers["server-timing"]
+    assert 'desc="3 queries"' in timing
+    assert "db;dur=" in timing and "app;dur=" in timing and "total;dur=" in timing
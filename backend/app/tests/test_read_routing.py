@@ -0,0 +1,33 @@
+import uuid
+
+from sqlalchemy import select
+
+from app import database
+from app.models import User
+from app.tests.conftest import engine
+
+
+def test_writes_pin_caller_to_primary(monkeypatch):
+    monkeypatch.setattr(database, "_pins", {})
+    key = uuid.uuid4().hex
+
+    db = database.SessionLocal(bind=engine)
+    try:
+        db.info["pin_key"] = key
+        db.execute(select(User)).all()
+        db.commit()
+        assert not database.is_pinned(key)  # read-only commit
+
+        db.add(User(email=f"pin-{key[:8]}@example.com"))
+        db.commit()
+        assert database.is_pinned(key)
+    finally:
+        db.close()
+
+
+def test_pin_expires(monkeypatch):
+    monkeypatch.setattr(database, "_pins", {})
+    monkeypatch.setenv("DB_READ_PIN_SECONDS", "0")
+    database.pin_to_primary("k")
+    assert not database.is_pinned("k")
+    assert not database.is_pinned(None)
@@ -0,0 +1,39 @@
+from datetime import date, timedelta
+
+from app.reminder_scheduler import ReminderScheduler
+from app.tests.conftest import TestingSessionLocal, engine
+
+
+def test_heap_loads_in_batches_and_pops_due(client, auth_headers):
+    today = date.today()
+    list_id = client.post("/lists/", json={"name": "Heap"}, headers=auth_headers).json()["id"]
+    ids = []
+    for offset in (0, -1, 3, 10):
+        r = client.post(
+            f"/lists/{list_id}/items",
+            json={"name": f"x{offset}", "remind_on": (today + timedelta(days=offset)).isoformat()},
+            headers=auth_headers,
+        )
+        ids.append(r.json()["id"])
+
+    sched = ReminderScheduler(engine, TestingSessionLocal, send_due=lambda *a: 0)
+    sched.batch = 2
+    db = TestingSessionLocal()
+    try:
+        sched._load(db, reset=True)
+        # Only the earliest two entries are resident; the rest wait for a refill.
+        # Other tests may have queued entries too, so check the relative ordering.
+        due = sched._pop_due(today)
+        assert not sched._complete
+        while not sched._complete:
+            sched._load(db)
+            due += sched._pop_due(today)
+    finally:
+        db.close()
+
+    assert ids[0] in due and ids[1] in due
+    assert ids[2] not in due and ids[3] not in due
+
+    # A new reminder inside the loaded range is pushed without touching the DB
+    sched.notify(999999, today)
+    assert 999999 in sched._pop_due(today)
@@ -0,0 +1,121 @@
+from datetime import date
+
+from app import reminder_scheduler
+from app.models import ListItem, ReminderQueue, ReminderRun
+from app.routers import tasks
+from app.tests.conftest import TestingSessionLocal
+
+
+def _queued(item_id: int) -> bool:
+    db = TestingSessionLocal()
+    try:
+        return db.get(ReminderQueue, item_id) is not None
+    finally:
+        db.close()
+
+
+def test_queue_follows_item_writes(client, auth_headers):
+    list_id = client.post("/lists/", json={"name": "Queue"}, headers=auth_headers).json()["id"]
+    today = date.today().isoformat()
+
+    r = client.post(f"/lists/{list_id}/items", json={"name": "Milk", "remind_on": today}, headers=auth_headers)
+    assert r.status_code == 201, r.text
+    item_id = r.json()["id"]
+    assert _queued(item_id)
+
+    client.patch(f"/lists/items/{item_id}", json={"purchased": True}, headers=auth_headers)
+    assert not _queued(item_id)
+
+    client.patch(f"/lists/items/{item_id}", json={"purchased": False}, headers=auth_headers)
+    assert _queued(item_id)
+
+    client.patch(f"/lists/items/{item_id}", json={"remind_on": None}, headers=auth_headers)
+    assert not _queued(item_id)
+
+    r = client.post(f"/lists/{list_id}/items", json={"name": "Bread"}, headers=auth_headers)
+    assert not _queued(r.json()["id"])
+
+
+def test_run_reminders_pops_due_entries(client, auth_headers, monkeypatch):
+    monkeypatch.delenv("CRON_SECRET", raising=False)
+    monkeypatch.setattr(tasks, "SessionLocal", TestingSessionLocal)
+    monkeypatch.setattr(tasks, "_send_email", lambda *a, **kw: None)
+
+    list_id = client.post("/lists/", json={"name": "Due"}, headers=auth_headers).json()["id"]
+    r = client.post(
+        f"/lists/{list_id}/items",
+        json={"name": "Yogurt", "remind_on": date.today().isoformat()},
+        headers=auth_headers,
+    )
+    item_id = r.json()["id"]
+
+    r = client.post("/tasks/run-reminders", params={"dry_run": "true"})
+    assert r.status_code == 200, r.text
+    report = r.json()["report"]
+    assert r.json()["sent"] == 0
+    assert report["dry_run"] is True and report["owners"] >= 1 and report["digest_bytes"] > 0
+    assert _queued(item_id)
+
+    r = client.post("/tasks/run-reminders")
+    assert r.status_code == 200, r.text
+    assert r.json()["sent"] >= 1
+    assert not _queued(item_id)
+
+    db = TestingSessionLocal()
+    try:
+        assert db.get(ListItem, item_id).reminded_at is not None
+        # only the real run is recorded
+        runs = db.query(ReminderRun).all()
+        assert len(runs) == 1 and runs[0].sent >= 1 and runs[0].query_ms is not None
+    finally:
+        db.close()
+
+
+def test_concurrent_runs_never_send_the_same_reminder(client, auth_headers, monkeypatch):
+    list_id = client.post("/lists/", json={"name": "Race"}, headers=auth_headers).json()["id"]
+    item_id = client.post(f"/lists/{list_id}/items", json={"name": "Kefir", "remind_on": date.today().isoformat()},
+                          headers=auth_headers).json()["id"]
+
+    nested = {}
+    def send(*args, **kwargs):
+        # A second run (the cron endpoint while the scheduler is mid-send) finds nothing to claim
+        if not nested:
+            db2 = TestingSessionLocal()
+            try:
+                nested.update(tasks.send_due_reminders(db2, date.today(), trigger="cron"))
+            finally:
+                db2.close()
+    monkeypatch.setattr(tasks, "_send_email", send)
+
+    db = TestingSessionLocal()
+    try:
+        report = tasks.send_due_reminders(db, date.today(), [item_id], trigger="scheduler")
+    finally:
+        db.close()
+    assert report["sent"] == 1 and nested["sent"] == 0 and nested["rows_scanned"] == 0
+    assert not _queued(item_id)
+
+
+def test_scheduler_is_notified_only_after_commit(client, auth_headers, monkeypatch):
+    seen = []
+    class Recorder:
+        def notify(self, item_id, remind_on):
+            seen.append((item_id, _queued(item_id)))
+    monkeypatch.setattr(reminder_scheduler, "_scheduler", Recorder())
+
+    list_id = client.post("/lists/", json={"name": "Notify"}, headers=auth_headers).json()["id"]
+    item_id = client.post(f"/lists/{list_id}/items", json={"name": "Cream", "remind_on": "2030-01-01"},
+                          headers=auth_headers).json()["id"]
+    # Visible to another session by the time the scheduler hears of it
+    assert seen == [(item_id, True)]
+
+
+def test_percentile_is_nearest_rank():
+    assert tasks._percentile([], 50) is None
+    assert tasks._percentile([7.0], 95) == 7.0
+    assert tasks._percentile([1.0, 2.0], 50) == 1.0
+    assert tasks._percentile([2.0, 1.0], 95) == 2.0
+    ten = [float(i) for i in range(1, 11)]
+    assert tasks._percentile(ten, 50) == 5.0
+    assert tasks._percentile(ten, 95) == 10.0
+    assert tasks._percentile([1.0, 2.0, 3.0, 4.0], 25) == 1.0
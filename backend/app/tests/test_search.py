@@ -0,0 +1,53 @@
+import uuid
+
+from app.models import ListShare, ShareRole
+from app.search import fts5_query
+from app.tests.conftest import TestingSessionLocal
+
+
+def test_search_covers_own_and_shared_lists_only(client, make_user):
+    me_id, _, me = make_user("searcher")
+    other = make_user("searcher").headers
+    tag = uuid.uuid4().hex[:6]
+
+    mine = client.post("/lists/", json={"name": "Mine"}, headers=me).json()["id"]
+    client.post(f"/lists/{mine}/items", json={"name": f"Oat milk {tag}"}, headers=me)
+    client.post(f"/lists/{mine}/items", json={"name": f"Bread {tag}", "description": "not oat based"}, headers=me)
+
+    shared = client.post("/lists/", json={"name": "Shared"}, headers=other).json()["id"]
+    client.post(f"/lists/{shared}/items", json={"name": f"Oat milk barista {tag}"}, headers=other)
+    private = client.post("/lists/", json={"name": "Private"}, headers=other).json()["id"]
+    client.post(f"/lists/{private}/items", json={"name": f"Oat milk secret {tag}"}, headers=other)
+    db = TestingSessionLocal()
+    try:
+        db.add(ListShare(list_id=shared, user_id=me_id, role=ShareRole.viewer, hidden=False))
+        db.commit()
+    finally:
+        db.close()
+
+    r = client.get("/search/items", params={"q": f"oat milk {tag}"}, headers=me)
+    assert r.status_code == 200
+    body = r.json()
+    names = [h["name"] for h in body["results"]]
+    assert sorted(names) == sorted([f"Oat milk {tag}", f"Oat milk barista {tag}"])
+    assert {h["list_name"] for h in body["results"]} == {"Mine", "Shared"}
+    assert body["next_offset"] is None
+
+    # Description matches count too; paginate one hit at a time
+    page = client.get("/search/items", params={"q": f"oat {tag}", "limit": 1}, headers=me).json()
+    assert len(page["results"]) == 1 and page["next_offset"] == 1
+
+    # Deleted lists drop out immediately
+    client.delete(f"/lists/{mine}", headers=me)
+    r = client.get("/search/items", params={"q": f"oat milk {tag}"}, headers=me)
+    assert [h["name"] for h in r.json()["results"]] == [f"Oat milk barista {tag}"]
+
+
+def test_search_requires_query_and_auth(client, auth_headers):
+    assert client.get("/search/items", params={"q": ""}, headers=auth_headers).status_code == 422
+    assert client.get("/search/items", params={"q": "milk"}).status_code == 401
+
+
+def test_fts5_query_quotes_words_as_prefixes():
+    assert fts5_query('oat "milk') == '"oat"* "milk"*'
+    assert fts5_query("--") is None
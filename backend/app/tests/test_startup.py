@@ -0,0 +1,14 @@
+import os
+
+from benchmarks.startup import LAZY_MODULES, measure_import
+
+
+def test_app_import_stays_lazy_and_within_budget():
+    budget_ms = float(os.getenv("STARTUP_IMPORT_BUDGET_MS", "2000"))
+    # best of a few runs to ride out a noisy machine
+    results = [measure_import() for _ in range(3)]
+    best = min(total for total, _, _ in results)
+    _, _, loaded = results[0]
+
+    assert not loaded, f"{loaded} imported at startup; load them on first use ({LAZY_MODULES})"
+    assert 0 < best <= budget_ms, f"import app.main took {best:.0f} ms (budget {budget_ms:.0f} ms)"
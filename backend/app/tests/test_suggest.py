@@ -0,0 +1,63 @@
+import time
+from contextlib import contextmanager, nullcontext
+
+from app.suggest import SuggestIndex, UserIndex, normalize_name
+from app.tests.conftest import assert_max_queries
+
+
+def test_normalize_name():
+    assert normalize_name("  Oat   MILK ") == "oat milk"
+
+
+def test_ranking_prefers_frequent_and_recent_names():
+    idx = UserIndex()
+    now = time.time()
+    idx.add("Milk", count=3, seen=now - 90 * 86400)
+    idx.add("Mild salsa", count=1, seen=now)
+    idx.add("Mince", count=2, seen=now)
+    idx.add("Bread", count=10, seen=now)
+    # Milk: 3 uses but three half-lives old -> 0.375 < Mild salsa's 1
+    assert idx.lookup("mi", 10, half_life_days=30) == ["Mince", "Mild salsa", "Milk"]
+    assert idx.lookup("MIL", 1, half_life_days=30) == ["Mild salsa"]
+    assert idx.lookup("x", 10, half_life_days=30) == []
+
+
+def test_lru_evicts_cold_users():
+    index = SuggestIndex(max_users=2, ttl_seconds=600, half_life_days=30)
+    index._build = lambda db, user_id: UserIndex()
+    for user_id in (1, 2, 1, 3):
+        index.suggest(nullcontext, user_id, "a")
+    assert list(index._users) == [1, 3]
+
+
+def test_suggest_builds_lazily_then_serves_from_memory(client, auth_headers):
+    list_id = client.post("/lists/", json={"name": "Weekly"}, headers=auth_headers).json()["id"]
+    for name in ("Oat milk", "oat  milk", "Oats", "Olive oil"):
+        client.post(f"/lists/{list_id}/items", json={"name": name}, headers=auth_headers)
+
+    r = client.get("/suggest", params={"prefix": "oa"}, headers=auth_headers)
+    assert r.status_code == 200
+    assert r.json() == ["oat milk", "Oats"]
+
+    # Warm index: no SQL at all, and new items show up immediately
+    client.post(f"/lists/{list_id}/items", json={"name": "Oat bran"}, headers=auth_headers)
+    with assert_max_queries(0):
+        r = client.get("/suggest", params={"prefix": "oat b"}, headers=auth_headers)
+    assert r.json() == ["Oat bran"]
+
+    assert client.get("/suggest", params={"prefix": "o"}).status_code == 401
+
+
+def test_warm_index_opens_no_session():
+    index = SuggestIndex(max_users=10, ttl_seconds=600, half_life_days=30)
+    index._build = lambda db, user_id: UserIndex()
+    opened = []
+
+    @contextmanager
+    def open_session():
+        opened.append(True)
+        yield None
+
+    for prefix in ("a", "ab", "abc"):
+        index.suggest(open_session, 1, prefix)
+    assert len(opened) == 1
@@ -0,0 +1,51 @@
+from app.tests.conftest import assert_max_queries
+
+
+def test_delta_sync_returns_only_changes_and_tombstones(client, make_user):
+    owner = make_user("sync").headers
+    _, friend_email, friend = make_user("sync")
+    list_id = client.post("/lists/", json={"name": "Sync"}, headers=owner).json()["id"]
+    items = [
+        client.post(f"/lists/{list_id}/items", json={"name": f"item {i}"}, headers=owner).json()["id"]
+        for i in range(20)
+    ]
+    share_id = client.post(f"/lists/{list_id}/share", json={"email": friend_email, "role": "viewer"},
+                           headers=owner).json()["id"]
+
+    full = client.get("/sync", headers=owner).json()
+    assert [l["id"] for l in full["lists"]] == [list_id]
+    assert len(full["items"]) == 20 and [s["id"] for s in full["shares"]] == [share_id]
+
+    # Writes that change nothing are not stamped
+    client.patch(f"/lists/{list_id}", json={"name": "Sync"}, headers=owner)
+    client.patch(f"/lists/{list_id}/share/{share_id}", json={"role": "viewer"}, headers=owner)
+
+    # Nothing changed: nothing but the token comes back. Queries: user, watermark,
+    # lists, then empty index range scans for items, shares and tombstones
+    with assert_max_queries(6):
+        same = client.get("/sync", params={"since": full["token"]}, headers=owner).json()
+    assert same["lists"] == [] and same["items"] == [] and same["deleted_items"] == []
+
+    client.patch(f"/lists/items/{items[3]}", json={"quantity": 9}, headers=owner)
+    client.delete(f"/lists/items/{items[5]}", headers=owner)
+    client.patch(f"/lists/{list_id}", json={"name": "Renamed"}, headers=owner)
+    friend_token = client.get("/sync", headers=friend).json()["token"]
+    client.delete(f"/lists/{list_id}/share/{share_id}", headers=owner)
+
+    delta = client.get("/sync", params={"since": full["token"]}, headers=owner).json()
+    assert [(i["id"], i["quantity"]) for i in delta["items"]] == [(items[3], 9)]
+    assert delta["deleted_items"] == [items[5]]
+    assert delta["deleted_shares"] == [share_id]
+    assert delta["lists"][0]["name"] == "Renamed"
+
+    # The sharee lost access: the list is reported as removed
+    gone = client.get("/sync", params={"since": friend_token}, headers=friend).json()
+    assert gone["removed_lists"] == [list_id] and gone["items"] == []
+
+    client.delete(f"/lists/{list_id}", headers=owner)
+    after_delete = client.get("/sync", params={"since": delta["token"]}, headers=owner).json()
+    assert after_delete["removed_lists"] == [list_id]
+
+
+def test_bad_token_is_rejected(client, auth_headers):
+    assert client.get("/sync", params={"since": "%%%"}, headers=auth_headers).status_code == 400
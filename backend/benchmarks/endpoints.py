@@ -0,0 +1,346 @@
+"""Latency benchmark for every route in routers/lists.py, me.py and auth.py.
+
+Seeds a throwaway database at each ``--sizes`` value (items in the main
+list; lists, sharees and shares scale at size/10), then drives each route
+``--requests`` times in-process through TestClient. Reports p50/p95/p99
+latency, throughput and SQL statements per request. Run from backend/:
+
+    python -m benchmarks.endpoints --sizes 100,1000,10000 --requests 200
+    python -m benchmarks.endpoints --compare   # exit 1 on regression
+    python -m benchmarks.endpoints --save      # refresh the baselines
+    python -m benchmarks.endpoints --only "GET /sync" --save   # add or refresh some routes
+
+SQLite always runs. Postgres runs too when BENCH_PG_URL (or --pg-url)
+points at a local database; its tables are DROPPED and recreated, so use
+a throwaway database. Baselines live in benchmarks/baselines/<backend>.json;
+--save merges into them, so a partial run only replaces the routes it ran.
+Latency baselines are machine-specific; query counts are not, so a query
+count above the baseline is always reported as a regression. Routes over
+their p95 baseline are re-run once and only reported if still slow.
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import date, timedelta
+
+from sqlalchemy import create_engine, event, insert, select
+from sqlalchemy.orm import sessionmaker
+
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines")
+PASSWORD = "bench-pass-123"
+
+# Keep auth routes offline and unthrottled while benchmarking
+for _var in ("VERCEL_SEND_RESET_URL", "RESEND_API_KEY", "SMTP_HOST", "TURNSTILE_SECRET", "VERCEL_RESEND_UPSERT_URL"):
+    os.environ.pop(_var, None)
+os.environ["DISABLE_RATE_LIMITS"] = "1"
+os.environ["RESET_LIMIT_PER_IP"] = os.environ["RESET_LIMIT_PER_EMAIL"] = str(10**9)
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app import purchase_stats, sync  # noqa: E402
+from app.database import get_db, get_lazy_read_db, get_read_db  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models import Base, GroceryList, ListItem, ListShare, ShareRole, User  # noqa: E402
+from app.security import create_access_token, create_reset_token, hash_password  # noqa: E402
+
+
+class Bench:
+    """Seeded database plus the ids and auth headers the cases need."""
+
+    def __init__(self, engine, size: int):
+        self.engine = engine
+        self.size = size
+        self.Session = sessionmaker(bind=engine, autoflush=False, autocommit=False)
+        self.queries = 0
+        event.listen(engine, "before_cursor_execute", self._count)
+        self._seq = itertools.count()
+        self._seed()
+
+    def _count(self, *args) -> None:
+        self.queries += 1
+
+    def _seed(self) -> None:
+        Base.metadata.drop_all(self.engine)
+        Base.metadata.create_all(self.engine)
+        n_side = max(self.size // 10, 1)
+        pw = hash_password(PASSWORD)
+        soon = date.today() + timedelta(days=7)
+        # No explicit ids, so Postgres sequences stay in step for the write cases
+        with self.engine.begin() as conn:
+            owner = conn.execute(insert(User).values(email="owner@bench.example.com", password_hash=pw)
+                                 .returning(User.id)).scalar()
+            sharees = conn.execute(insert(User).returning(User.id, sort_by_parameter_order=True),
+                                   [{"email": f"sharee{i}@bench.example.com"} for i in range(n_side)]).scalars().all()
+            lists = conn.execute(insert(GroceryList).returning(GroceryList.id, sort_by_parameter_order=True),
+                                 [{"name": f"list {i}", "owner_id": owner} for i in range(n_side + 1)]).scalars().all()
+            main = lists[0]
+            conn.execute(insert(ListShare), [{"list_id": main, "user_id": u, "role": ShareRole.viewer,
+                                              "hidden": False} for u in sharees])
+            conn.execute(insert(ListItem), [{"name": f"item {i}", "quantity": i % 5 + 1, "list_id": main,
+                                             "remind_on": soon if i % 10 == 0 else None,
+                                             "expiry": date.today() + timedelta(days=i % 60) if i % 7 == 0 else None,
+                                             "purchased": i % 3 == 0} for i in range(self.size)])
+            self.item_id = conn.execute(select(ListItem.id).where(ListItem.list_id == main).limit(1)).scalar()
+            self.last_item_id = conn.execute(select(ListItem.id).where(ListItem.list_id == main)
+                                             .order_by(ListItem.id.desc()).limit(1)).scalar()
+            self.share_id = conn.execute(select(ListShare.id).where(ListShare.user_id == sharees[0])).scalar()
+        # Purchase rollups for the stats routes, as POST /tasks/backfill-purchase-stats builds them
+        with self.Session() as db:
+            purchase_stats.backfill(db, after_user_id=owner - 1, users=1)
+        self.owner_id, self.list_id = owner, main
+        self.owner = {"Authorization": f"Bearer {create_access_token(owner)}"}
+        self.sharee = {"Authorization": f"Bearer {create_access_token(sharees[0])}"}
+
+    def unique(self, prefix: str) -> str:
+        return f"{prefix}{next(self._seq)}"
+
+    def new_row(self, model, **values) -> int:
+        with self.engine.begin() as conn:
+            return conn.execute(insert(model).values(**values).returning(model.id)).scalar()
+
+    def new_user(self) -> int:
+        return self.new_row(User, email=f"{self.unique('u')}@bench.example.com")
+
+    def sync_token(self) -> str:
+        """The owner's sync token as of now: the poll that follows finds nothing new."""
+        with self.Session() as db:
+            list_ids = db.execute(
+                select(GroceryList.id).where(GroceryList.owner_id == self.owner_id, GroceryList.deleted_at.is_(None))
+            ).scalars().all()
+            return sync.encode_token(sync.watermark(db), list_ids)
+
+
+def cases(b: Bench) -> list[tuple[str, callable]]:
+    """(label, prepare) pairs; prepare runs untimed and returns (method, url, kwargs).
+
+    Cases run in this order, reads before the writes that grow the data.
+    """
+    lid, own, sh = b.list_id, b.owner, b.sharee
+    # Move alternates between the bottom and the top, so every request is a real move
+    move_after = itertools.cycle([b.last_item_id, None])
+    import_body = "name,quantity\n" + "".join(f"imported {i},1\n" for i in range(100))
+    bulk_emails = [f"sharee{i}@bench.example.com" for i in range(min(b.size // 10, 50))] + ["nobody@bench.example.com"]
+    return [
+        ("GET /me", lambda: ("GET", "/me", {"headers": own})),
+        ("GET /lists/", lambda: ("GET", "/lists/", {"headers": own})),
+        ("GET /lists/{id}/items", lambda: ("GET", f"/lists/{lid}/items", {"headers": own})),
+        ("GET /lists/{id}/export", lambda: ("GET", f"/lists/{lid}/export", {"headers": own})),
+        ("GET /lists/{id}/share", lambda: ("GET", f"/lists/{lid}/share", {"headers": own})),
+        ("GET /items/expiring", lambda: ("GET", "/items/expiring", {"headers": own, "params": {"within_days": 30}})),
+        ("GET /stats/frequent", lambda: ("GET", "/stats/frequent", {"headers": own})),
+        ("GET /stats/buy-again", lambda: ("GET", "/stats/buy-again", {"headers": own})),
+        ("GET /search/items", lambda: ("GET", "/search/items", {"headers": own, "params": {"q": "item 42"}})),
+        ("GET /sync?since=", lambda: ("GET", "/sync", {"headers": own, "params": {"since": b.sync_token()}})),
+        ("POST /lists/", lambda: ("POST", "/lists/", {"headers": own, "json": {"name": "bench"}})),
+        ("PATCH /lists/{id}", lambda: ("PATCH", f"/lists/{lid}", {"headers": own, "json": {"name": "renamed"}})),
+        ("DELETE /lists/{id}", lambda: ("DELETE", f"/lists/{b.new_row(GroceryList, name='tmp', owner_id=b.owner_id)}",
+                                        {"headers": own})),
+        ("POST /lists/{id}/hide", lambda: ("POST", f"/lists/{lid}/hide", {"headers": sh})),
+        ("DELETE /lists/{id}/hide", lambda: ("DELETE", f"/lists/{lid}/hide", {"headers": sh})),
+        # Before the item writes, so it always copies the seeded main list
+        ("POST /lists/{id}/duplicate", lambda: ("POST", f"/lists/{lid}/duplicate", {"headers": own})),
+        ("POST /lists/{id}/items", lambda: ("POST", f"/lists/{lid}/items",
+                                            {"headers": own, "json": {"name": "new", "remind_on": "2030-01-01"}})),
+        ("PATCH /lists/items/{id}", lambda: ("PATCH", f"/lists/items/{b.item_id}",
+                                             {"headers": own, "json": {"quantity": 3, "purchased": False}})),
+        ("POST /lists/items/{id}/move", lambda: ("POST", f"/lists/items/{b.item_id}/move",
+                                                 {"headers": own, "json": {"after_id": next(move_after)}})),
+        ("DELETE /lists/items/{id}", lambda: ("DELETE", f"/lists/items/{b.new_row(ListItem, name='tmp', list_id=lid, purchased=False)}",
+                                              {"headers": own})),
+        ("POST /lists/{id}/import", lambda: ("POST", f"/lists/{lid}/import", {"headers": own, "content": import_body})),
+        ("POST /lists/{id}/share", lambda: ("POST", f"/lists/{lid}/share",
+                                            {"headers": own, "json": {"email": "sharee0@bench.example.com", "role": "editor"}})),
+        ("POST /lists/{id}/share/bulk", lambda: ("POST", f"/lists/{lid}/share/bulk",
+                                                 {"headers": own, "json": {"emails": bulk_emails, "role": "viewer"}})),
+        ("PATCH /lists/{id}/share/{id}", lambda: ("PATCH", f"/lists/{lid}/share/{b.share_id}",
+                                                  {"headers": own, "json": {"role": "viewer"}})),
+        ("DELETE /lists/{id}/share/{id}", lambda: ("DELETE", f"/lists/{lid}/share/"
+                                                   f"{b.new_row(ListShare, list_id=lid, user_id=b.new_user(), role=ShareRole.viewer, hidden=False)}",
+                                                   {"headers": own})),
+        ("PATCH /me", lambda: ("PATCH", "/me", {"headers": own, "json": {"name": "Bench"}})),
+        ("POST /auth/register", lambda: ("POST", "/auth/register",
+                                         {"json": {"email": f"{b.unique('r')}@bench.example.com", "password": PASSWORD}})),
+        ("POST /auth/token", lambda: ("POST", "/auth/token",
+                                      {"data": {"username": "owner@bench.example.com", "password": PASSWORD}})),
+        ("POST /auth/logout", lambda: ("POST", "/auth/logout", {})),
+        ("POST /auth/change-password", lambda: ("POST", "/auth/change-password",
+                                                {"headers": own, "json": {"current_password": PASSWORD,
+                                                                          "new_password": PASSWORD}})),
+        ("POST /auth/forgot-password", lambda: ("POST", "/auth/forgot-password", {"json": {"email": "owner@bench.example.com"}})),
+        ("POST /auth/reset-password", lambda: ("POST", "/auth/reset-password",
+                                               {"json": {"token": create_reset_token(b.owner_id), "new_password": PASSWORD}})),
+    ]
+
+
+def percentile(sorted_ms: list[float], pct: float) -> float:
+    # nearest-rank
+    k = max(0, min(len(sorted_ms) - 1, int(round(pct / 100.0 * len(sorted_ms) + 0.5)) - 1))
+    return sorted_ms[k]
+
+
+def run_case(client: TestClient, b: Bench, prepare, requests: int, warmup: int) -> dict:
+    lat, queries, busy = [], 0, 0.0
+    for i in range(warmup + requests):
+        method, url, kwargs = prepare()
+        before = b.queries
+        t0 = time.perf_counter()
+        r = client.request(method, url, **kwargs)
+        dt = time.perf_counter() - t0
+        if r.status_code >= 400:
+            raise RuntimeError(f"{method} {url} -> {r.status_code}: {r.text[:200]}")
+        if i >= warmup:
+            lat.append(dt * 1000.0)
+            queries += b.queries - before
+            busy += dt
+    lat.sort()
+    return {
+        "p50_ms": round(percentile(lat, 50), 3),
+        "p95_ms": round(percentile(lat, 95), 3),
+        "p99_ms": round(percentile(lat, 99), 3),
+        "rps": round(requests / busy, 1) if busy else 0.0,
+        "queries": round(queries / requests, 2),
+    }
+
+
+def run_backend(name: str, engine, sizes: list[int], requests: int, warmup: int, want) -> dict:
+    results = {}
+    client = TestClient(app)
+    saved = dict(app.dependency_overrides)
+    try:
+        for size in sizes:
+            b = Bench(engine, size)
+
+            def _db():
+                db = b.Session()
+                try:
+                    yield db
+                finally:
+                    db.close()
+
+            app.dependency_overrides[get_db] = _db
+            app.dependency_overrides[get_read_db] = _db
+            app.dependency_overrides[get_lazy_read_db] = lambda: contextmanager(_db)
+            print(f"\n[{name}] size={size:,}")
+            print(f"  {'route':34} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'req/s':>8} {'queries':>8}")
+            results[str(size)] = {}
+            for label, prepare in cases(b):
+                if not want(label):
+                    continue
+                res = results[str(size)][label] = run_case(client, b, prepare, requests, warmup)
+                print(f"  {label:34} {res['p50_ms']:8.2f} {res['p95_ms']:8.2f} {res['p99_ms']:8.2f}"
+                      f" {res['rps']:8.1f} {res['queries']:8.2f}")
+            event.remove(engine, "before_cursor_execute", b._count)
+    finally:
+        app.dependency_overrides.clear()
+        app.dependency_overrides.update(saved)
+    return results
+
+
+def _slower(res: dict, base: dict, tolerance: float) -> bool:
+    return res["p95_ms"] > base["p95_ms"] * (1 + tolerance) and res["p95_ms"] - base["p95_ms"] > 1.0
+
+
+def slow_routes(results: dict, baseline: dict, tolerance: float) -> set[str]:
+    """Labels whose p95 is over the baseline at any size."""
+    slow = set()
+    for size, routes in results.items():
+        for label, res in routes.items():
+            base = baseline.get("results", {}).get(size, {}).get(label)
+            if base is not None and _slower(res, base, tolerance):
+                slow.add(label)
+    return slow
+
+
+def compare(name: str, results: dict, baseline: dict, tolerance: float) -> list[str]:
+    problems = []
+    for size, routes in results.items():
+        for label, res in routes.items():
+            base = baseline.get("results", {}).get(size, {}).get(label)
+            if base is None:
+                problems.append(f"[{name}] size={size} {label}: no baseline (record it with --save)")
+                continue
+            if res["queries"] > base["queries"]:
+                problems.append(f"[{name}] size={size} {label}: queries {base['queries']} -> {res['queries']}")
+            if _slower(res, base, tolerance):
+                problems.append(f"[{name}] size={size} {label}: p95 {base['p95_ms']:.2f} -> {res['p95_ms']:.2f} ms")
+    return problems
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--sizes", default="100,1000,10000", help="comma-separated item counts")
+    ap.add_argument("--requests", type=int, default=200, help="timed requests per route and size")
+    ap.add_argument("--warmup", type=int, default=5)
+    ap.add_argument("--pg-url", default=os.getenv("BENCH_PG_URL"), help="throwaway Postgres database (tables are dropped)")
+    ap.add_argument("--save", action="store_true", help="write results as the new baselines")
+    ap.add_argument("--compare", action="store_true", help="compare with the baselines; exit 1 on regression")
+    ap.add_argument("--only", default="", help="comma-separated substrings; run only routes whose label contains one")
+    ap.add_argument("--tolerance", type=float, default=0.25, help="allowed p95 slowdown before flagging (0.25 = 25%%)")
+    args = ap.parse_args()
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    only = [o.strip() for o in args.only.split(",") if o.strip()]
+
+    def want(label: str) -> bool:
+        return not only or any(o in label for o in only)
+
+    backends = [("sqlite", create_engine(f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}",
+                                         connect_args={"check_same_thread": False}))]
+    if args.pg_url:
+        engine = create_engine(args.pg_url, pool_pre_ping=True)
+        try:
+            engine.connect().close()
+            backends.append(("postgresql", engine))
+        except Exception as e:
+            print(f"skipping Postgres ({args.pg_url}): {e}")
+
+    problems = []
+    for name, engine in backends:
+        results = run_backend(name, engine, sizes, args.requests, args.warmup, want)
+        path = os.path.join(BASELINE_DIR, f"{name}.json")
+        baseline = None
+        if os.path.exists(path):
+            with open(path) as f:
+                baseline = json.load(f)
+        if args.compare:
+            if baseline is not None:
+                # One stall is enough to move p95 over a few dozen requests:
+                # run the slow routes again and keep their better p95
+                slow = slow_routes(results, baseline, args.tolerance)
+                if slow:
+                    print(f"\nre-running {len(slow)} route(s) over the p95 baseline")
+                    again = run_backend(name, engine, sizes, args.requests, args.warmup, slow.__contains__)
+                    for size, routes in again.items():
+                        for label, res in routes.items():
+                            if res["p95_ms"] < results[size][label]["p95_ms"]:
+                                results[size][label] = {**res, "queries": results[size][label]["queries"]}
+                problems += compare(name, results, baseline, args.tolerance)
+            else:
+                print(f"no baseline for {name} at {path}")
+        if args.save:
+            os.makedirs(BASELINE_DIR, exist_ok=True)
+            meta = {"backend": name, "requests": args.requests, "python": platform.python_version(),
+                    "machine": platform.machine(), "recorded": date.today().isoformat()}
+            merged = (baseline or {}).get("results", {})
+            for size, routes in results.items():
+                merged.setdefault(size, {}).update(routes)
+            with open(path, "w") as f:
+                json.dump({"meta": meta, "results": merged}, f, indent=1, sort_keys=True)
+                f.write("\n")
+            print(f"saved baseline -> {path}")
+        engine.dispose()
+
+    if problems:
+        print("\nregressions:")
+        for p in problems:
+            print(f"  {p}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
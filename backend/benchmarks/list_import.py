@@ -0,0 +1,67 @@
+"""Time and memory for a bulk list import and a streaming export.
+
+Generates ``--rows`` CSV records lazily, imports them into a throwaway
+SQLite file through app.list_io, then streams the list back out. With
+--memory, peak Python memory (tracemalloc) is reported too; it should stay
+flat as --rows grows (tracing slows the run several times over). Run from
+backend/:
+
+    python -m benchmarks.list_import --rows 100000 [--memory]
+"""
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import Session
+
+from app import list_io
+from app.models import Base, GroceryList, User
+
+
+def csv_lines(rows: int):
+    yield "name,quantity,expiry,description,remind_on,purchased\n"
+    for i in range(rows):
+        yield f"item {i},{i % 5 + 1},2030-01-01,note {i},,{'true' if i % 3 == 0 else 'false'}\n"
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--rows", type=int, default=100_000)
+    ap.add_argument("--memory", action="store_true", help="trace peak memory (slower)")
+    args = ap.parse_args()
+
+    os.environ.setdefault("IMPORT_MAX_ROWS", str(args.rows))
+    path = os.path.join(tempfile.mkdtemp(), "import.db")
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(User), [{"id": 1, "email": "bench@example.com"}])
+        conn.execute(insert(GroceryList), [{"id": 1, "name": "bench", "owner_id": 1}])
+
+    if args.memory:
+        tracemalloc.start()
+    t0 = time.perf_counter()
+    with Session(engine) as db:
+        n = list_io.import_items(db, 1, csv_lines(args.rows), "csv")
+        db.commit()
+    import_s = time.perf_counter() - t0
+    _, import_peak = tracemalloc.get_traced_memory()
+
+    if args.memory:
+        tracemalloc.reset_peak()
+    t0 = time.perf_counter()
+    size = sum(len(chunk) for chunk in list_io.iter_export(engine, 1, "csv"))
+    export_s = time.perf_counter() - t0
+    _, export_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    peak = (lambda b: f"  peak {b / 1e6:6.1f} MB") if args.memory else (lambda b: "")
+    print(f"import : {n:,} rows in {import_s:6.2f}s{peak(import_peak)}")
+    print(f"export : {size / 1e6:,.1f} MB in {export_s:6.2f}s{peak(export_peak)}")
+
+
+if __name__ == "__main__":
+    main()
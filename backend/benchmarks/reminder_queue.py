@@ -0,0 +1,95 @@
+"""Compare the legacy list_item reminder scan with the reminder_queue lookup.
+
+Seeds a throwaway SQLite file with ``--items`` rows of which ``--due`` are due
+today, then times both queries. Run from backend/:
+
+    python -m benchmarks.reminder_queue --items 10000000 --due 1000
+
+The scan cost grows with --items; the queue cost should track --due only.
+"""
+import argparse
+import os
+import tempfile
+import time
+from datetime import date, timedelta
+
+from sqlalchemy import and_, create_engine, insert, select
+from sqlalchemy.orm import Session
+
+from app.models import Base, GroceryList, ListItem, ReminderQueue, User
+
+
+def seed(engine, items: int, due: int, batch: int = 50_000) -> None:
+    Base.metadata.create_all(engine)
+    today = date.today()
+    later = today + timedelta(days=365)
+    with engine.begin() as conn:
+        conn.execute(insert(User), [{"id": 1, "email": "bench@example.com"}])
+        conn.execute(insert(GroceryList), [{"id": 1, "name": "bench", "owner_id": 1}])
+        due_every = max(1, items // max(due, 1))
+        made_due = 0
+        for start in range(0, items, batch):
+            rows, queue = [], []
+            for i in range(start, min(start + batch, items)):
+                is_due = made_due < due and i % due_every == 0
+                made_due += is_due
+                # most items carry a future or no reminder, a few are due today
+                remind = today if is_due else (later if i % 3 == 0 else None)
+                rows.append({"id": i + 1, "name": f"item {i}", "quantity": 1, "list_id": 1,
+                             "remind_on": remind, "purchased": False})
+                if remind is not None:
+                    queue.append({"item_id": i + 1, "remind_on": remind})
+            conn.execute(insert(ListItem), rows)
+            if queue:
+                conn.execute(insert(ReminderQueue), queue)
+
+
+def _time(fn, repeat: int) -> tuple[float, int]:
+    best, n = float("inf"), 0
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        n = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, n
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--items", type=int, default=1_000_000)
+    ap.add_argument("--due", type=int, default=1_000)
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--db", default=None, help="SQLite file to (re)use; default is a temp file")
+    args = ap.parse_args()
+
+    path = args.db or os.path.join(tempfile.mkdtemp(), "reminders.db")
+    fresh = not os.path.exists(path)
+    engine = create_engine(f"sqlite:///{path}")
+    if fresh:
+        t0 = time.perf_counter()
+        seed(engine, args.items, args.due)
+        print(f"seeded {args.items:,} items ({args.due:,} due) in {time.perf_counter() - t0:.1f}s -> {path}")
+
+    today = date.today()
+    legacy = (
+        select(ListItem.id)
+        .where(
+            and_(
+                ListItem.remind_on.is_not(None),
+                ListItem.remind_on <= today,
+                ListItem.reminded_at.is_(None),
+                ListItem.purchased.is_(False),
+            )
+        )
+    )
+    queued = select(ReminderQueue.item_id).where(ReminderQueue.remind_on <= today)
+
+    with Session(engine) as db:
+        scan_s, scan_n = _time(lambda: len(db.execute(legacy).all()), args.repeat)
+        queue_s, queue_n = _time(lambda: len(db.execute(queued).all()), args.repeat)
+
+    print(f"list_item scan     : {scan_s * 1000:9.2f} ms  ({scan_n} rows)")
+    print(f"reminder_queue pop : {queue_s * 1000:9.2f} ms  ({queue_n} rows)")
+
+
+if __name__ == "__main__":
+    main()
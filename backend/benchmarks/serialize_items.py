@@ -0,0 +1,83 @@
+"""Compare the ORM + pydantic read path with the Core row + fast_json path.
+
+Seeds an in-memory SQLite list with ``--items`` rows and times what
+GET /lists/{id}/items does per request on each path, in CPU time
+(``time.process_time``). Run from backend/:
+
+    python -m benchmarks.serialize_items --items 1000
+"""
+import argparse
+import time
+from datetime import date, datetime, timezone
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+from starlette.responses import JSONResponse
+
+from app.fast_json import dumps, rows_to_dicts
+from app.models import Base, GroceryList, ListItem, User
+from app.schemas import ItemRead
+
+FIELDS = tuple(ItemRead.model_fields)
+COLUMNS = tuple(getattr(ListItem, f) for f in FIELDS)
+
+
+def seed(engine, items: int) -> None:
+    Base.metadata.create_all(engine)
+    now = datetime.now(timezone.utc)
+    with engine.begin() as conn:
+        conn.execute(insert(User), [{"id": 1, "email": "bench@example.com"}])
+        conn.execute(insert(GroceryList), [{"id": 1, "name": "bench", "owner_id": 1}])
+        conn.execute(insert(ListItem), [
+            {"id": i + 1, "name": f"item {i} crème", "quantity": i % 5 + 1, "list_id": 1,
+             "expiry": date(2030, 1, 1) if i % 2 else None, "purchased": bool(i % 3 == 0),
+             "description": "note" if i % 4 == 0 else None, "reminded_at": now if i % 7 == 0 else None}
+            for i in range(items)
+        ])
+
+
+def orm_path(db) -> bytes:
+    items = db.query(ListItem).filter(ListItem.list_id == 1).all()
+    adapter = TypeAdapter(list[ItemRead])
+    content = adapter.dump_python(adapter.validate_python(items, from_attributes=True), mode="json")
+    return JSONResponse(jsonable_encoder(content)).body
+
+
+def core_path(db) -> bytes:
+    rows = db.execute(select(*COLUMNS).where(ListItem.list_id == 1)).all()
+    return dumps(rows_to_dicts(FIELDS, rows))
+
+
+def _cpu(fn, db, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        db.expunge_all()
+        t0 = time.process_time()
+        fn(db)
+        best = min(best, time.process_time() - t0)
+    return best
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--items", type=int, default=1_000)
+    ap.add_argument("--repeat", type=int, default=20)
+    args = ap.parse_args()
+
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    seed(engine, args.items)
+    with Session(engine) as db:
+        assert orm_path(db) == core_path(db), "fast path output differs from the response_model output"
+        orm_s = _cpu(orm_path, db, args.repeat)
+        core_s = _cpu(core_path, db, args.repeat)
+
+    per_k = 1000 / max(args.items, 1)
+    print(f"ORM + pydantic  : {orm_s * 1000 * per_k:8.2f} ms CPU per 1k items")
+    print(f"Core + fast_json: {core_s * 1000 * per_k:8.2f} ms CPU per 1k items  ({orm_s / max(core_s, 1e-9):.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
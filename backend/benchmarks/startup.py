@@ -0,0 +1,76 @@
+"""Cold-start import benchmark for the API (``python -X importtime``).
+
+Imports ``app.main`` in a fresh interpreter several times and reports the
+best cumulative import time plus the slowest modules. Run from backend/:
+
+    python -m benchmarks.startup --runs 5 --top 15 --budget-ms 1500
+
+Exits non-zero when the best run exceeds --budget-ms. The same measurement
+backs app/tests/test_startup.py.
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules that must stay out of the import path of app.main (loaded on first use)
+LAZY_MODULES = ("authlib", "argon2", "httpx")
+
+
+def measure_import(module: str = "app.main") -> tuple[float, dict[str, float], list[str]]:
+    """Import ``module`` in a subprocess.
+
+    Returns (cumulative ms for ``module``, {module: self ms}, loaded LAZY_MODULES).
+    """
+    probe = (
+        f"import sys, {module}; "
+        f"print(','.join(m for m in {LAZY_MODULES!r} if m in sys.modules))"
+    )
+    env = {k: v for k, v in os.environ.items() if k != "DATABASE_URL"}
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", probe],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True,
+    )
+    total_ms, self_ms = 0.0, {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        parts = line[len("import time:"):].split("|")
+        try:
+            self_us, cum_us = int(parts[0]), int(parts[1])
+        except ValueError:
+            continue  # header row
+        name = parts[2].strip()
+        self_ms[name] = self_us / 1000.0
+        if name == module:
+            total_ms = cum_us / 1000.0
+    loaded = [m for m in proc.stdout.strip().split(",") if m]
+    return total_ms, self_ms, loaded
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--runs", type=int, default=5)
+    ap.add_argument("--top", type=int, default=15)
+    ap.add_argument("--budget-ms", type=float, default=float(os.getenv("STARTUP_IMPORT_BUDGET_MS", "1500")))
+    args = ap.parse_args()
+
+    best, best_self, loaded = float("inf"), {}, []
+    for _ in range(args.runs):
+        total, self_ms, loaded = measure_import()
+        if total < best:
+            best, best_self = total, self_ms
+
+    print(f"import app.main: best {best:.1f} ms over {args.runs} run(s) (budget {args.budget_ms:.0f} ms)")
+    for name, ms in sorted(best_self.items(), key=lambda kv: kv[1], reverse=True)[: args.top]:
+        print(f"  {ms:8.2f} ms  {name}")
+    if loaded:
+        print(f"eagerly imported lazy deps: {', '.join(loaded)}")
+    if best > args.budget_ms or loaded:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()